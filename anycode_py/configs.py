@@ -1,5 +1,18 @@
+import os
+import shlex
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+# Entry points import this module before they get a chance to load `.env`, so do it here.
+load_dotenv()
+
+
+def _env_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
 ROOT_DIR = Path(__file__).parent.parent
 
 HOME_DIR = Path.home()
@@ -8,13 +21,71 @@ HOME_DIR = Path.home()
 ## CLI COMMAND
 
 
-CODEX_COMMAND = ["codex", "exec", "--json", "-"]
+# Both commands can be overridden from the environment (or `.env`), e.g. to point at
+# `anycode_py/testing/fake_codex.py`. `CODEX_COMMAND` must end with the stdin marker `-`.
+CODEX_COMMAND = shlex.split(os.environ.get("CODEX_COMMAND", "codex exec --json -"))
+
+# Long-lived JSON-RPC server used by `CodexAppServerProcessManager`.
+CODEX_APP_SERVER_COMMAND = shlex.split(os.environ.get("CODEX_APP_SERVER_COMMAND", "codex app-server"))
+# Approval policy and sandbox of the threads it opens. This client cannot prompt for approvals,
+# so like `codex exec` it runs with `never` and a read-only sandbox by default.
+CODEX_APP_SERVER_APPROVAL_POLICY = os.environ.get("CODEX_APP_SERVER_APPROVAL_POLICY", "never")
+CODEX_APP_SERVER_SANDBOX = os.environ.get("CODEX_APP_SERVER_SANDBOX", "read-only")
+
+# Transport the UIs drive codex with: `exec` spawns `codex exec` for every turn, `app-server`
+# keeps one `codex app-server` process warm across the queued turns of a conversation.
+CODEX_TRANSPORT = os.environ.get("CODEX_TRANSPORT", "exec")
+
+# Seconds between /proc samples of each spawned process tree, 0 disables sampling.
+PROCESS_SAMPLE_INTERVAL = 0.5
+
+# Events are newline-delimited JSON; a single `file_change` diff or `aggregated_output` can
+# be megabytes, far above asyncio's default 64 KiB line limit.
+STREAM_READ_LIMIT = 64 * 1024 * 1024
+
+# Lines at least this long are decoded in a worker thread, overlapping the decode with reading
+# the pipe. orjson holds the GIL while parsing, so the event loop still waits for each decode.
+DECODE_OFFLOAD_BYTES = 256 * 1024
+
+# Per-turn resource policy of spawned codex processes, inherited by every command they run
+# (see `anycode_py/process_manager/limits.py`); unset means unlimited.
+RLIMIT_CPU_SECONDS = _env_int("RLIMIT_CPU_SECONDS")
+RLIMIT_ADDRESS_SPACE_BYTES = _env_int("RLIMIT_ADDRESS_SPACE_BYTES")
+RLIMIT_OPEN_FILES = _env_int("RLIMIT_OPEN_FILES")
+PROCESS_NICE = _env_int("PROCESS_NICE")
+# `idle`, `best-effort[:0-7]` or `realtime[:0-7]`; needs the `ionice` utility.
+PROCESS_IONICE = os.environ.get("PROCESS_IONICE") or None
+
+# When set, the raw stdout of every codex process is recorded there, one file per turn
+# (see `anycode_py/process_manager/recorder.py`); `STREAM_RECORD_COMPRESS=1` gzips the files.
+STREAM_RECORD_DIR = os.environ.get("STREAM_RECORD_DIR") or None
+STREAM_RECORD_COMPRESS = os.environ.get("STREAM_RECORD_COMPRESS", "").lower() in ("1", "true", "yes")
+
+# Run the UI and demo entry points on uvloop (optional `uvloop` extra); falls back to the
+# default asyncio loop when uvloop is not installed (e.g. on Windows).
+USE_UVLOOP = os.environ.get("USE_UVLOOP", "").lower() in ("1", "true", "yes")
+
+# Streamed UI changes are pushed to the Flet client at most this many times per second
+# (see `anycode_py/ui/update_scheduler.py`).
+UI_UPDATE_HZ = float(os.environ.get("UI_UPDATE_HZ") or 30)
+# Debug / benchmark aid: measure the JSON size of every flush. It re-encodes each batch, so it
+# stays off in normal runs.
+UI_COUNT_PAYLOAD = os.environ.get("UI_COUNT_PAYLOAD", "").lower() in ("1", "true", "yes")
+
+# Chat messages read per page when a conversation is opened or scrolled back; the newest page
+# is read from the end of the session file, so opening costs the same for any history length.
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE") or 30)
+# Memory budget of the newest-page cache that sidebar hover / neighbour prefetching fills
+# (see `anycode_py/session_manager/codex/prefetch.py`).
+HISTORY_CACHE_BYTES = int(os.environ.get("HISTORY_CACHE_BYTES") or 8 * 1024 * 1024)
+# Seconds the pointer must rest on a conversation before its history is prefetched.
+HISTORY_PREFETCH_DELAY = float(os.environ.get("HISTORY_PREFETCH_DELAY") or 0.15)
 
-CODEX_ROOT_DIR = HOME_DIR / ".codex"
+CODEX_ROOT_DIR = Path(os.environ["CODEX_HOME"]) if os.environ.get("CODEX_HOME") else HOME_DIR / ".codex"
 
 CODEX_SESSION_DIR = CODEX_ROOT_DIR / "sessions"
 
-CODEX_SESSION_DIR.mkdir(exist_ok=True)
+CODEX_SESSION_DIR.mkdir(parents=True, exist_ok=True)
 
 
 if __name__ == "__main__":
@@ -1,34 +1,147 @@
+import functools
 import os
+import shutil
+import signal
+import time
 import asyncio
 from asyncio.subprocess import PIPE, STDOUT
-import json
+import orjson
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import AsyncGenerator, Any
 from loguru import logger
 from pathlib import Path
 
+from ..configs import (
+    DECODE_OFFLOAD_BYTES,
+    PROCESS_SAMPLE_INTERVAL,
+    STREAM_READ_LIMIT,
+    STREAM_RECORD_COMPRESS,
+    STREAM_RECORD_DIR,
+)
+from .limits import ResourceLimits
+from .metrics import TurnMetrics
+from .recorder import StreamRecorder
+from .sampler import ProcessTreeSampler, group_alive
+
+_POSIX = os.name == "posix"
+
+# Merged environments keyed by their overrides. Snapshots of `os.environ` taken on first use,
+# call `clear_spawn_caches()` after changing `os.environ` at runtime.
+_ENV_CACHE: dict[tuple[tuple[str, str], ...], Mapping[str, str]] = {}
+
+
+def spawn_env(overrides: dict[str, str] | None) -> Mapping[str, str] | None:
+    """Environment to pass to the child: None (inherit ours as is) unless there are overrides.
+
+    The merged environment is shared by every manager with the same overrides, so it is
+    returned read-only; copy it to change it.
+    """
+    if not overrides:
+        return None
+    key = tuple(sorted(overrides.items()))
+    env = _ENV_CACHE.get(key)
+    if env is None:
+        env = _ENV_CACHE[key] = MappingProxyType({**os.environ, **overrides})
+    return env
+
+
+@functools.lru_cache(maxsize=64)
+def _which(executable: str, path: str | None) -> str:
+    return shutil.which(executable, path=path) or executable
+
+
+def resolve_executable(cmd: list[str], env: Mapping[str, str] | None = None) -> list[str]:
+    """Resolve ``cmd[0]`` against the child's PATH once, so the child does a single `execve`."""
+    return [_which(cmd[0], (env or os.environ).get("PATH")), *cmd[1:]]
+
+
+def clear_spawn_caches():
+    _ENV_CACHE.clear()
+    _which.cache_clear()
+
+
+class SessionRequired(ValueError):
+    """`resume()` was called without a session id while no session is open."""
+
 
 class BaseProcessManager:
-    def __init__(self, cmd, *, env=None, cwd: Path | None = None):
+    # (signal, seconds to wait for the process group to exit) tried in order by `cancel`.
+    CANCEL_ESCALATION = (
+        (signal.SIGINT, 0.5),
+        (signal.SIGTERM, 0.5),
+        (getattr(signal, "SIGKILL", signal.SIGTERM), 2.0),
+    )
+
+    def __init__(
+        self,
+        cmd,
+        *,
+        env=None,
+        cwd: Path | None = None,
+        sample_interval: float | None = PROCESS_SAMPLE_INTERVAL,
+        limits: ResourceLimits | None = None,
+    ):
         self.cmd = cmd
-        self.env = {**os.environ, **(env or {})}
+        self.env = spawn_env(env)
         self.proc: asyncio.subprocess.Process | None = None
         self.cwd = cwd
+        # Number of processes launched by this manager, useful to assert no redundant spawns.
+        self.spawn_count = 0
+        # CPU / memory / I/O of the process tree; disabled when `sample_interval` is falsy.
+        self.sample_interval = sample_interval
+        self.sampler: ProcessTreeSampler | None = None
+        # rlimits / nice / ionice of the spawned process tree, from the config unless given.
+        self.limits = limits if limits is not None else ResourceLimits.from_config()
+        self._spawn_error_reported = False
+        # Set once we signal the current process, so its death is not blamed on a limit.
+        self.signalled = False
+        # Lines of at least this many bytes are decoded off the event loop, see `read_stream`.
+        self.decode_offload_bytes = DECODE_OFFLOAD_BYTES
+        # Latency counters of the turn in flight; set by subclasses that drive turns.
+        self.turn_metrics: TurnMetrics | None = None
+        # Raw stdout tee, written off the event loop; subclasses call `begin_turn` per turn.
+        self.recorder: StreamRecorder | None = (
+            StreamRecorder(STREAM_RECORD_DIR, compress=STREAM_RECORD_COMPRESS) if STREAM_RECORD_DIR else None
+        )
 
     @classmethod
-    async def create(cls, cmd, *, env=None, cwd: Path | None = None) -> "BaseProcessManager":
+    async def create(cls, cmd, *, env=None, cwd: Path | None = None, lazy: bool = False) -> "BaseProcessManager":
+        """Build a manager; with ``lazy=True`` the process is only spawned by ``ensure_started``."""
         self = cls(cmd, env=env, cwd=cwd)
-        await self._init_async()
+        if not lazy:
+            await self._init_async()
         return self
 
+    async def ensure_started(self):
+        """Spawn the process with the current ``cmd`` unless one is already running."""
+        if not self.is_running:
+            await self._init_async()
+
     async def _init_async(self):
+        self.spawn_count += 1
+        self.signalled = False
+        spawn_started = time.perf_counter()
+        # Spawn arguments stay on CPython's vfork fast path: no `preexec_fn` unless resource
+        # limits need one, the inherited environment when there are no overrides, and an
+        # absolute executable. `close_fds` stays on; Linux closes them with one close_range().
         self.proc = await asyncio.create_subprocess_exec(
-            *self.cmd,
+            *resolve_executable(self.limits.wrap_command(self.cmd), self.env),
             stdin=PIPE,
             stdout=PIPE,
             stderr=STDOUT,
             env=self.env,
             cwd=self.cwd,
+            limit=STREAM_READ_LIMIT,
+            # Own session / process group, so `cancel` also reaches the commands codex runs.
+            start_new_session=_POSIX,
+            preexec_fn=self.limits.preexec_fn(),
         )
+        if self.turn_metrics is not None:
+            self.turn_metrics.on_spawned(time.perf_counter() - spawn_started)
+        if self.sample_interval:
+            self.sampler = ProcessTreeSampler(self.proc.pid, self.sample_interval)
+            self.sampler.start()
 
     async def send(self, text: str, close_stdin: bool = False):
         if self.proc is None or self.proc.stdin is None:
@@ -42,22 +155,113 @@ class BaseProcessManager:
     async def read_stream(self) -> AsyncGenerator[Any, None]:
         if self.proc is None or self.proc.stdout is None:
             raise RuntimeError("Process not initialized")
+        recorder = self.recorder
         async for line in self.proc.stdout:
-            line_str = line.decode().strip()
-            if not line_str:
-                continue
+            if recorder is not None:
+                recorder.write(line)
+            metrics = self.turn_metrics
+            if metrics is not None:
+                now = time.perf_counter()
+                metrics.on_line(len(line), now)
             try:
-                yield json.loads(line_str)
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON decode error: {e}, line: {line_str}")
+                if len(line) >= self.decode_offload_bytes:
+                    # Awaited in place, so events keep their order. orjson holds the GIL for the
+                    # whole `loads`, so the loop still stalls for the full decode of this line;
+                    # the thread only lets reading the pipe overlap with it. Keeping the loop
+                    # responsive during one huge event is not reachable with orjson.
+                    data = await asyncio.to_thread(orjson.loads, line)
+                elif line.isspace():
+                    continue
+                else:
+                    data = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                logger.warning(f"JSON decode error: {e}, line: {line[:1000].decode(errors='replace').strip()}")
+                continue
+            if metrics is not None:
+                metrics.on_event(data.get("type", "") if isinstance(data, dict) else "", len(line), now)
+            yield data
 
     @property
     def is_running(self) -> bool:
         return self.proc is not None and self.proc.returncode is None
 
+    async def process_limit_hit(self, timeout: float = 1.0) -> dict[str, Any] | None:
+        """Structured error event if the process was stopped by one of its resource limits."""
+        if not self.limits or self.proc is None:
+            return None
+        try:
+            returncode = await asyncio.wait_for(self.proc.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.limits.process_limit_hit(returncode, self.signalled)
+
+    def spawn_error(self) -> dict[str, Any] | None:
+        """Structured error event for a limit that could not be applied, once per manager."""
+        if self._spawn_error_reported or not self.limits:
+            return None
+        event = self.limits.spawn_error()
+        self._spawn_error_reported = event is not None
+        return event
+
+    def turn_resource_usage(self) -> dict[str, Any] | None:
+        """Resource usage of the process tree for the current turn, if sampling is enabled."""
+        return self.sampler.turn_summary() if self.sampler else None
+
+    def _signal_group(self, sig: int) -> bool:
+        """Send ``sig`` to the process group; False if nothing was left to signal."""
+        if self.proc is None:
+            return False
+        try:
+            if _POSIX:
+                os.killpg(self.proc.pid, sig)
+            else:
+                # No process groups or SIGINT for pipes on Windows.
+                self.proc.terminate()
+        except ProcessLookupError:
+            return False
+        self.signalled = True
+        return True
+
+    def _group_alive(self) -> bool:
+        if self.proc is None:
+            return False
+        if _POSIX:
+            return group_alive(self.proc.pid)
+        return self.proc.returncode is None
+
+    async def _wait_group_exit(self, timeout: float) -> bool:
+        deadline = time.perf_counter() + timeout
+        while self._group_alive():
+            if time.perf_counter() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    async def cancel(self) -> float | None:
+        """Stop the running turn and everything it spawned.
+
+        Signals the whole process group with each step of `CANCEL_ESCALATION` until it is gone,
+        then closes the manager. Returns the seconds it took to free the processes, or None if
+        nothing was running.
+        """
+        if self.proc is None or not self._group_alive():
+            return None
+        started = time.perf_counter()
+        for sig, timeout in self.CANCEL_ESCALATION:
+            if not self._signal_group(sig) or await self._wait_group_exit(timeout):
+                break
+        else:
+            logger.warning(f"Process group {self.proc.pid} survived {self.CANCEL_ESCALATION[-1][0].name}")
+        await self.close()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Cancelled process group {self.proc.pid} with {sig.name} in {elapsed:.3f}s")
+        return elapsed
+
     async def close(self, timeout: float = 5.0):
         if self.proc is None:
             return
+        if self.sampler is not None:
+            await self.sampler.stop()
         if self.proc.stdin is not None and not self.proc.stdin.is_closing():
             self.proc.stdin.close()
             try:
@@ -67,8 +271,8 @@ class BaseProcessManager:
         try:
             await asyncio.wait_for(self.proc.wait(), timeout=timeout)
         except asyncio.TimeoutError:
-            logger.warning(f"Process didn't exit in {timeout}s, killing...")
-            self.proc.kill()
+            logger.warning(f"Process didn't exit in {timeout}s, killing its process group...")
+            self._signal_group(self.CANCEL_ESCALATION[-1][0])
             await self.proc.wait()
         except ProcessLookupError:
             pass
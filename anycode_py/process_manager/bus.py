@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable
+from enum import Enum
+from typing import Any, Callable
+
+from .events import CodexEvent, EventKind, decode_event
+
+
+class OverflowPolicy(str, Enum):
+    """What a full subscription does with the next event.
+
+    - ``BLOCK``: the publisher waits for the subscriber (lossless, applies backpressure).
+    - ``DROP_OLDEST``: the oldest pending event is discarded.
+    - ``COALESCE``: a pending ``item.updated`` of the same item is replaced in place, even
+      below the bound; when full, the oldest pending ``item.updated`` is evicted. Item updates
+      carry the full item state, so only intermediate snapshots are lost. With no update to
+      evict the oldest pending event that does not end a turn is dropped instead, so the
+      publisher never waits; turn endings are kept even past the bound.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+
+
+class EventBusClosed(RuntimeError):
+    """`EventBus.subscribe` was called after the bus was closed."""
+
+
+class DuplicateSubscriber(ValueError):
+    """A subscription with this name is already registered on the bus."""
+
+
+class InvalidMaxsize(ValueError):
+    """A subscription must be able to hold at least one event."""
+
+
+# Events a COALESCE subscriber never drops: they tell it that a turn is over.
+_TERMINAL_KINDS = frozenset((EventKind.TURN_COMPLETED, EventKind.TURN_FAILED))
+
+
+def _wake_one(waiters: deque[asyncio.Future]):
+    while waiters:
+        waiter = waiters.popleft()
+        if not waiter.done():
+            waiter.set_result(None)
+            return
+
+
+class Subscription:
+    """A bounded per-subscriber queue of `CodexEvent`, iterated with ``async for``.
+
+    Iteration ends once the bus (or the subscription) is closed and the queue is drained.
+    """
+
+    def __init__(self, name: str, maxsize: int, policy: OverflowPolicy):
+        if maxsize < 1:
+            raise InvalidMaxsize(maxsize)
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = OverflowPolicy(policy)
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+        # Each entry is a one-element list so COALESCE can swap the event without moving it.
+        self._queue: deque[list[CodexEvent]] = deque()
+        self._pending_updates: dict[str, list[CodexEvent]] = {}
+        self._getters: deque[asyncio.Future] = deque()
+        self._putters: deque[asyncio.Future] = deque()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _append(self, event: CodexEvent):
+        slot = [event]
+        self._queue.append(slot)
+        if self.policy is OverflowPolicy.COALESCE and event.kind is EventKind.ITEM_UPDATED and event.item_id:
+            self._pending_updates[event.item_id] = slot
+        if len(self._queue) > self.high_water:
+            self.high_water = len(self._queue)
+        _wake_one(self._getters)
+
+    def _forget(self, slot: list[CodexEvent]):
+        event = slot[0]
+        if event.item_id and self._pending_updates.get(event.item_id) is slot:
+            del self._pending_updates[event.item_id]
+
+    def _evict(self, evictable: Callable[[EventKind], bool]) -> bool:
+        """Drop the oldest pending event whose kind is ``evictable``."""
+        for slot in self._queue:
+            if evictable(slot[0].kind):
+                self._queue.remove(slot)
+                self._forget(slot)
+                return True
+        return False
+
+    def offer(self, event: CodexEvent) -> bool:
+        """Enqueue without waiting; returns False if the publisher has to wait (BLOCK only)."""
+        if self.closed:
+            return True
+        if self.policy is OverflowPolicy.COALESCE and event.kind is EventKind.ITEM_UPDATED:
+            slot = self._pending_updates.get(event.item_id)
+            if slot is not None:
+                slot[0] = event
+                self.coalesced += 1
+                return True
+        if len(self._queue) >= self.maxsize:
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                self._forget(self._queue.popleft())
+                self.dropped += 1
+            elif self.policy is OverflowPolicy.COALESCE:
+                if self._evict(lambda kind: kind is EventKind.ITEM_UPDATED):
+                    self.coalesced += 1
+                elif self._evict(lambda kind: kind not in _TERMINAL_KINDS):
+                    self.dropped += 1
+            else:
+                return False
+        self._append(event)
+        return True
+
+    async def put(self, event: CodexEvent):
+        while not self.offer(event):
+            waiter = asyncio.get_running_loop().create_future()
+            self._putters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if not waiter.done():
+                    waiter.cancel()
+
+    def get_nowait(self) -> CodexEvent:
+        if not self._queue:
+            raise asyncio.QueueEmpty
+        slot = self._queue.popleft()
+        self._forget(slot)
+        self.delivered += 1
+        _wake_one(self._putters)
+        return slot[0]
+
+    async def get(self) -> CodexEvent:
+        """Next event; raises `StopAsyncIteration` once closed and drained."""
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+            waiter = asyncio.get_running_loop().create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if not waiter.done():
+                    waiter.cancel()
+        return self.get_nowait()
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> CodexEvent:
+        return await self.get()
+
+    def close(self):
+        """Stop accepting events; pending ones can still be consumed."""
+        if self.closed:
+            return
+        self.closed = True
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "policy": self.policy.value,
+            "maxsize": self.maxsize,
+            "pending": len(self._queue),
+            "high_water": self.high_water,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class EventBus:
+    """In-process fan-out of decoded Codex events.
+
+    Each event is decoded once and handed to every subscriber's bounded queue, so the UI, a
+    recorder and metrics can consume the same `chat()` stream independently::
+
+        bus = EventBus()
+        ui = bus.subscribe("ui", policy=OverflowPolicy.COALESCE)
+        pump = asyncio.create_task(bus.pump(manager.chat(prompt)))
+        async for event in ui:
+            ...
+        await pump
+
+    Only ``BLOCK`` subscribers can make `publish` wait; ``DROP_OLDEST`` and ``COALESCE`` ones
+    never stall the codex pipe.
+    """
+
+    def __init__(self):
+        self.subscriptions: dict[str, Subscription] = {}
+        self.published = 0
+        self.closed = False
+
+    def subscribe(
+        self, name: str, *, maxsize: int = 256, policy: OverflowPolicy = OverflowPolicy.BLOCK
+    ) -> Subscription:
+        if self.closed:
+            raise EventBusClosed()
+        if name in self.subscriptions:
+            raise DuplicateSubscriber(name)
+        subscription = Subscription(name, maxsize, policy)
+        self.subscriptions[name] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if self.subscriptions.get(subscription.name) is subscription:
+            del self.subscriptions[subscription.name]
+        subscription.close()
+
+    async def publish(self, event: CodexEvent | dict[str, Any]):
+        if not isinstance(event, CodexEvent):
+            event = decode_event(event)
+        self.published += 1
+        for subscription in list(self.subscriptions.values()):
+            if not subscription.offer(event):
+                await subscription.put(event)
+
+    async def pump(self, source: AsyncIterable[dict[str, Any]], *, close: bool = True) -> int:
+        """Publish every raw event of ``source`` (e.g. `chat()`); returns the number published.
+
+        With ``close`` the bus is closed when the source ends or fails, ending all subscribers.
+        """
+        count = 0
+        try:
+            async for raw in source:
+                await self.publish(decode_event(raw))
+                count += 1
+        finally:
+            if close:
+                self.close()
+        return count
+
+    def close(self):
+        self.closed = True
+        for subscription in list(self.subscriptions.values()):
+            subscription.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "published": self.published,
+            "subscribers": {name: subscription.stats() for name, subscription in self.subscriptions.items()},
+        }
@@ -1,56 +1,114 @@
 import json
 from typing import Any, AsyncGenerator
 
-from .base import BaseProcessManager
+from .base import BaseProcessManager, SessionRequired
+from .metrics import STREAM_METRICS, TurnMetrics
 from ..configs import CODEX_COMMAND
 
 from pathlib import Path
 from loguru import logger
 
+_ITEM_EVENTS = ("item.started", "item.updated", "item.completed")
+
 
 class CodexProcessManager(BaseProcessManager):
-    def __init__(self, *, env: dict[str, str] | None = None, cwd: Path | None = Path.cwd()):
+    def __init__(
+        self,
+        *,
+        env: dict[str, str] | None = None,
+        cwd: Path | None = Path.cwd(),
+        session_id: str | None = None,
+    ):
         super().__init__(CODEX_COMMAND, env=env, cwd=cwd)
-        self.current_session_id: str | None = None
+        self.current_session_id: str | None = session_id
 
     @classmethod
-    async def create(cls, *, env: dict[str, str] | None = None, cwd: Path | None = Path.cwd()) -> "CodexProcessManager":
-        self = cls(env=env, cwd=cwd)
-        await self._init_async()
-        return self
+    async def create(
+        cls,
+        *,
+        env: dict[str, str] | None = None,
+        cwd: Path | None = Path.cwd(),
+        session_id: str | None = None,
+    ) -> "CodexProcessManager":
+        # Launch is deferred to `chat`: only then do we know whether the turn starts a new
+        # session or resumes one, so every turn spawns exactly one `codex exec` process.
+        return cls(env=env, cwd=cwd, session_id=session_id)
+
+    def _build_cmd(self) -> list[str]:
+        if not self.current_session_id:
+            return list(CODEX_COMMAND)
+        # codex exec --json resume <session_id> -
+        return [*CODEX_COMMAND[:-1], "resume", self.current_session_id, CODEX_COMMAND[-1]]
 
     async def send(self, text: str, close_stdin: bool = True):
         await super().send(text, close_stdin)
 
     async def chat(self, prompt: str) -> AsyncGenerator[Any, None]:
-        if self.current_session_id:
-            await self.resume()
-        await self.send(prompt)
-        async for data_chunk in self.read_stream():
-            # session id will be recored by default, and each process manger corresponds to
-            # one conversation, when handle, different, it will need to switch.
-            self.current_session_id = data_chunk.get("thread_id", "") or self.current_session_id
-            yield data_chunk
+        # Each `codex exec` turn exits once stdin is closed; reap the previous one first.
+        await self.close()
+        self.cmd = self._build_cmd()
+        metrics = self.turn_metrics = TurnMetrics(STREAM_METRICS)
+        terminal = False
+        if self.recorder is not None:
+            self.recorder.begin_turn()
+        try:
+            await self._init_async()
+            spawn_error = self.spawn_error()
+            if spawn_error:
+                yield spawn_error
+            await self.send(prompt)
+            async for data_chunk in self.read_stream():
+                # session id will be recored by default, and each process manger corresponds to
+                # one conversation, when handle, different, it will need to switch.
+                self.current_session_id = data_chunk.get("thread_id", "") or self.current_session_id
+                event_type = data_chunk.get("type")
+                if event_type in ("turn.completed", "turn.failed"):
+                    # Consumers such as `turn_events` stop at the terminal event, so a limit that
+                    # stops the process as it winds down is reported ahead of it.
+                    limit_hit = await self._finish_turn(data_chunk)
+                    if limit_hit:
+                        yield limit_hit
+                    terminal = True
+                elif event_type in _ITEM_EVENTS and data_chunk.get("item", {}).get("type") == "agent_message":
+                    metrics.mark("agent_message")
+                yield data_chunk
+                limit_hit = self._command_limit_hit(data_chunk)
+                if limit_hit:
+                    yield limit_hit
+            if not terminal:
+                limit_hit = await self.process_limit_hit()
+                if limit_hit:
+                    yield limit_hit
+        finally:
+            self.turn_metrics = None
+            metrics.finish()
+
+    async def _finish_turn(self, data_chunk: dict[str, Any]) -> dict[str, Any] | None:
+        """Attach the turn's resource usage to its terminal event; returns a process limit hit, if any."""
+        usage = self.turn_resource_usage()
+        if usage:
+            data_chunk["resource_usage"] = usage
+        return await self.process_limit_hit()
+
+    def _command_limit_hit(self, data_chunk: dict[str, Any]) -> dict[str, Any] | None:
+        if not self.limits or data_chunk.get("type") != "item.completed":
+            return None
+        item = data_chunk["item"]
+        return self.limits.command_limit_hit(item) if item.get("type") == "command_execution" else None
 
     async def resume(self, session_id: str | None = None, prompt: str | None = None):
         if not session_id:
             logger.info(f"session_id is not provided, using current session_id: {self.current_session_id}")
             session_id = self.current_session_id
             if not session_id:
-                raise ValueError("session_id is required to resume a session")
+                raise SessionRequired()
 
-        # Stop any existing process before restarting in resume mode
+        # Stop any existing process; the resumed one is launched by the next `chat` call.
         await self.close()
+        self.current_session_id = session_id
+        self.cmd = self._build_cmd()
 
-        # Build resume command: codex exec --json resume <session_id> -
-        # self.cmd = ["codex", "exec", "--json", "resume", session_id, "-"]
-        # CODEX_COMMAND = ["codex", "exec", "--json", "-"]
-
-        self.cmd = [*CODEX_COMMAND[:-1], "resume", session_id, CODEX_COMMAND[-1]]
-        # Launch resumed process
-        await self._init_async()
-
-        # Optionally send a new prompt to the resumed session
+        # Optionally send a new prompt to the resumed session right away
         if prompt:
-            # suffix = "" if prompt.endswith("\n") else "\n"
+            await self._init_async()
             await self.send(prompt, close_stdin=True)
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from collections import deque
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from ..configs import (
+    CODEX_APP_SERVER_APPROVAL_POLICY,
+    CODEX_APP_SERVER_COMMAND,
+    CODEX_APP_SERVER_SANDBOX,
+    CODEX_TRANSPORT,
+)
+from .base import BaseProcessManager, SessionRequired
+from .codex import CodexProcessManager
+
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+# Sentinel pushed into turn queues when the server goes away mid-turn.
+_SERVER_EXITED = object()
+
+_TERMINAL_EVENTS = ("turn.completed", "turn.failed")
+
+# Streaming notification `item/<type>/<name>` -> the exec item field its deltas accumulate in.
+_DELTA_FIELDS = {
+    "delta": "text",
+    "summaryTextDelta": "text",
+    "textDelta": "raw_text",
+    "outputDelta": "aggregated_output",
+}
+
+# Approval requests the server may still send, and the result that declines each.
+_APPROVAL_DECLINES = {
+    "item/commandExecution/requestApproval": {"decision": "decline"},
+    "item/fileChange/requestApproval": {"decision": "decline"},
+    "execCommandApproval": {"decision": "denied"},
+    "applyPatchApproval": {"decision": "denied"},
+}
+
+
+class CodexProtocolError(RuntimeError):
+    """Error response returned by the app-server for one of our requests."""
+
+
+class CodexServerExited(RuntimeError):
+    """The app-server is not running, or exited while a request or the given turn was pending."""
+
+
+def _snake(name: str) -> str:
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+def _to_exec_item(item: dict[str, Any]) -> dict[str, Any]:
+    # app-server items are camelCase (`agentMessage`, `aggregatedOutput`), `codex exec --json`
+    # items are snake_case; normalise so the widgets can consume both transports.
+    converted = {_snake(key): value for key, value in item.items()}
+    if isinstance(converted.get("type"), str):
+        converted["type"] = _snake(converted["type"])
+    return converted
+
+
+class CodexAppServerProcessManager(BaseProcessManager):
+    """Drive one long-lived `codex app-server` process across many turns.
+
+    Unlike `CodexProcessManager`, which spawns a fresh `codex exec` per turn and rehydrates the
+    session from disk on resume, this manager keeps the process and the thread warm and talks
+    to it over its line-delimited JSON-RPC protocol. Requests are matched to responses by id and
+    notifications are demultiplexed to the turn they belong to by turn id. Events are re-shaped
+    to the `codex exec --json` format, so `chat` is a drop-in replacement.
+    """
+
+    def __init__(
+        self,
+        *,
+        env: dict[str, str] | None = None,
+        cwd: Path | None = None,
+        session_id: str | None = None,
+    ):
+        super().__init__(CODEX_APP_SERVER_COMMAND, env=env, cwd=cwd)
+        self.limits = self.limits.for_persistent_process()
+        self.current_session_id: str | None = session_id
+        self._thread_ready = False
+        self._next_request_id = 0
+        self._pending: dict[int, asyncio.Future] = {}
+        self._turns: dict[str, asyncio.Queue] = {}
+        # Queues of `turn/start` requests still in flight, oldest first; the server starts turns
+        # in request order, so an unknown turn's `turn/started` belongs to the oldest of them.
+        self._starting: deque[asyncio.Queue] = deque()
+        # Latest exec-format state of every open item, so deltas are sent as whole items.
+        self._items: dict[str, dict[str, Any]] = {}
+        self._reader: asyncio.Task | None = None
+        self._ready_lock = asyncio.Lock()
+
+    @classmethod
+    async def create(
+        cls,
+        *,
+        env: dict[str, str] | None = None,
+        cwd: Path | None = None,
+        session_id: str | None = None,
+    ) -> CodexAppServerProcessManager:
+        # Like the exec manager the launch is deferred to the first `chat`.
+        return cls(env=env, cwd=cwd, session_id=session_id)
+
+    # --- JSON-RPC plumbing ----------------------------------------------- #
+    async def _write(self, message: dict[str, Any]):
+        await self.send(json.dumps(message, ensure_ascii=False) + "\n")
+
+    async def request(self, method: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        if self._reader is None or self._reader.done():
+            raise CodexServerExited()
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        await self._write({"id": request_id, "method": method, "params": params or {}})
+        return await future
+
+    async def notify(self, method: str, params: dict[str, Any] | None = None):
+        message: dict[str, Any] = {"method": method}
+        if params is not None:
+            message["params"] = params
+        await self._write(message)
+
+    async def _read_loop(self):
+        try:
+            async for message in self.read_stream():
+                if "method" not in message:
+                    self._resolve(message)
+                elif "id" in message:
+                    await self._reject_server_request(message)
+                else:
+                    self._dispatch(message["method"], message.get("params") or {})
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CodexServerExited())
+            self._pending.clear()
+            for queue in self._turns.values():
+                queue.put_nowait(_SERVER_EXITED)
+
+    def _resolve(self, message: dict[str, Any]):
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            logger.warning(f"Unmatched app-server response: {message}")
+            return
+        if "error" in message:
+            error = message["error"] or {}
+            future.set_exception(CodexProtocolError(error.get("message", "unknown app-server error")))
+        else:
+            future.set_result(message.get("result") or {})
+
+    async def _reject_server_request(self, message: dict[str, Any]):
+        # Threads are opened with CODEX_APP_SERVER_APPROVAL_POLICY, so approvals only come if it
+        # asks for them; this client cannot prompt the user, so they are declined. Other
+        # server-initiated requests are answered too, so the server never blocks the turn.
+        method = message.get("method")
+        decline = _APPROVAL_DECLINES.get(method)
+        logger.warning(f"Declining app-server request: {method}")
+        if decline is not None:
+            await self._write({"id": message["id"], "result": decline})
+        else:
+            await self._write(
+                {"id": message["id"], "error": {"code": -32601, "message": "unsupported by AnyCode-Py client"}}
+            )
+
+    def _dispatch(self, method: str, params: dict[str, Any]):
+        turn = params.get("turn") or {}
+        turn_id = params.get("turnId") or turn.get("id")
+        if not turn_id:
+            logger.debug(f"Dropping app-server notification without turn id: {method}")
+            return
+        queue = self._turns.get(turn_id)
+        if queue is None and method == "turn/started" and self._starting:
+            # Notifications may overtake the `turn/start` response that carries the turn id.
+            queue = self._turns[turn_id] = self._starting.popleft()
+        if queue is None:
+            logger.debug(f"Dropping app-server notification for unknown turn {turn_id}: {method}")
+            return
+        event = self._to_exec_event(method, params)
+        if event is not None:
+            queue.put_nowait(event)
+
+    def _to_exec_event(self, method: str, params: dict[str, Any]) -> dict[str, Any] | None:
+        parts = method.split("/")
+        if parts[0] == "item" and len(parts) == 3:
+            # item/agentMessage/delta, item/commandExecution/outputDelta, ... -> accumulate so
+            # consumers keep receiving the whole item, like exec's `item.updated`.
+            field = _DELTA_FIELDS.get(parts[2])
+            item_id = params.get("itemId")
+            if field is None or not item_id:
+                logger.debug(f"Dropping app-server notification: {method}")
+                return None
+            item = self._items.get(item_id) or {"id": item_id, "type": _snake(parts[1])}
+            item = self._items[item_id] = {**item, field: (item.get(field) or "") + params.get("delta", "")}
+            return {"type": "item.updated", "item": item}
+
+        event: dict[str, Any] = {"type": method.replace("/", ".")}
+        if params.get("threadId"):
+            event["thread_id"] = params["threadId"]
+        if "item" in params:
+            item = _to_exec_item(params["item"])
+            if event["type"] == "item.completed":
+                self._items.pop(item.get("id"), None)
+            elif item.get("id"):
+                self._items[item["id"]] = item
+            event["item"] = item
+        turn = params.get("turn") or {}
+        if "usage" in params or "usage" in turn:
+            event["usage"] = params.get("usage") or turn.get("usage")
+        if event["type"] == "turn.completed" and turn.get("status") == "failed":
+            event["type"] = "turn.failed"
+            event["error"] = turn.get("error") or {}
+        return event
+
+    # --- Lifecycle --------------------------------------------------------- #
+    async def _ensure_ready(self) -> bool:
+        """Start the server and thread if needed; returns True when a thread was (re)opened."""
+        async with self._ready_lock:
+            if self.is_running and self._thread_ready:
+                return False
+            if not self.is_running:
+                await self._init_async()
+                self._reader = asyncio.create_task(self._read_loop())
+                await self.request("initialize", {"clientInfo": {"name": "anycode_py", "version": "0.0.1"}})
+                await self.notify("initialized")
+            params = {
+                "cwd": str(self.cwd or Path.cwd()),
+                "approvalPolicy": CODEX_APP_SERVER_APPROVAL_POLICY,
+                "sandbox": CODEX_APP_SERVER_SANDBOX,
+            }
+            if self.current_session_id:
+                result = await self.request("thread/resume", {"threadId": self.current_session_id, **params})
+            else:
+                result = await self.request("thread/start", params)
+            self.current_session_id = result["thread"]["id"]
+            self._thread_ready = True
+            return True
+
+    async def chat(self, prompt: str) -> AsyncGenerator[Any, None]:
+        if await self._ensure_ready():
+            yield {"type": "thread.started", "thread_id": self.current_session_id}
+            spawn_error = self.spawn_error()
+            if spawn_error:
+                yield spawn_error
+        if self.sampler is not None:
+            self.sampler.begin_turn()
+        if self.recorder is not None:
+            self.recorder.begin_turn()
+        turn_id, queue = await self._start_turn(prompt)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _SERVER_EXITED:
+                    raise CodexServerExited(turn_id)
+                terminal = event["type"] in _TERMINAL_EVENTS
+                if terminal:
+                    usage = self.turn_resource_usage()
+                    if usage:
+                        event["resource_usage"] = usage
+                yield event
+                if terminal:
+                    break
+        finally:
+            self._turns.pop(turn_id, None)
+
+    async def _start_turn(self, prompt: str) -> tuple[str, asyncio.Queue]:
+        """Send `turn/start`; returns the turn id and the queue its notifications are routed to."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._starting.append(queue)
+        try:
+            result = await self.request(
+                "turn/start",
+                {"threadId": self.current_session_id, "input": [{"type": "text", "text": prompt}]},
+            )
+        finally:
+            if queue in self._starting:
+                self._starting.remove(queue)
+        turn_id = result["turn"]["id"]
+        self._turns[turn_id] = queue
+        return turn_id, queue
+
+    async def resume(self, session_id: str | None = None):
+        session_id = session_id or self.current_session_id
+        if not session_id:
+            raise SessionRequired()
+        if session_id != self.current_session_id:
+            # Switching conversations keeps the server warm; only the thread is reopened.
+            self.current_session_id = session_id
+            self._thread_ready = False
+
+    async def close(self, timeout: float = 5.0):
+        await super().close(timeout)
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        self._thread_ready = False
+        self._items.clear()
+
+
+def codex_manager_class() -> type[CodexProcessManager] | type[CodexAppServerProcessManager]:
+    """The process manager selected by `CODEX_TRANSPORT` (`exec` or `app-server`)."""
+    if CODEX_TRANSPORT == "app-server":
+        return CodexAppServerProcessManager
+    if CODEX_TRANSPORT != "exec":
+        logger.warning(f"Unknown CODEX_TRANSPORT {CODEX_TRANSPORT!r}, using exec")
+    return CodexProcessManager
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, AsyncIterable
+from enum import Enum
+from typing import Any
+
+
+class EventKind(str, Enum):
+    """Top-level `type` of a Codex JSON event."""
+
+    THREAD_STARTED = "thread.started"
+    TURN_STARTED = "turn.started"
+    TURN_COMPLETED = "turn.completed"
+    TURN_FAILED = "turn.failed"
+    ITEM_STARTED = "item.started"
+    ITEM_UPDATED = "item.updated"
+    ITEM_COMPLETED = "item.completed"
+    ERROR = "error"
+    SESSION_META = "session_meta"
+    RESPONSE_ITEM = "response_item"
+    UNKNOWN = "unknown"
+
+
+_KINDS = {kind.value: kind for kind in EventKind}
+
+ITEM_KINDS = frozenset((EventKind.ITEM_STARTED, EventKind.ITEM_UPDATED, EventKind.ITEM_COMPLETED))
+
+
+class CodexEvent:
+    """A decoded Codex event with the fields every consumer looks at extracted once.
+
+    ``raw`` keeps the original dict for the long tail of fields (usage, payload, error, ...).
+    """
+
+    __slots__ = ("item", "item_id", "item_type", "kind", "raw")
+
+    def __init__(
+        self,
+        kind: EventKind,
+        raw: dict[str, Any],
+        item: dict[str, Any] | None = None,
+        item_id: str | None = None,
+        item_type: str | None = None,
+    ):
+        self.kind = kind
+        self.raw = raw
+        self.item = item
+        self.item_id = item_id
+        self.item_type = item_type
+
+    @property
+    def is_item(self) -> bool:
+        return self.kind in ITEM_KINDS
+
+    @property
+    def is_completed(self) -> bool:
+        return self.kind is EventKind.ITEM_COMPLETED
+
+    def __repr__(self) -> str:
+        if self.item_id:
+            return f"CodexEvent({self.kind.value}, {self.item_type}:{self.item_id})"
+        return f"CodexEvent({self.kind.value})"
+
+
+def decode_event(raw: dict[str, Any]) -> CodexEvent:
+    kind = _KINDS.get(raw.get("type"), EventKind.UNKNOWN)
+    if kind in ITEM_KINDS:
+        item = raw.get("item") or {}
+        return CodexEvent(kind, raw, item, item.get("id"), item.get("type"))
+    return CodexEvent(kind, raw)
+
+
+async def decode_stream(source: AsyncIterable[dict[str, Any]]) -> AsyncGenerator[CodexEvent, None]:
+    """Decode the raw event stream of `chat()` from any codex process manager."""
+    async for raw in source:
+        yield decode_event(raw)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import signal
+from dataclasses import dataclass, replace
+from typing import Any, Callable
+
+from loguru import logger
+
+from ..configs import (
+    PROCESS_IONICE,
+    PROCESS_NICE,
+    RLIMIT_ADDRESS_SPACE_BYTES,
+    RLIMIT_CPU_SECONDS,
+    RLIMIT_OPEN_FILES,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_SIGXCPU = getattr(signal, "SIGXCPU", None)
+_SIGKILL = getattr(signal, "SIGKILL", None)
+
+# Grace between the soft CPU limit (SIGXCPU) and the hard one (SIGKILL).
+_CPU_HARD_GRACE_SECONDS = 5
+
+# strerror() text that commands print when they run into the limit.
+_OUTPUT_MARKERS = {
+    "open_files": ("Too many open files",),
+    "address_space_bytes": ("Cannot allocate memory", "MemoryError", "std::bad_alloc", "out of memory"),
+}
+
+_IONICE_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+
+
+def _may_set_nice(nice: int) -> bool:
+    """Whether this process may give a child niceness ``nice`` (lowering it needs privilege)."""
+    if resource is None or nice >= 0 or os.geteuid() == 0:
+        return True
+    # RLIMIT_NICE allows unprivileged processes to go down to a niceness of 20 - soft limit.
+    soft, _ = resource.getrlimit(resource.RLIMIT_NICE)
+    return soft == resource.RLIM_INFINITY or os.getpriority(os.PRIO_PROCESS, 0) + nice >= 20 - soft
+
+
+def parse_ionice(value: str | None) -> tuple[int, int | None] | None:
+    """Parse ``idle`` / ``best-effort:7`` / ``2:4`` into (class, level)."""
+    if not value:
+        return None
+    name, _, level = value.partition(":")
+    io_class = _IONICE_CLASSES.get(name) or int(name)
+    return io_class, int(level) if level else None
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Resource policy applied to a spawned codex process and everything it runs.
+
+    rlimits and nice are set in the child between fork and exec and are inherited by the
+    commands codex spawns; ionice is applied by prefixing the command with ``ionice``. With no
+    field set the process is spawned without ``preexec_fn``. A negative nice that we are not
+    allowed to set is left out and reported by `spawn_error` instead of failing the spawn.
+    """
+
+    cpu_seconds: int | None = None
+    address_space_bytes: int | None = None
+    open_files: int | None = None
+    nice: int | None = None
+    ionice: tuple[int, int | None] | None = None
+
+    @classmethod
+    def from_config(cls) -> ResourceLimits:
+        return cls(
+            cpu_seconds=RLIMIT_CPU_SECONDS,
+            address_space_bytes=RLIMIT_ADDRESS_SPACE_BYTES,
+            open_files=RLIMIT_OPEN_FILES,
+            nice=PROCESS_NICE,
+            ionice=parse_ionice(PROCESS_IONICE),
+        )
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in vars(self).values())
+
+    def for_persistent_process(self) -> ResourceLimits:
+        """The limits for a process that serves many turns.
+
+        RLIMIT_CPU counts the CPU time of the process over its whole life, so on a long-lived
+        server it would add up across turns and eventually kill it in the middle of one.
+        """
+        if self.cpu_seconds is None:
+            return self
+        logger.warning("RLIMIT_CPU_SECONDS is per process and not applied to persistent codex processes")
+        return replace(self, cpu_seconds=None)
+
+    def _rlimits(self) -> list[tuple[int, tuple[int, int]]]:
+        if resource is None:
+            return []
+        rlimits = []
+        if self.cpu_seconds is not None:
+            rlimits.append((resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + _CPU_HARD_GRACE_SECONDS)))
+        if self.address_space_bytes is not None:
+            rlimits.append((resource.RLIMIT_AS, (self.address_space_bytes, self.address_space_bytes)))
+        if self.open_files is not None:
+            rlimits.append((resource.RLIMIT_NOFILE, (self.open_files, self.open_files)))
+        return rlimits
+
+    def preexec_fn(self) -> Callable[[], None] | None:
+        """Callable for `create_subprocess_exec(preexec_fn=...)`, None when there is nothing to set."""
+        rlimits = self._rlimits()
+        nice = self.nice if self.nice is not None and _may_set_nice(self.nice) else None
+        if not rlimits and nice is None:
+            return None
+
+        # Runs in the forked child: no logging, no locks, only syscalls.
+        def apply():
+            for which, limits in rlimits:
+                resource.setrlimit(which, limits)
+            if nice is not None:
+                # Raising here would fail the whole spawn; run at the default priority.
+                with contextlib.suppress(OSError):
+                    os.nice(nice)
+
+        return apply
+
+    def spawn_error(self) -> dict[str, Any] | None:
+        """A structured ``error`` event if part of the policy cannot be applied to a spawn."""
+        if self.nice is None or _may_set_nice(self.nice):
+            return None
+        message = f"Resource limit not applied: nice={self.nice} needs privileges, running at the default priority"
+        error = {"message": message, "kind": "resource_limit", "limit": "nice", "value": self.nice, "source": "spawn"}
+        return {"type": "error", "message": message, "error": error}
+
+    def wrap_command(self, cmd: list[str]) -> list[str]:
+        if self.ionice is None:
+            return cmd
+        ionice = shutil.which("ionice")
+        if ionice is None:
+            logger.warning("PROCESS_IONICE is set but `ionice` is not installed, ignoring it")
+            return cmd
+        io_class, level = self.ionice
+        prefix = [ionice, "-c", str(io_class)]
+        if level is not None:
+            prefix += ["-n", str(level)]
+        return [*prefix, *cmd]
+
+    def limit_hit(self, limit: str, source: str, **detail: Any) -> dict[str, Any]:
+        """A structured ``error`` event, shaped like codex's own so the UI renders it."""
+        value = getattr(self, limit)
+        message = f"Resource limit reached: {limit}={value} ({source})"
+        error = {"message": message, "kind": "resource_limit", "limit": limit, "value": value, "source": source}
+        return {"type": "error", "message": message, "error": {**error, **detail}}
+
+    def command_limit_hit(self, item: dict[str, Any]) -> dict[str, Any] | None:
+        """Check a completed ``command_execution`` item for a command stopped by a limit."""
+        exit_code = item.get("exit_code")
+        if self.cpu_seconds is not None and _SIGXCPU and exit_code in (128 + _SIGXCPU, -_SIGXCPU):
+            return self.limit_hit("cpu_seconds", "command", item_id=item.get("id"), command=item.get("command"))
+        output = item.get("aggregated_output") or ""
+        if exit_code and output:
+            for limit, markers in _OUTPUT_MARKERS.items():
+                if getattr(self, limit) is not None and any(marker in output for marker in markers):
+                    return self.limit_hit(limit, "command", item_id=item.get("id"), command=item.get("command"))
+        return None
+
+    def process_limit_hit(self, returncode: int | None, signalled: bool = False) -> dict[str, Any] | None:
+        """Check the exit status of the codex process itself.
+
+        Past the soft CPU limit the kernel sends SIGXCPU, past the hard one SIGKILL. A SIGKILL
+        is only attributed to the limit when we did not signal the process ourselves
+        (``signalled``, e.g. a cancel).
+        """
+        if self.cpu_seconds is None:
+            return None
+        if _SIGXCPU and returncode == -_SIGXCPU:
+            return self.limit_hit("cpu_seconds", "process", returncode=returncode)
+        if _SIGKILL and returncode == -_SIGKILL and not signalled:
+            return self.limit_hit("cpu_seconds", "process", returncode=returncode, hard=True)
+        return None
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from array import array
+from collections import deque
+from typing import Any
+
+from loguru import logger
+
+# Event kinds whose first occurrence in a turn is tracked ("agent_message" is the item type).
+_MILESTONES = ("thread.started", "agent_message", "turn.completed")
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of ``values`` (0 <= q <= 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class TurnMetrics:
+    """Latency counters of a single `codex exec` turn, updated in O(1) per event."""
+
+    __slots__ = (
+        "bytes",
+        "events",
+        "first_byte",
+        "first_event",
+        "gap_max",
+        "gap_total",
+        "last_event",
+        "recorder",
+        "spawn_s",
+        "started",
+    )
+
+    def __init__(self, recorder: StreamMetrics | None = None):
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.spawn_s: float | None = None
+        self.first_byte: float | None = None
+        self.first_event: dict[str, float] = {}
+        self.last_event: float | None = None
+        self.events = 0
+        self.bytes = 0
+        self.gap_total = 0.0
+        self.gap_max = 0.0
+
+    def on_spawned(self, duration: float):
+        self.spawn_s = duration
+
+    def on_line(self, nbytes: int, now: float):
+        # Lines are newline-delimited JSON, so the first line marks the first byte of output.
+        if self.first_byte is None:
+            self.first_byte = now
+        self.bytes += nbytes
+
+    def on_event(self, kind: str, nbytes: int, now: float):
+        if self.recorder is not None:
+            self.recorder.record_event(kind, nbytes, now)
+        if self.last_event is not None:
+            gap = now - self.last_event
+            self.gap_total += gap
+            if gap > self.gap_max:
+                self.gap_max = gap
+        self.last_event = now
+        self.events += 1
+        if kind in _MILESTONES:
+            self.mark(kind, now)
+
+    def mark(self, kind: str, now: float | None = None):
+        """Record the first occurrence of a milestone such as the first `agent_message` item."""
+        if kind not in self.first_event:
+            self.first_event[kind] = (now or time.perf_counter()) - self.started
+
+    def finish(self):
+        if self.recorder is not None:
+            self.recorder.record_turn(self)
+
+    def summary(self) -> dict[str, Any]:
+        duration = (self.last_event or time.perf_counter()) - self.started
+        return {
+            "spawn_s": self.spawn_s,
+            "first_byte_s": None if self.first_byte is None else self.first_byte - self.started,
+            "first_event_s": dict(self.first_event),
+            "duration_s": duration,
+            "events": self.events,
+            "bytes": self.bytes,
+            "events_per_s": self.events / duration if duration > 0 else 0.0,
+            "bytes_per_event": self.bytes / self.events if self.events else 0.0,
+            "gap_mean_s": self.gap_total / (self.events - 1) if self.events > 1 else 0.0,
+            "gap_max_s": self.gap_max,
+        }
+
+
+class StreamMetrics:
+    """Process-wide ring buffers of stream timings.
+
+    Every event is appended to a fixed-size timeline backed by preallocated arrays, so recording
+    never allocates, and every finished turn leaves its summary in a bounded deque. A one-line
+    aggregate is logged at most once per ``log_interval`` seconds.
+    """
+
+    def __init__(self, capacity: int = 4096, turn_capacity: int = 256, log_interval: float = 60.0):
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._sizes = array("q", bytes(8 * capacity))
+        self._kinds: list[str | None] = [None] * capacity
+        self._cursor = 0
+        self.recorded = 0
+        self._turns: deque[dict[str, Any]] = deque(maxlen=turn_capacity)
+        self.log_interval = log_interval
+        self._last_log = time.monotonic()
+
+    def record_event(self, kind: str, nbytes: int, now: float):
+        index = self._cursor
+        self._times[index] = now
+        self._sizes[index] = nbytes
+        self._kinds[index] = kind
+        self._cursor = (index + 1) % self.capacity
+        self.recorded += 1
+
+    def record_turn(self, turn: TurnMetrics):
+        self._turns.append(turn.summary())
+        if self.log_interval and time.monotonic() - self._last_log >= self.log_interval:
+            self._last_log = time.monotonic()
+            logger.info(f"Codex stream metrics: {self.summary()}")
+
+    def events(self, last: int | None = None) -> list[tuple[float, str, int]]:
+        """Most recent ``(perf_counter, kind, bytes)`` records, oldest first."""
+        count = min(self.recorded, self.capacity)
+        if last is not None:
+            count = min(count, last)
+        start = (self._cursor - count) % self.capacity
+        indices = [(start + offset) % self.capacity for offset in range(count)]
+        return [(self._times[i], self._kinds[i] or "", self._sizes[i]) for i in indices]
+
+    def turns(self, last: int | None = None) -> list[dict[str, Any]]:
+        turns = list(self._turns)
+        return turns if last is None else turns[-last:]
+
+    def summary(self) -> dict[str, Any]:
+        turns = list(self._turns)
+
+        def collect(key: str) -> list[float]:
+            return [turn[key] for turn in turns if turn.get(key) is not None]
+
+        def first_event(kind: str) -> list[float]:
+            return [turn["first_event_s"][kind] for turn in turns if kind in turn["first_event_s"]]
+
+        result: dict[str, Any] = {"turns": len(turns), "events": self.recorded}
+        series = {
+            "spawn_s": collect("spawn_s"),
+            "first_byte_s": collect("first_byte_s"),
+            "gap_max_s": collect("gap_max_s"),
+            "events_per_s": collect("events_per_s"),
+            "bytes_per_event": collect("bytes_per_event"),
+        }
+        series.update({f"first_{kind}_s": first_event(kind) for kind in _MILESTONES})
+        for name, values in series.items():
+            result[name] = {"p50": percentile(values, 50), "p99": percentile(values, 99)}
+        return result
+
+    def clear(self):
+        self._cursor = 0
+        self.recorded = 0
+        self._turns.clear()
+
+
+STREAM_METRICS = StreamMetrics()
+
+
+class LoopLagMonitor:
+    """Measure event-loop responsiveness by how late a periodic wake-up fires."""
+
+    def __init__(self, interval: float = 0.01, capacity: int = 100_000):
+        self.interval = interval
+        self.lags: deque[float] = deque(maxlen=capacity)
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict[str, Any]:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        return self.summary()
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - expected))
+
+    def summary(self) -> dict[str, Any]:
+        lags = list(self.lags)
+        return {
+            "samples": len(lags),
+            "p50_s": percentile(lags, 50),
+            "p99_s": percentile(lags, 99),
+            "max_s": max(lags) if lags else None,
+        }
+
+    async def __aenter__(self) -> LoopLagMonitor:
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
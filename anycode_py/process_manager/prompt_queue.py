@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import itertools
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable
+from enum import Enum
+from typing import Any, Callable
+
+from loguru import logger
+
+from .base import BaseProcessManager
+
+_TERMINAL_EVENTS = ("turn.completed", "turn.failed")
+
+_prompt_ids = itertools.count(1)
+
+
+class PromptState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class QueuedPrompt:
+    __slots__ = ("error", "finished_at", "id", "started_at", "state", "submitted_at", "text")
+
+    def __init__(self, text: str):
+        self.id = next(_prompt_ids)
+        self.text = text
+        self.state = PromptState.PENDING
+        self.error: BaseException | None = None
+        self.submitted_at = time.monotonic()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def __repr__(self) -> str:
+        return f"QueuedPrompt(id={self.id}, state={self.state.value}, text={self.text[:30]!r})"
+
+
+async def turn_events(manager: BaseProcessManager, prompt: str) -> AsyncGenerator[dict[str, Any], None]:
+    """`manager.chat(prompt)`, ending at ``turn.completed`` / ``turn.failed``.
+
+    `codex exec` still flushes and exits after the terminal event; stopping here lets the next
+    queued prompt start right away instead of waiting for EOF (its `chat` reaps the process).
+    """
+    stream = manager.chat(prompt)
+    try:
+        async for event in stream:
+            yield event
+            if event.get("type") in _TERMINAL_EVENTS:
+                break
+    finally:
+        await stream.aclose()
+
+
+class PromptQueue:
+    """FIFO of prompts for one conversation, run back to back by a single worker task.
+
+    `submit` never blocks and can be called while a turn is running; the prompt is shown as
+    pending by the caller and ``run_turn`` is awaited for it as soon as the previous turn is
+    done. ``run_turn`` usually iterates `turn_events` on the conversation's process manager, so
+    every queued follow-up reuses the same (warm) process and session. ``on_state`` is called
+    on each state change of a prompt; it may return an awaitable.
+    """
+
+    def __init__(
+        self,
+        run_turn: Callable[[QueuedPrompt], Awaitable[None]],
+        *,
+        on_state: Callable[[QueuedPrompt], Any] | None = None,
+    ):
+        self.run_turn = run_turn
+        self.on_state = on_state
+        self.current: QueuedPrompt | None = None
+        self.completed = 0
+        self.failed = 0
+        # Seconds between the end of one turn and the start of the next queued one.
+        self.dispatch_gaps: list[float] = []
+        self._pending: deque[QueuedPrompt] = deque()
+        self._worker: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def pending(self) -> list[QueuedPrompt]:
+        return list(self._pending)
+
+    @property
+    def busy(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def submit(self, text: str) -> QueuedPrompt:
+        prompt = QueuedPrompt(text)
+        self._pending.append(prompt)
+        if not self.busy:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return prompt
+
+    def discard(self, prompt: QueuedPrompt) -> bool:
+        """Drop a prompt that has not started yet."""
+        try:
+            self._pending.remove(prompt)
+        except ValueError:
+            return False
+        prompt.state = PromptState.CANCELLED
+        return True
+
+    def clear(self) -> list[QueuedPrompt]:
+        """Drop every pending prompt; the running turn is left alone."""
+        dropped = list(self._pending)
+        self._pending.clear()
+        for prompt in dropped:
+            prompt.state = PromptState.CANCELLED
+        return dropped
+
+    async def join(self):
+        """Wait until the queue is drained."""
+        while self.busy:
+            await asyncio.shield(self._worker)
+
+    async def _notify(self, prompt: QueuedPrompt):
+        if self.on_state is None:
+            return
+        try:
+            result = self.on_state(prompt)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Prompt queue state callback failed for {prompt!r}: {e}")
+
+    async def _run(self):
+        last_finished: float | None = None
+        while self._pending:
+            prompt = self.current = self._pending.popleft()
+            prompt.state = PromptState.RUNNING
+            prompt.started_at = time.monotonic()
+            if last_finished is not None:
+                self.dispatch_gaps.append(prompt.started_at - last_finished)
+            await self._notify(prompt)
+            try:
+                await self.run_turn(prompt)
+                prompt.state = PromptState.DONE
+                self.completed += 1
+            except asyncio.CancelledError:
+                prompt.state = PromptState.CANCELLED
+                raise
+            except Exception as e:
+                logger.exception(f"Queued turn {prompt!r} failed: {e}")
+                prompt.state = PromptState.FAILED
+                prompt.error = e
+                self.failed += 1
+            finally:
+                prompt.finished_at = last_finished = time.monotonic()
+                self.current = None
+            await self._notify(prompt)
+
+    async def close(self):
+        """Drop pending prompts and cancel the worker."""
+        self.clear()
+        if self.busy:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+
+    def stats(self) -> dict[str, Any]:
+        gaps = self.dispatch_gaps
+        return {
+            "pending": len(self._pending),
+            "running": self.current is not None,
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_dispatch_gap": max(gaps) if gaps else None,
+        }
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from loguru import logger
+
+# Linux caps the number of buffers a single writev() accepts.
+_IOV_MAX = 1024
+
+_LIVE_RECORDERS: weakref.WeakSet[StreamRecorder] = weakref.WeakSet()
+
+
+class _Rotate:
+    __slots__ = ("path",)
+
+    def __init__(self, path: Path):
+        self.path = path
+
+
+def _writev_all(fd: int, chunks: list[bytes]):
+    for start in range(0, len(chunks), _IOV_MAX):
+        batch = chunks[start : start + _IOV_MAX]
+        written = os.writev(fd, batch)
+        if written < sum(map(len, batch)):
+            # Short write (disk full, signal): finish the remainder with plain writes.
+            rest = memoryview(b"".join(batch))[written:]
+            while rest:
+                rest = rest[os.write(fd, rest) :]
+
+
+class StreamRecorder:
+    """Tees the exact stdout bytes of a codex process to disk without blocking the event loop.
+
+    `write` is a lock-free `deque.append` (atomic under the GIL), so the event loop pays well
+    under a microsecond per line. A daemon thread drains the ring every ``flush_interval`` and
+    writes each batch with one `os.writev`. If the disk falls behind and more than
+    ``capacity_bytes`` are pending, the oldest chunks are dropped and counted in
+    ``dropped_bytes``, so the stream is never stalled. `begin_turn` rotates to a new file,
+    ``<prefix>-<turn>.jsonl`` (``.jsonl.gz`` with ``compress=True``). The thread exits after
+    ``idle_timeout`` seconds without output and is restarted by the next write.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        prefix: str | None = None,
+        compress: bool = False,
+        capacity_bytes: int = 8 * 1024 * 1024,
+        flush_interval: float = 0.05,
+        idle_timeout: float = 30.0,
+    ):
+        self.directory = Path(directory)
+        self.prefix = prefix or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.compress = compress
+        self.capacity_bytes = capacity_bytes
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        self.turns = 0
+        self.recorded_bytes = 0
+        self.dropped_bytes = 0
+        self.files: list[Path] = []
+        # Appended by the event loop, popped only by the writer thread.
+        self._ring: deque[bytes | _Rotate] = deque()
+        # Guards the writer thread's lifecycle, never taken by `write` on the fast path.
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self._file: BinaryIO | None = None
+        self._path: Path | None = None
+
+    def begin_turn(self) -> Path:
+        """Start a new file for the next turn; returns its path."""
+        self.turns += 1
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        path = self.directory / f"{self.prefix}-{self.turns:04d}{suffix}"
+        self.files.append(path)
+        self.write(_Rotate(path))
+        return path
+
+    def write(self, chunk: bytes | _Rotate):
+        if self._closed:
+            return
+        self._ring.append(chunk)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"stream-recorder-{self.prefix}", daemon=True)
+                self._thread.start()
+                _LIVE_RECORDERS.add(self)
+
+    def _drain(self) -> list[bytes | _Rotate]:
+        ring = self._ring
+        batch: list[bytes | _Rotate] = []
+        pending = 0
+        while ring:
+            entry = ring.popleft()
+            batch.append(entry)
+            if not isinstance(entry, _Rotate):
+                pending += len(entry)
+        if pending > self.capacity_bytes:
+            batch = self._drop_oldest(batch, pending)
+        return batch
+
+    def _drop_oldest(self, batch: list[bytes | _Rotate], pending: int) -> list[bytes | _Rotate]:
+        # Only raw chunks are dropped; rotation markers are kept so turn boundaries stay intact.
+        kept: list[bytes | _Rotate] = []
+        for index, entry in enumerate(batch):
+            if pending <= self.capacity_bytes:
+                kept.extend(batch[index:])
+                break
+            if isinstance(entry, _Rotate):
+                kept.append(entry)
+            else:
+                pending -= len(entry)
+                self.dropped_bytes += len(entry)
+        return kept
+
+    def _run(self):
+        last_output = time.monotonic()
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            closed = self._closed
+            if self._ring:
+                self._idle.clear()
+                try:
+                    self._write_batch(self._drain())
+                except OSError as e:
+                    logger.warning(f"Stream recorder {self.prefix} failed to write: {e}")
+                finally:
+                    self._idle.set()
+                last_output = time.monotonic()
+            elif not closed and time.monotonic() - last_output > self.idle_timeout:
+                with self._lock:
+                    if self._ring:
+                        continue
+                    # Let the thread (and its reference to us) go; the next write restarts it.
+                    # The file is closed under the lock so a restarted thread never shares it.
+                    self._thread = None
+                    self._close_file()
+                    return
+            if closed:
+                self._close_file()
+                return
+
+    def _open(self, path: Path, mode: str) -> BinaryIO:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        if self.compress:
+            # Reopening in append mode adds a gzip member, which readers concatenate.
+            return gzip.open(path, mode, compresslevel=1)
+        return open(path, mode, buffering=0)
+
+    def _write_batch(self, batch: list[bytes | _Rotate]):
+        chunks: list[bytes] = []
+        for entry in batch:
+            if isinstance(entry, _Rotate):
+                self._write_chunks(chunks)
+                chunks = []
+                self._close_file()
+                self._file = self._open(entry.path, "wb")
+            else:
+                chunks.append(entry)
+        self._write_chunks(chunks)
+
+    def _write_chunks(self, chunks: list[bytes]):
+        if not chunks:
+            return
+        if self._file is None:
+            # Output before the first `begin_turn` goes to a turn 0 file.
+            path = self._path or self.directory / f"{self.prefix}-0000.jsonl{'.gz' if self.compress else ''}"
+            self._file = self._open(path, "ab")
+        if self.compress:
+            self._file.write(b"".join(chunks))
+        else:
+            _writev_all(self._file.fileno(), chunks)
+        self.recorded_bytes += sum(map(len, chunks))
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Block until everything written so far is on disk (for tests and shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._ring or not self._idle.is_set():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wakeup.set()
+            time.sleep(0.001)
+        return True
+
+    def close(self, timeout: float | None = 5.0):
+        """Write what is pending, close the current file and stop the writer thread."""
+        self._closed = True
+        if self._ring:
+            # The writer may have exited while idle; it drains once more before stopping.
+            self._start()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._wakeup.set()
+            thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "recorded_bytes": self.recorded_bytes,
+            "dropped_bytes": self.dropped_bytes,
+            "pending_chunks": len(self._ring),
+        }
+
+
+@atexit.register
+def _close_live_recorders():
+    for recorder in list(_LIVE_RECORDERS):
+        recorder.close(timeout=1.0)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+_PROC = Path("/proc")
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+PROC_AVAILABLE = (_PROC / "self" / "stat").exists()
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text()
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return None
+
+
+def _children(pid: int) -> list[int]:
+    children: list[int] = []
+    try:
+        children_files = list((_PROC / str(pid) / "task").glob("*/children"))
+    except FileNotFoundError:
+        # The process exited between samples.
+        return children
+    for children_file in children_files:
+        text = _read(children_file)
+        if text:
+            children.extend(int(child) for child in text.split())
+    return children
+
+
+def _read_stat(pid: int) -> tuple[float, float] | None:
+    """Return (user, system) CPU seconds of ``pid`` including its reaped children."""
+    text = _read(_PROC / str(pid) / "stat")
+    if text is None:
+        return None
+    # `comm` may contain spaces and parentheses, the remaining fields start after the last ')'.
+    fields = text[text.rindex(")") + 2 :].split()
+    utime, stime, cutime, cstime = (int(value) for value in fields[11:15])
+    return (utime + cutime) / _CLK_TCK, (stime + cstime) / _CLK_TCK
+
+
+def group_alive(pgid: int) -> bool:
+    """Whether process group ``pgid`` still has a member that is not a zombie.
+
+    Orphaned members are reparented to PID 1, which in containers often never reaps them; a
+    zombie holds no CPU or memory, so it does not count.
+    """
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    if not PROC_AVAILABLE:
+        return True
+    for entry in os.scandir(_PROC):
+        if not entry.name.isdigit():
+            continue
+        text = _read(Path(entry.path) / "stat")
+        if text is None:
+            continue
+        # Fields after `comm`: state, ppid, pgrp, ...
+        state, _, pgrp = text[text.rindex(")") + 2 :].split(maxsplit=3)[:3]
+        if int(pgrp) == pgid and state != "Z":
+            return True
+    return False
+
+
+def _read_status(pid: int) -> tuple[int, int]:
+    """Return (VmRSS, VmHWM) in bytes; kernel threads and zombies report neither."""
+    text = _read(_PROC / str(pid) / "status") or ""
+    rss = hwm = 0
+    for line in text.splitlines():
+        if line.startswith("VmRSS:"):
+            rss = int(line.split()[1]) * 1024
+        elif line.startswith("VmHWM:"):
+            hwm = int(line.split()[1]) * 1024
+    return rss, hwm
+
+
+def _read_io(pid: int) -> dict[str, int]:
+    text = _read(_PROC / str(pid) / "io") or ""
+    counters = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        counters[key] = int(value)
+    return counters
+
+
+class ProcessTreeSampler:
+    """Periodically sample CPU, memory and I/O of a process and all of its descendants.
+
+    Linux accounts the CPU time and I/O of reaped children into their parent (`cutime`,
+    `cstime` and `/proc/<pid>/io`), so summing the live tree on every sample yields the cost of
+    everything the process ran, including short-lived shell commands, as long as they were
+    reaped inside the tree. Usage is reported per turn relative to `begin_turn`.
+    """
+
+    _IO_KEYS = ("rchar", "wchar", "read_bytes", "write_bytes")
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.enabled = PROC_AVAILABLE
+        self.samples = 0
+        self.pids_seen: set[int] = set()
+        self._task: asyncio.Task | None = None
+        self._cpu = (0.0, 0.0)
+        self._io = dict.fromkeys(self._IO_KEYS, 0)
+        self._turn_cpu = (0.0, 0.0)
+        self._turn_io = dict(self._io)
+        self._turn_rss_peak = 0
+        self._turn_started = time.monotonic()
+        # The kernel high-water mark (VmHWM) covers a whole process lifetime, so it is only a
+        # valid per-turn peak for the first window of a process.
+        self._first_window = True
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self.sample()
+        self._turn_started = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self.sample()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        if not self.enabled:
+            return
+        pending, tree = [self.pid], []
+        while pending:
+            pid = pending.pop()
+            tree.append(pid)
+            pending.extend(_children(pid))
+
+        user = system = 0.0
+        rss_total = hwm_max = 0
+        io = dict.fromkeys(self._IO_KEYS, 0)
+        for pid in tree:
+            cpu = _read_stat(pid)
+            if cpu is None:
+                continue
+            self.pids_seen.add(pid)
+            user += cpu[0]
+            system += cpu[1]
+            rss, hwm = _read_status(pid)
+            rss_total += rss
+            hwm_max = max(hwm_max, hwm)
+            counters = _read_io(pid)
+            for key in self._IO_KEYS:
+                io[key] += counters.get(key, 0)
+
+        if not self.pids_seen:
+            return
+        self.samples += 1
+        # Children that exit between samples fold into their parent; keep the totals monotonic.
+        self._cpu = (max(self._cpu[0], user), max(self._cpu[1], system))
+        self._io = {key: max(self._io[key], io[key]) for key in self._IO_KEYS}
+        peak = max(rss_total, hwm_max) if self._first_window else rss_total
+        self._turn_rss_peak = max(self._turn_rss_peak, peak)
+
+    def begin_turn(self):
+        """Start a new accounting window, e.g. when a persistent process receives a new prompt."""
+        self._first_window = False
+        self.sample()
+        self._turn_cpu = self._cpu
+        self._turn_io = dict(self._io)
+        self._turn_rss_peak = 0
+        self._turn_started = time.monotonic()
+
+    def turn_summary(self) -> dict[str, Any] | None:
+        """Resource usage since the last `begin_turn`, suitable to attach to `turn.completed`."""
+        if not self.enabled:
+            return None
+        self.sample()
+        user = self._cpu[0] - self._turn_cpu[0]
+        system = self._cpu[1] - self._turn_cpu[1]
+        summary = {
+            "wall_s": round(time.monotonic() - self._turn_started, 3),
+            "cpu_user_s": round(user, 3),
+            "cpu_system_s": round(system, 3),
+            "cpu_total_s": round(user + system, 3),
+            "rss_peak_bytes": self._turn_rss_peak,
+            "processes": len(self.pids_seen),
+            "samples": self.samples,
+        }
+        for key in self._IO_KEYS:
+            summary[key] = self._io[key] - self._turn_io[key]
+        logger.debug(f"Process {self.pid} turn usage: {summary}")
+        return summary
@@ -1,25 +1,27 @@
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Optional
 from collections import OrderedDict
 import json
+import threading
+import orjson
 from loguru import logger
-from anycode_py.configs import CODEX_SESSION_DIR
+from anycode_py.configs import CODEX_SESSION_DIR, HISTORY_CACHE_BYTES, HISTORY_PAGE_SIZE
 
 from functools import lru_cache
 import ast
-from anycode_py.utils.jsonl_utis import load_jsonl
+from anycode_py.utils.jsonl_utis import iter_lines_reversed, load_jsonl
 
 
 @lru_cache
-def _find_all_session_jsonl_path() -> List[Path]:
+def _find_all_session_jsonl_path() -> list[Path]:
     paths = list(CODEX_SESSION_DIR.rglob("*.jsonl"))
     # p.stat().st_mtime 获取文件的最后修改时间戳
     return sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True)
 
 
-def _extract_text_from_message(message: str | List) -> str:
+def _extract_text_from_message(message: str | list) -> str:
     text = message
-    if isinstance(message, List):
+    if isinstance(message, list):
         text = text[0].get("text", str(text))
     elif isinstance(message, str):
         try:
@@ -40,6 +42,10 @@ def _extract_session_id(session_jsonl_path: Path) -> str:
     logger.warning(f"Failed to extract session_id from {session_jsonl_path}")
 
 
+class HistoryLoadCancelled(Exception):
+    """A history read was abandoned because its ``cancelled`` event was set."""
+
+
 class CodexSessionManager(object):
     """Codex 会话管理器 - 懒加载设计"""
 
@@ -47,20 +53,23 @@ class CodexSessionManager(object):
         self.session_jsonl_path = _find_all_session_jsonl_path()
         self.session_id_map = {path: _extract_session_id(path) for path in self.session_jsonl_path}
         # Simple LRU cache with max size 20 to cap memory usage.
-        self._cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._cache: OrderedDict[str, list[dict]] = OrderedDict()
         self._cache_limit = 20
+        # Newest history page per session: (file size when read, messages, before, bytes), LRU
+        # within HISTORY_CACHE_BYTES. Filled from the prefetcher's thread too, hence the lock.
+        self._page_cache: OrderedDict[str, tuple[int, list[dict], Optional[int], int]] = OrderedDict()
+        self._page_cache_bytes = 0
+        self._page_cache_budget = HISTORY_CACHE_BYTES
+        self._page_lock = threading.Lock()
+        self.page_hits = 0
+        self.page_misses = 0
 
-    def load_session(self, session_id: str) -> Optional[List[Dict]]:
+    def load_session(self, session_id: str) -> Optional[list[dict]]:
         if session_id in self._cache:
             # Touch the key to mark it as recently used.
             self._cache.move_to_end(session_id)
             return self._cache[session_id]
-        target_path = None
-        for json_path in self.session_jsonl_path:
-            if session_id in str(json_path):
-                target_path = json_path
-                break
-
+        target_path = self._session_path(session_id)
         if not target_path:
             return None
         try:
@@ -102,24 +111,137 @@ class CodexSessionManager(object):
     # {"timestamp":"2025-12-10T05:10:44.551Z","type":"event_msg","payload":{"type":"token_count","info":{"total_token_usage":{"input_tokens":3110,"cached_input_tokens":2048,"output_tokens":334,"reasoning_output_tokens":256,"total_tokens":3444},"last_token_usage":{"input_tokens":3110,"cached_input_tokens":2048,"output_tokens":334,"reasoning_output_tokens":256,"total_tokens":3444},"model_context_window":258400},"rate_limits":{"primary":null,"secondary":null,"credits":null}}}
     # {"timestamp":"2025-12-10T05:11:17.684Z","type":"event_msg","payload":{"type":"agent_reasoning","text":"**系统概况**\n\n- OS: Darwin 24.6.0 (arm64)  \n- 负载: 运行时间13:10，2用户，负载较高，11.32 9.11 8.93  \n- 磁盘: 根分区926Gi，总用10Gi (3%)，可用约500Gi  \n- 内存: vm_stat显示空闲约2万页 (320MB)，活动约18.5万页 (3GB)，非活动约18.4万页 (3GB)，有线约18.8万页 (3GB)，压缩页约186万 (30GB，表示较重压缩使用)  \n- 其他: Homebrew shellenv尝试调用/bin/ps时因权限受限出现“Operation not permitted”警告，但不影响信息采集  \n\n如需更详细的进程或资源占用分析，可以让我运行top -l 1或其他命令辅助查看。"}}
 
-    def _simple_format(self, session_data: List[Dict]) -> List[Dict]:
+    def _session_path(self, session_id: str) -> Optional[Path]:
+        for json_path in self.session_jsonl_path:
+            if session_id in str(json_path):
+                return json_path
+        return None
+
+    @staticmethod
+    def _format_record(data: dict) -> Optional[dict]:
+        payload = data.get("payload", {})
+        role = payload.get("role", "")
+        if not role:
+            return None
+        content = _extract_text_from_message(payload.get("content", ""))
+        return {"role": role, "content": str(content)}
+
+    def _simple_format(self, session_data: list[dict]) -> list[dict]:
         filtered_data = []
         for data in session_data:
-            payload = data.get("payload", {})
-            role = payload.get("role", "")
-            content = payload.get("content", "")
-            if role:
-                # if role == "user":
-                # logger.debug(f"content:\n{content}")
-                content = _extract_text_from_message(content)
-                # logger.debug(f"content:\n{content}")
-                filtered_data.append({"role": role, "content": str(content)})
+            message = self._format_record(data)
+            if message:
+                filtered_data.append(message)
         return filtered_data
 
-    def load_chat_history(self, session_id: str) -> Optional[List[Dict]]:
+    def load_chat_history(self, session_id: str) -> Optional[list[dict]]:
         return self._simple_format(self.load_session(session_id=session_id))
 
-    def get_session_list(self, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+    def load_chat_history_page(
+        self,
+        session_id: str,
+        before: Optional[int] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        cancelled: Optional[threading.Event] = None,
+    ) -> tuple[list[dict], Optional[int]]:
+        """The last ``limit`` chat messages recorded before byte ``before`` (the end by default).
+
+        The session file is read backwards, so the newest page never parses the rest of the
+        history. Messages come oldest first, each with the byte ``offset`` of its record (a
+        stable id). The second value is the ``before`` of the previous page, None once the start
+        of the file was reached. Newest pages are served from the page cache while the file has
+        not grown; hits and misses are counted for `history_cache_stats`. Setting ``cancelled``
+        (from another thread) abandons the read mid-parse with `HistoryLoadCancelled`.
+        """
+        path = self._session_path(session_id)
+        if path is None:
+            return [], None
+        if before is not None or limit != HISTORY_PAGE_SIZE:
+            return self._read_history_page(path, before, limit, cancelled)
+        size = path.stat().st_size
+        cached = self._cached_page(session_id, size)
+        with self._page_lock:
+            if cached:
+                self.page_hits += 1
+            else:
+                self.page_misses += 1
+        if cached:
+            return cached
+        messages, next_before = self._read_history_page(path, None, limit, cancelled)
+        self._store_page(session_id, size, messages, next_before)
+        return messages, next_before
+
+    def prefetch_history_page(self, session_id: str, cancelled: Optional[threading.Event] = None) -> bool:
+        """Warm the newest page of ``session_id``; returns False if it was already cached."""
+        path = self._session_path(session_id)
+        if path is None:
+            return False
+        size = path.stat().st_size
+        if self._cached_page(session_id, size):
+            return False
+        messages, next_before = self._read_history_page(path, None, HISTORY_PAGE_SIZE, cancelled)
+        self._store_page(session_id, size, messages, next_before)
+        return True
+
+    def _cached_page(self, session_id: str, size: int) -> Optional[tuple[list[dict], Optional[int]]]:
+        with self._page_lock:
+            entry = self._page_cache.get(session_id)
+            if entry is None or entry[0] != size:
+                # Missing, or the session was written to since it was read.
+                return None
+            self._page_cache.move_to_end(session_id)
+            return list(entry[1]), entry[2]
+
+    def _store_page(self, session_id: str, size: int, messages: list[dict], next_before: Optional[int]) -> None:
+        nbytes = sum(len(message["content"]) + 64 for message in messages)
+        if nbytes > self._page_cache_budget:
+            return
+        with self._page_lock:
+            old = self._page_cache.pop(session_id, None)
+            if old is not None:
+                self._page_cache_bytes -= old[3]
+            self._page_cache[session_id] = (size, messages, next_before, nbytes)
+            self._page_cache_bytes += nbytes
+            while self._page_cache_bytes > self._page_cache_budget:
+                _, evicted = self._page_cache.popitem(last=False)
+                self._page_cache_bytes -= evicted[3]
+
+    def history_cache_stats(self) -> dict:
+        with self._page_lock:
+            lookups = self.page_hits + self.page_misses
+            return {
+                "hits": self.page_hits,
+                "misses": self.page_misses,
+                "hit_rate": self.page_hits / lookups if lookups else 0.0,
+                "entries": len(self._page_cache),
+                "bytes": self._page_cache_bytes,
+            }
+
+    def _read_history_page(
+        self, path: Path, before: Optional[int], limit: int, cancelled: Optional[threading.Event] = None
+    ) -> tuple[list[dict], Optional[int]]:
+        messages: list[dict] = []
+        for offset, line in iter_lines_reversed(path, before):
+            if cancelled is not None and cancelled.is_set():
+                raise HistoryLoadCancelled(str(path))
+            # Most records (token counts, reasoning, snapshots) carry no role; skip them unparsed.
+            if b'"role"' not in line:
+                continue
+            try:
+                message = self._format_record(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                continue
+            if message is None:
+                continue
+            message["offset"] = offset
+            messages.append(message)
+            if len(messages) == limit:
+                messages.reverse()
+                return messages, offset or None
+        messages.reverse()
+        return messages, None
+
+    def get_session_list(self, start: int = 0, end: Optional[int] = None) -> list[dict]:
         end = end or len(self.session_jsonl_path)
         selected_paths = self.session_jsonl_path[start:end]
         result = []
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterable
+from typing import Any, Callable
+
+from loguru import logger
+
+from anycode_py.configs import HISTORY_PREFETCH_DELAY
+from anycode_py.session_manager.codex.manager import CodexSessionManager
+
+
+class HistoryPrefetcher:
+    """Warms the newest history page of conversations the user is likely to open next.
+
+    `hint` replaces the wish list (latest wins): once no newer hint arrived for ``delay``
+    seconds, the sessions are read one at a time in a worker thread and stored in the session
+    manager's page cache, whose byte budget bounds what is kept. `cancel` drops the remaining
+    wishes; the controller calls it whenever a conversation is opened so prefetching never
+    competes with a foreground load. Both may be called from Flet's handler threads.
+    """
+
+    def __init__(
+        self, manager: CodexSessionManager, loop: asyncio.AbstractEventLoop, *, delay: float = HISTORY_PREFETCH_DELAY
+    ) -> None:
+        self.manager = manager
+        self.loop = loop
+        self.delay = delay
+        self.prefetched = 0
+        self.cancelled = 0
+        self._task: asyncio.Task | None = None
+
+    def hint(self, session_ids: Iterable[str | None]) -> None:
+        """Prefetch ``session_ids`` in order, replacing any earlier hint."""
+        self._call_in_loop(self._start, [session_id for session_id in session_ids if session_id])
+
+    def cancel(self) -> None:
+        self._call_in_loop(self._stop)
+
+    def _call_in_loop(self, callback: Callable[..., Any], *args: Any) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            callback(*args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _start(self, session_ids: list[str]) -> None:
+        self._stop()
+        if session_ids:
+            self._task = self.loop.create_task(self._run(session_ids))
+
+    def _stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.cancelled += 1
+        self._task = None
+
+    async def _run(self, session_ids: list[str]) -> None:
+        await asyncio.sleep(self.delay)
+        # Set on cancellation so the read in the worker thread stops mid-parse as well.
+        cancelled = threading.Event()
+        try:
+            for session_id in session_ids:
+                try:
+                    if await asyncio.to_thread(self.manager.prefetch_history_page, session_id, cancelled):
+                        self.prefetched += 1
+                except OSError as e:
+                    logger.warning(f"Prefetching session {session_id} failed: {e}")
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def join(self) -> None:
+        """Wait for the current prefetch, if any, to finish."""
+        task = self._task
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {"prefetched": self.prefetched, "cancelled": self.cancelled, **self.manager.history_cache_stats()}
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Deterministic stand-in for the Codex CLI.
+
+Speaks ``codex exec --json [resume <session_id>] -``: reads the prompt from stdin, prints
+`codex exec` JSON events on stdout and writes a rollout file under the sessions directory the
+same way Codex does, so `CodexProcessManager` and `CodexSessionManager` can be exercised without
+the real CLI or network. Options go before ``exec`` so the command still composes with the
+resume arguments `CodexProcessManager` inserts, e.g.::
+
+    CODEX_COMMAND="python anycode_py/testing/fake_codex.py --timing scale:0.1 --script turn.jsonl exec --json -"
+
+``--script`` replays either a recorded `codex exec --json` stream (one event per line, with an
+optional ``_offset`` in seconds) or a real Codex rollout JSONL, which is converted turn by turn.
+Only the standard library is used so the file can run from anywhere.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+DEFAULT_INTERVAL = 0.05
+
+
+def _default_session_dir() -> Path:
+    codex_home = os.environ.get("CODEX_HOME")
+    return (Path(codex_home) if codex_home else Path.home() / ".codex") / "sessions"
+
+
+def _parse_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+# --- Event sources -------------------------------------------------------- #
+def builtin_turn(prompt: str) -> list[dict[str, Any]]:
+    """A small but representative turn: reasoning, one command and an agent message."""
+    return [
+        {"type": "turn.started", "_offset": 0.0},
+        {
+            "type": "item.completed",
+            "_offset": 0.2,
+            "item": {"id": "item_0", "type": "reasoning", "text": "**Planning**"},
+        },
+        {
+            "type": "item.started",
+            "_offset": 0.3,
+            "item": {"id": "item_1", "type": "command_execution", "command": "ls", "status": "in_progress"},
+        },
+        {
+            "type": "item.completed",
+            "_offset": 0.4,
+            "item": {
+                "id": "item_1",
+                "type": "command_execution",
+                "command": "ls",
+                "aggregated_output": "README.md\n",
+                "exit_code": 0,
+                "status": "completed",
+            },
+        },
+        {"type": "item.completed", "_offset": 0.6, "item": {"id": "item_2", "type": "agent_message", "text": prompt}},
+        {
+            "type": "turn.completed",
+            "_offset": 0.6,
+            "usage": {"input_tokens": len(prompt), "output_tokens": len(prompt)},
+        },
+    ]
+
+
+def _is_rollout(records: list[dict[str, Any]]) -> bool:
+    return bool(records) and "payload" in records[0] and "timestamp" in records[0]
+
+
+def _tool_call_item(payload: dict[str, Any]) -> dict[str, Any]:
+    try:
+        arguments = json.loads(payload.get("arguments") or "{}")
+    except json.JSONDecodeError:
+        arguments = {}
+    command = arguments.get("command", payload.get("input", ""))
+    return {"type": "command_execution", "command": command, "status": "in_progress"}
+
+
+def _rollout_item(
+    kind: str | None, payload: dict[str, Any], calls: dict[str, dict[str, Any]]
+) -> tuple[str, dict[str, Any] | None]:
+    """The exec event type and item for one rollout record; new items have no id yet."""
+    payload_type = payload.get("type")
+    if kind == "event_msg" and payload_type == "agent_reasoning":
+        return "item.completed", {"type": "reasoning", "text": payload.get("text", "")}
+    if kind == "event_msg" and payload_type == "agent_message":
+        return "item.completed", {"type": "agent_message", "text": payload.get("message", "")}
+    if kind == "response_item" and payload_type in ("function_call", "custom_tool_call"):
+        # The id assigned by the caller is shared with the output that completes the call.
+        item = calls[payload.get("call_id", "")] = _tool_call_item(payload)
+        return "item.started", item
+    if kind == "response_item" and payload_type in ("function_call_output", "custom_tool_call_output"):
+        started = calls.pop(payload.get("call_id", ""), None)
+        if started is not None:
+            output = payload.get("output", "")
+            return "item.completed", {**started, "aggregated_output": output, "exit_code": 0, "status": "completed"}
+    return "item.completed", None
+
+
+def rollout_turns(records: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Convert a Codex rollout into `codex exec --json` events, split per user turn."""
+    turns: list[list[dict[str, Any]]] = []
+    events: list[dict[str, Any]] = []
+    start = 0.0
+    usage: dict[str, Any] = {}
+    item_index = 0
+    calls: dict[str, dict[str, Any]] = {}
+
+    def close_turn():
+        if events:
+            events.append({"type": "turn.completed", "_offset": events[-1]["_offset"], "usage": usage})
+            turns.append(list(events))
+            events.clear()
+
+    for record in records:
+        payload = record.get("payload") or {}
+        kind, payload_type = record.get("type"), payload.get("type")
+        offset = _parse_timestamp(record["timestamp"]) - start if "timestamp" in record else 0.0
+
+        if kind == "event_msg" and payload_type == "user_message":
+            close_turn()
+            start = _parse_timestamp(record["timestamp"])
+            usage, item_index, calls = {}, 0, {}
+            events.append({"type": "turn.started", "_offset": 0.0})
+            continue
+        if not events:
+            continue
+        if kind == "event_msg" and payload_type == "token_count" and payload.get("info"):
+            usage = (payload["info"].get("last_token_usage")) or usage
+            continue
+
+        event_type, item = _rollout_item(kind, payload, calls)
+        if item is None:
+            continue
+        if "id" not in item:
+            item["id"] = f"item_{item_index}"
+            item_index += 1
+        events.append({"type": event_type, "_offset": offset, "item": item})
+    close_turn()
+    return turns
+
+
+def load_turns(script: Path) -> list[list[dict[str, Any]]]:
+    with open(script, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if _is_rollout(records):
+        return rollout_turns(records)
+    # Recorded exec stream: the thread is announced by us, keep everything else.
+    events = [event for event in records if event.get("type") != "thread.started"]
+    for index, event in enumerate(events):
+        event.setdefault("_offset", index * DEFAULT_INTERVAL)
+    return [events]
+
+
+# --- Shaping -------------------------------------------------------------- #
+def pad_event(event: dict[str, Any], pad_bytes: int) -> dict[str, Any]:
+    item = event.get("item")
+    if not pad_bytes or not item:
+        return event
+    for field in ("text", "aggregated_output"):
+        value = item.get(field)
+        if isinstance(value, str) and len(value) < pad_bytes:
+            filler = "lorem ipsum dolor sit amet\n"
+            item[field] = value + (filler * (pad_bytes // len(filler) + 1))[: pad_bytes - len(value)]
+    return event
+
+
+def repeat_items(events: list[dict[str, Any]], repeat: int) -> list[dict[str, Any]]:
+    """Duplicate every item event ``repeat`` times (with distinct ids) to lengthen the stream."""
+    if repeat <= 1:
+        return events
+    result: list[dict[str, Any]] = []
+    for event in events:
+        if "item" not in event:
+            result.append(event)
+            continue
+        for copy in range(repeat):
+            clone = json.loads(json.dumps(event))
+            clone["item"]["id"] = f"{event['item'].get('id', 'item')}_{copy}"
+            result.append(clone)
+    return result
+
+
+def timing_scale(timing: str) -> float | None:
+    """Parse `--timing`: None for burst, otherwise the factor applied to recorded offsets."""
+    if timing == "burst":
+        return None
+    if timing == "real":
+        return 1.0
+    mode, _, factor = timing.partition(":")
+    if mode != "scale":
+        # argparse reports it as an invalid --timing value.
+        raise ValueError(timing)
+    return float(factor)
+
+
+# --- Session files -------------------------------------------------------- #
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def find_session(session_dir: Path, session_id: str) -> Path | None:
+    return next(session_dir.rglob(f"*{session_id}.jsonl"), None)
+
+
+def count_turns(session_path: Path) -> int:
+    with open(session_path, encoding="utf-8") as f:
+        return sum(1 for line in f if '"user_message"' in line)
+
+
+def new_session(session_dir: Path, session_id: str, cwd: str) -> Path:
+    now = datetime.now()
+    directory = session_dir / now.strftime("%Y") / now.strftime("%m") / now.strftime("%d")
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"rollout-{now.strftime('%Y-%m-%dT%H-%M-%S')}-{session_id}.jsonl"
+    meta = {"id": session_id, "timestamp": _now_iso(), "cwd": cwd, "originator": "fake_codex", "source": "exec"}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"timestamp": _now_iso(), "type": "session_meta", "payload": meta}) + "\n")
+    return path
+
+
+def append_turn(session_path: Path, prompt: str, events: list[dict[str, Any]]):
+    def record(kind: str, payload: dict[str, Any]) -> str:
+        return json.dumps({"timestamp": _now_iso(), "type": kind, "payload": payload}, ensure_ascii=False) + "\n"
+
+    lines = [
+        record(
+            "response_item",
+            {"type": "message", "role": "user", "content": [{"type": "input_text", "text": prompt}]},
+        ),
+        record("event_msg", {"type": "user_message", "message": prompt, "images": []}),
+    ]
+    for event in events:
+        item = event.get("item") or {}
+        if event["type"] == "item.completed" and item.get("type") == "agent_message":
+            text = item.get("text", "")
+            lines.append(record("event_msg", {"type": "agent_message", "message": text}))
+            lines.append(
+                record(
+                    "response_item",
+                    {"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": text}]},
+                )
+            )
+    with open(session_path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+# --- Entry point ---------------------------------------------------------- #
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="fake_codex", description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=os.environ.get("FAKE_CODEX_SCRIPT"), help="exec or rollout JSONL")
+    parser.add_argument(
+        "--timing",
+        type=timing_scale,
+        default=os.environ.get("FAKE_CODEX_TIMING", "burst"),
+        help="real | scale:<factor> | burst (default)",
+    )
+    parser.add_argument("--pad-bytes", type=int, default=int(os.environ.get("FAKE_CODEX_PAD_BYTES", "0")))
+    parser.add_argument("--repeat", type=int, default=int(os.environ.get("FAKE_CODEX_REPEAT", "1")))
+    parser.add_argument("--session-dir", type=Path, default=None)
+    parser.add_argument("--no-session", action="store_true", help="do not write rollout files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exec_parser = sub.add_parser("exec")
+    exec_parser.add_argument("--json", action="store_true")
+    exec_parser.add_argument("rest", nargs="*", help="[resume <session_id>] -")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    rest = [arg for arg in args.rest if arg != "-"]
+    session_id = rest[1] if len(rest) >= 2 and rest[0] == "resume" else None
+    prompt = sys.stdin.read().strip()
+    session_dir = args.session_dir or _default_session_dir()
+
+    session_path = None
+    turn_index = 0
+    if session_id and not args.no_session:
+        session_path = find_session(session_dir, session_id)
+        turn_index = count_turns(session_path) if session_path else 0
+    session_id = session_id or str(uuid.uuid4())
+    if session_path is None and not args.no_session:
+        session_path = new_session(session_dir, session_id, os.getcwd())
+
+    turns = load_turns(Path(args.script)) if args.script else [builtin_turn(prompt)]
+    events = repeat_items(turns[turn_index % len(turns)], args.repeat)
+
+    out = sys.stdout
+    flush_each = args.timing is not None
+    started = time.monotonic()
+    out.write(json.dumps({"type": "thread.started", "thread_id": session_id}) + "\n")
+    for event in events:
+        if args.timing is not None:
+            remaining = started + event.get("_offset", 0.0) * args.timing - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        shaped = pad_event({k: v for k, v in event.items() if k != "_offset"}, args.pad_bytes)
+        out.write(json.dumps(shaped, ensure_ascii=False) + "\n")
+        if flush_each:
+            out.flush()
+    out.flush()
+
+    if session_path is not None:
+        append_turn(session_path, prompt, events)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
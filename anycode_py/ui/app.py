@@ -6,6 +6,7 @@ from anycode_py.ui.components import theming
 from anycode_py.ui.controllers.chat_controller import ChatController
 from anycode_py.ui.models.chat import ChatModel
 from anycode_py.ui.views.main_view import ChatView
+from anycode_py.utils.event_loop import run
 
 
 async def main(page: ft.Page) -> None:
@@ -28,4 +29,4 @@ async def main(page: ft.Page) -> None:
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    run(ft.app_async(target=main))
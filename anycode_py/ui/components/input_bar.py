@@ -12,16 +12,26 @@ class InputBar:
     def __init__(self, controller: ChatController) -> None:
         self.controller = controller
         self.input_field_ref = ft.Ref[ft.TextField]()
+        self.send_button_ref = ft.Ref[ft.Container]()
+        self.stop_button_ref = ft.Ref[ft.Container]()
 
-    def build(self) -> ft.Container:
-        def on_send_click(e):
-            if self.input_field_ref.current and self.input_field_ref.current.value:
-                text = self.input_field_ref.current.value
-                self.input_field_ref.current.value = ""
-                self.controller.update_page()
-                # Run async chat send without blocking UI thread.
-                self.controller.page.run_task(self.controller.send_message, text)
+    def set_running(self, running: bool) -> None:
+        """Show the stop button next to send while a turn is running; new prompts are queued."""
+        if self.stop_button_ref.current:
+            self.stop_button_ref.current.visible = running
+
+    def _on_send_click(self, e) -> None:
+        if self.input_field_ref.current and self.input_field_ref.current.value:
+            text = self.input_field_ref.current.value
+            self.input_field_ref.current.value = ""
+            self.controller.update_page(immediate=True)
+            # Run async chat send without blocking UI thread.
+            self.controller.page.run_task(self.controller.send_message, text)
+
+    def _on_stop_click(self, e) -> None:
+        self.controller.page.run_task(self.controller.cancel_turn)
 
+    def build(self) -> ft.Container:
         def on_attach_click(e):
             self.controller.show_snackbar("Attachment feature - select files", bgcolor=theming.ACCENT_BLUE)
 
@@ -54,7 +64,7 @@ class InputBar:
             multiline=True,
             min_lines=1,
             max_lines=5,
-            on_submit=on_send_click,
+            on_submit=self._on_send_click,
         )
 
         return ft.Container(
@@ -143,15 +153,28 @@ class InputBar:
                                                 tooltip="Voice input",
                                             ),
                                             ft.Container(
+                                                ref=self.send_button_ref,
                                                 content=ft.Icon(ft.Icons.ARROW_UPWARD, size=18, color=ft.Colors.WHITE),
                                                 width=36,
                                                 height=36,
                                                 bgcolor="#1a1a1a",
                                                 border_radius=18,
                                                 alignment=ft.alignment.center,
-                                                on_click=on_send_click,
+                                                on_click=self._on_send_click,
                                                 tooltip="Send message",
                                             ),
+                                            ft.Container(
+                                                ref=self.stop_button_ref,
+                                                content=ft.Icon(ft.Icons.STOP_ROUNDED, size=18, color=ft.Colors.WHITE),
+                                                width=36,
+                                                height=36,
+                                                bgcolor="#1a1a1a",
+                                                border_radius=18,
+                                                alignment=ft.alignment.center,
+                                                on_click=self._on_stop_click,
+                                                tooltip="Stop",
+                                                visible=False,
+                                            ),
                                         ],
                                         spacing=8,
                                     ),
@@ -6,9 +6,19 @@ import flet as ft
 import pyperclip
 
 from anycode_py.ui.components import theming
+from anycode_py.ui.components.streaming_markdown import StreamingMarkdown
 from anycode_py.ui.controllers.chat_controller import ChatController
 from anycode_py.ui.models.chat import Message
 
+# Label shown above messages built from a Codex item, by `Message.kind`.
+ITEM_LABELS = {
+    "reasoning": "Thinking",
+    "command": "Ran command",
+    "file_change": "Edited files",
+    "todo": "Plan",
+    "error": "Error",
+}
+
 
 class CodeBlock:
     """Reusable code block with copy support."""
@@ -16,6 +26,17 @@ class CodeBlock:
     def __init__(self, code_text: str, language: str = "python") -> None:
         self.code_text = code_text
         self.language = language
+        self.code_view = ft.Text(
+            code_text,
+            size=13,
+            font_family="monospace",
+            color=theming.TEXT_PRIMARY,
+            selectable=True,
+        )
+
+    def set_code(self, code_text: str) -> None:
+        self.code_text = code_text
+        self.code_view.value = code_text
 
     def build(self) -> ft.Container:
         async def copy_code(e):
@@ -62,16 +83,7 @@ class CodeBlock:
                         padding=ft.padding.symmetric(horizontal=12, vertical=8),
                         border=ft.border.only(bottom=ft.BorderSide(1, theming.BORDER_COLOR)),
                     ),
-                    ft.Container(
-                        content=ft.Text(
-                            self.code_text,
-                            size=13,
-                            font_family="monospace",
-                            color=theming.TEXT_PRIMARY,
-                            selectable=True,
-                        ),
-                        padding=ft.padding.all(12),
-                    ),
+                    ft.Container(content=self.code_view, padding=ft.padding.all(12)),
                 ],
                 spacing=0,
             ),
@@ -87,6 +99,15 @@ class UserMessageBubble:
     def __init__(self, message: Message, controller: ChatController):
         self.message = message
         self.controller = controller
+        self.bubble_ref = ft.Ref[ft.Container]()
+        self.pending_label_ref = ft.Ref[ft.Text]()
+
+    def set_pending(self, pending: bool) -> None:
+        """Dim the bubble and show "Queued" while the prompt waits for the running turn."""
+        self.message.pending = pending
+        if self.bubble_ref.current and self.pending_label_ref.current:
+            self.bubble_ref.current.opacity = 0.6 if pending else 1.0
+            self.pending_label_ref.current.visible = pending
 
     def build(self) -> ft.Container:
         message_textfield = ft.Ref[ft.TextField]()
@@ -143,10 +164,12 @@ class UserMessageBubble:
                                             ),
                                         ]
                                     ),
+                                    ref=self.bubble_ref,
                                     bgcolor=theming.USER_BUBBLE_BG,
                                     border_radius=16,
                                     padding=ft.padding.all(16),
                                     width=600,
+                                    opacity=0.6 if self.message.pending else 1.0,
                                 ),
                             ]
                         ),
@@ -190,6 +213,13 @@ class UserMessageBubble:
                     ft.Row(
                         [
                             ft.Container(expand=True),
+                            ft.Text(
+                                "Queued",
+                                ref=self.pending_label_ref,
+                                size=12,
+                                color=theming.TEXT_SECONDARY,
+                                visible=self.message.pending,
+                            ),
                             ft.IconButton(
                                 ft.Icons.EDIT_OUTLINED,
                                 icon_size=16,
@@ -219,6 +249,16 @@ class AssistantMessageBlock:
     def __init__(self, message: Message, controller: ChatController):
         self.message = message
         self.controller = controller
+        self.content_view = StreamingMarkdown(
+            message.content,
+            selectable=True,
+            code_theme="atom-one-dark",
+            on_tap_link=lambda e: self.controller.show_snackbar(f"Open link: {e.data}"),
+            extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
+        )
+        self.code_block: CodeBlock | None = None
+        self.code_slot = ft.Column(spacing=0, visible=False)
+        self.container: ft.Container | None = None
 
     def build(self) -> ft.Container:
         thought_expanded = ft.Ref[ft.Column]()
@@ -276,13 +316,17 @@ class AssistantMessageBlock:
                 spacing=2,
             ),
             ft.Container(height=16),
-            ft.Markdown(
-                value=self.message.content,
-                selectable=True,
-                code_theme="atom-one-dark",
-                on_tap_link=lambda e: self.controller.show_snackbar(f"Open link: {e.data}"),
-                extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
-            ),
+        ]
+        # Codex items (reasoning, commands, ...) get a plain label instead of the answer chrome.
+        if self.message.kind in ITEM_LABELS:
+            controls = [
+                ft.Text(
+                    ITEM_LABELS[self.message.kind], size=13, color=theming.TEXT_SECONDARY, weight=ft.FontWeight.W_500
+                ),
+                ft.Container(height=8),
+            ]
+        controls += [
+            self.content_view,
             # ft.Container(height=16),
             # ft.Text(
             #     "1. Text 到底能不能交互 / 复制?",
@@ -362,9 +406,8 @@ class AssistantMessageBlock:
             # ft.Container(height=12),
         ]
 
-        if self.message.code:
-            controls.append(CodeBlock(self.message.code, self.message.language or "python").build())
-            controls.append(ft.Container(height=8))
+        self._set_code(self.message.code)
+        controls.append(self.code_slot)
 
         controls.append(
             ft.Row(
@@ -392,10 +435,36 @@ class AssistantMessageBlock:
             )
         )
 
-        return ft.Container(
+        self.container = ft.Container(
             content=ft.Column(controls, spacing=0),
             padding=ft.padding.only(left=20, right=60, top=10, bottom=20),
         )
+        return self.container
+
+    def refresh(self) -> bool:
+        """Catch up with a message that changed in place; returns True if a control changed.
+
+        Streamed content only touches the open tail of the markdown and the code block's text,
+        so the update sent for a growing message stays small.
+        """
+        changed = self.content_view.set_text(self.message.content)
+        code = self.message.code or ""
+        shown = self.code_block.code_text if self.code_block and self.code_slot.visible else ""
+        if code != shown:
+            self._set_code(code)
+            changed = True
+        return changed
+
+    def _set_code(self, code: str | None) -> None:
+        if not code:
+            self.code_slot.visible = False
+        elif self.code_block is None:
+            self.code_block = CodeBlock(code, self.message.language or "python")
+            self.code_slot.controls = [self.code_block.build(), ft.Container(height=8)]
+            self.code_slot.visible = True
+        else:
+            self.code_block.set_code(code)
+            self.code_slot.visible = True
 
     def _show_thought_dialog(self) -> None:
         page = self.controller.page
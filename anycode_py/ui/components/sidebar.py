@@ -3,21 +3,33 @@ from __future__ import annotations
 import flet as ft
 
 from anycode_py.ui.components import theming
+from anycode_py.ui.components.virtual_list import VirtualList
 from anycode_py.ui.controllers.chat_controller import ChatController
 from anycode_py.ui.models.chat import Conversation, ChatModel
 
 
+# Row padding, one line of text and the margin below it.
+_ROW_HEIGHT = 43.0
+
+
 class Sidebar:
     """Sidebar view responsible for navigation and conversation list."""
 
     def __init__(self, controller: ChatController, model: ChatModel) -> None:
         self.controller = controller
         self.model = model
-        self.conversation_list = ft.Column(
-            spacing=2,
-            scroll=ft.ScrollMode.AUTO,
+        # Rows are keyed by conversation object and built only near the viewport; selection
+        # changes restyle the affected rows in place.
+        self.conversation_rows: VirtualList[Conversation] = VirtualList(
+            self._conversation_item,
+            lambda conversation: _ROW_HEIGHT,
+            key=id,
+            version=lambda conversation: conversation.title,
+            overscan=400,
+            cache_size=96,
             on_scroll=self._on_conversation_scroll,
         )
+        self.conversation_list = self.conversation_rows.column
 
     def build(self) -> ft.Container:
         self._refresh_conversation_list()
@@ -48,9 +60,13 @@ class Sidebar:
         )
 
     def refresh(self) -> None:
-        """Rebuild conversation items and refresh the list control."""
-        self._refresh_conversation_list()
-        self.conversation_list.update()
+        """Sync the conversation list with the model, sending only what changed."""
+        changed = self._refresh_conversation_list()
+        restyled = self._restyle_rows()
+        if changed:
+            self.controller.updates.request(self.conversation_list)
+        elif restyled:
+            self.controller.updates.request(*restyled)
 
     # --- Sections ------------------------------------------------------- #
     def _top_icons(self) -> ft.Container:
@@ -173,58 +189,77 @@ class Sidebar:
         )
 
     def _conversation_item(self, conversation: Conversation) -> ft.Container:
-        row_content = [
-            ft.Text(
-                conversation.title,
-                size=14,
-                color=theming.TEXT_PRIMARY,
-                overflow=ft.TextOverflow.ELLIPSIS,
-                max_lines=1,
-                expand=True,
+        row = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Text(
+                        conversation.title,
+                        size=14,
+                        color=theming.TEXT_PRIMARY,
+                        overflow=ft.TextOverflow.ELLIPSIS,
+                        max_lines=1,
+                        expand=True,
+                    ),
+                    ft.Container(width=8, height=8, bgcolor=theming.ACCENT_BLUE, border_radius=4),
+                ],
+                spacing=8,
             ),
-        ]
-        if conversation.indicator:
-            row_content.append(
-                ft.Container(
-                    width=8,
-                    height=8,
-                    bgcolor=theming.ACCENT_BLUE,
-                    border_radius=4,
-                )
-            )
-
-        def click_handler(e):
-            # while set the other not
-            for conv in self.model.conversations:
-                conv.selected = False
-                conv.indicator = False
-            conversation.indicator = True
-            conversation.selected = True
-            self.controller.select_conversation(conversation.id or conversation.title)
-
-        return ft.Container(
-            content=ft.Row(row_content, spacing=8),
             padding=ft.padding.symmetric(horizontal=12, vertical=10),
+            margin=ft.margin.only(bottom=2),
             border_radius=8,
-            bgcolor=theming.SELECTED_BG if conversation.selected else None,
-            border=ft.border.only(left=ft.BorderSide(3, theming.ACCENT_BLUE)) if conversation.selected else None,
-            on_click=click_handler,
-            on_hover=lambda e: (
-                setattr(
-                    e.control,
-                    "bgcolor",
-                    theming.SIDEBAR_HOVER_BG
-                    if e.data == "true" and not conversation.selected
-                    else (theming.SELECTED_BG if conversation.selected else None),
-                )
-                or e.control.update()
-            )
-            if not conversation.selected
-            else None,
+            data=conversation,
+            on_click=self._on_conversation_click,
+            on_hover=self._on_conversation_hover,
         )
+        self._style_row(row)
+        return row
+
+    @staticmethod
+    def _style_row(row: ft.Container) -> bool:
+        """Apply the selection style of ``row.data``; returns True if anything changed."""
+        conversation: Conversation = row.data
+        bgcolor = theming.SELECTED_BG if conversation.selected else None
+        border = ft.border.only(left=ft.BorderSide(3, theming.ACCENT_BLUE)) if conversation.selected else None
+        indicator = row.content.controls[1]
+        unchanged = row.bgcolor == bgcolor and (row.border is None) == (border is None)
+        if unchanged and indicator.visible == conversation.indicator:
+            return False
+        row.bgcolor = bgcolor
+        row.border = border
+        indicator.visible = conversation.indicator
+        return True
+
+    def _restyle_rows(self) -> list[ft.Container]:
+        # Only built rows can be stale; rows built later read the current selection.
+        return [row for row in self.conversation_rows.cached_controls() if self._style_row(row)]
+
+    def _on_conversation_click(self, e) -> None:
+        conversation: Conversation = e.control.data
+        # while set the other not
+        for conv in self.model.conversations:
+            conv.selected = False
+            conv.indicator = False
+        conversation.indicator = True
+        conversation.selected = True
+        self.controller.select_conversation(conversation.id or conversation.title)
+
+    def _on_conversation_hover(self, e) -> None:
+        conversation: Conversation = e.control.data
+        if conversation.selected:
+            return
+        e.control.bgcolor = theming.SIDEBAR_HOVER_BG if e.data == "true" else None
+        e.control.update()
+        # Leaving the row withdraws the hint, so passing over rows does not read them.
+        self.controller.prefetch_conversation(conversation.id if e.data == "true" else None)
 
-    def _refresh_conversation_list(self) -> None:
-        self.conversation_list.controls = [self._conversation_item(conv) for conv in self.model.conversations]
+    def _refresh_conversation_list(self) -> bool:
+        rows = self.conversation_rows
+        conversations = self.model.conversations
+        loaded = len(rows)
+        if loaded and len(conversations) > loaded and conversations[loaded - 1] is rows.items[-1]:
+            # Another page was loaded: only the new rows are considered.
+            return rows.extend(conversations[loaded:])
+        return rows.set_items(conversations, at_end=False)
 
     def _on_conversation_scroll(self, e: ft.OnScrollEvent) -> None:
         """Load more conversations when near the bottom."""
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import flet as ft
+
+# A list item line, at any nesting depth.
+_LIST_ITEM = re.compile(r"[ \t]*(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)")
+# A link reference definition, `[label]: url`; its label resolves anywhere in the message.
+_LINK_DEFINITION = re.compile(r"^ {0,3}\[[^\]\n]+\]:[ \t]*\S", re.MULTILINE)
+
+
+def _fence_marker(line: str) -> str | None:
+    """The opening fence (``` or ~~~, possibly longer) of ``line``, None if it is not one."""
+    stripped = line.lstrip()
+    if len(line) - len(stripped) > 3 or not stripped.startswith(("```", "~~~")):
+        return None
+    char = stripped[0]
+    return stripped[: len(stripped) - len(stripped.lstrip(char))]
+
+
+def _closes_fence(line: str, marker: str) -> bool:
+    stripped = line.strip()
+    return stripped.startswith(marker) and not stripped.strip(marker[0])
+
+
+class _BlockScanner:
+    """State of `split_blocks` while it walks the complete lines of the text."""
+
+    def __init__(self, text: str, start: int) -> None:
+        self.text = text
+        self.blocks: list[tuple[int, int]] = []
+        self.block_start = start
+        self.fence: str | None = None
+        # Whether the open fence started a block of its own, rather than sitting inside a list item.
+        self.fence_block = False
+        self.in_list = False
+        # End of the blank line(s) after the current block, until the next line decides on it.
+        self.blank_end: int | None = None
+
+    def line(self, line: str, begin: int, end: int) -> None:
+        if self.fence is not None:
+            if _closes_fence(line, self.fence):
+                self.fence = None
+                if self.fence_block:
+                    self._finish(end, end)
+        elif not line.strip():
+            if not self.text[self.block_start : begin].strip():
+                self.block_start = end
+            elif self.blank_end is None:
+                self.blank_end = end
+        else:
+            self._content(line, begin)
+
+    def partial_line(self, begin: int) -> None:
+        # The line being written decides as soon as its first character shows it starts a new block.
+        first = self.text[begin : begin + 1]
+        if self.blank_end is None or first in ("", " ", "\t"):
+            return
+        if not (self.in_list and first in "-+*0123456789"):
+            self._finish(self.blank_end, begin)
+
+    def _content(self, line: str, begin: int) -> None:
+        indented = line[:1] in (" ", "\t")
+        list_item = _LIST_ITEM.match(line) is not None
+        if self.blank_end is not None:
+            if not indented and not (self.in_list and list_item):
+                self._finish(self.blank_end, begin)
+            self.blank_end = None
+        marker = _fence_marker(line)
+        if marker is not None:
+            self.fence = marker
+            self.fence_block = not (self.in_list and indented)
+            if self.fence_block:
+                if self.text[self.block_start : begin].strip():
+                    self.blocks.append((self.block_start, begin))
+                self.block_start = begin
+                self.in_list = False
+        elif list_item:
+            self.in_list = True
+
+    def _finish(self, end: int, next_start: int) -> None:
+        self.blocks.append((self.block_start, end))
+        self.block_start = next_start
+        self.in_list = False
+
+
+def split_blocks(text: str, start: int = 0) -> tuple[list[tuple[int, int]], int]:
+    """Find the finalized blocks of ``text[start:]``.
+
+    A block is final once something after it can no longer change how it renders: a fenced
+    code block whose closing fence has been seen, or a paragraph (or list, quote, ...) followed
+    by a blank line and then a line that starts a new block. That line must start at column 0
+    and, after a list, must not be another list item: indented lines continue the list (nested
+    items, item paragraphs) and a further item makes the list loose, which changes how all of
+    its items render. Only complete lines are considered, except for that deciding line, whose
+    first character is usually enough. Returns the ``(begin, end)`` offsets of the finalized
+    blocks and the offset where the still-open tail starts.
+    """
+    scanner = _BlockScanner(text, start)
+    pos = start
+    while True:
+        newline = text.find("\n", pos)
+        if newline < 0:
+            break
+        scanner.line(text[pos:newline], pos, newline + 1)
+        pos = newline + 1
+    scanner.partial_line(pos)
+    return scanner.blocks, scanner.block_start
+
+
+class StreamingMarkdown(ft.Column):
+    """Markdown for text that only grows, rendered as finalized blocks plus a mutable tail.
+
+    Each finalized block (see `split_blocks`) gets its own `ft.Markdown`, which is never
+    touched again; only the tail, usually the paragraph being written, changes between updates.
+    An update therefore sends and re-parses the new block(s) and the tail instead of the whole
+    message. Text that does not extend the previous value is re-rendered from scratch, and so
+    is a message once it contains a link reference definition: its label may be used by any
+    block, so from then on the whole text renders as one `ft.Markdown`.
+    ``markdown_kwargs`` are passed to every `ft.Markdown` (style sheet, code theme, ...).
+    """
+
+    def __init__(self, value: str = "", **markdown_kwargs: Any) -> None:
+        self.markdown_kwargs = markdown_kwargs
+        self.tail = self._markdown("")
+        super().__init__(controls=[self.tail], spacing=10, tight=True)
+        self._text = ""
+        # The finalized part of ``_text``, rendered by every control but the tail.
+        self._final = ""
+        # Set once a link reference definition shows up; the text is then no longer split.
+        self._whole = False
+        if value:
+            self.set_text(value)
+
+    def _markdown(self, value: str) -> ft.Markdown:
+        return ft.Markdown(value, **self.markdown_kwargs)
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def finalized_blocks(self) -> int:
+        return len(self.controls) - 1
+
+    def reset(self) -> None:
+        self._text = ""
+        self._final = ""
+        self._whole = False
+        self.tail.value = ""
+        self.controls = [self.tail]
+
+    def set_text(self, text: str) -> bool:
+        """Render ``text``; returns True if any control changed."""
+        if text == self._text:
+            return False
+        if not text.startswith(self._final):
+            self.reset()
+        self._text = text
+        if not self._whole and _LINK_DEFINITION.search(text, len(self._final)):
+            self._whole = True
+            self._final = ""
+            self.controls = [self.tail]
+        if self._whole:
+            tail = text
+        else:
+            blocks, tail_start = split_blocks(text, len(self._final))
+            if blocks:
+                self.controls[-1:-1] = [self._markdown(text[begin:end].strip("\n")) for begin, end in blocks]
+                self._final = text[:tail_start]
+            tail = text[tail_start:]
+        if self.tail.value != tail:
+            self.tail.value = tail
+            self.tail.visible = bool(tail.strip())
+        return True
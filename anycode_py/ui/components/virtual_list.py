@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Any, Callable, Generic, TypeVar
+
+import flet as ft
+
+T = TypeVar("T")
+
+
+class VirtualList(Generic[T]):
+    """Scrollable column that only materializes controls for items near the viewport.
+
+    Every item has an estimated height; two spacer containers stand in for the items above and
+    below the rendered window, so the scroll extent matches the full list while only
+    ``overscan`` pixels beyond the viewport are built. Controls that leave the window are kept
+    in a small LRU (``cache_size``) for quick scroll-backs and dropped after that, so opening a
+    long conversation costs the same as opening a short one.
+
+    Controls are keyed by ``key(item)`` and reused as long as ``version(item)`` is unchanged,
+    so `set_items` with mostly the same items reconciles instead of rebuilding: only new or
+    changed items are built and the column is left untouched when nothing moved, which keeps
+    the update sent to the client to the actual delta.
+    """
+
+    def __init__(
+        self,
+        build_item: Callable[[T], ft.Control],
+        estimate_height: Callable[[T], float],
+        *,
+        key: Callable[[T], Hashable] = lambda item: item.id,
+        version: Callable[[T], Hashable] = lambda item: None,
+        viewport_height: float = 900.0,
+        overscan: float = 600.0,
+        cache_size: int = 64,
+        on_scroll: Callable[[Any], None] | None = None,
+    ) -> None:
+        self.build_item = build_item
+        self.estimate_height = estimate_height
+        self.key = key
+        self.version = version
+        self.viewport_height = viewport_height
+        self.overscan = overscan
+        self.cache_size = cache_size
+        self.on_scroll = on_scroll
+        self.items: list[T] = []
+        self.scroll_offset = 0.0
+        # Stick to the bottom while the user is there, like a chat transcript.
+        self.follow_tail = True
+        self.window: tuple[int, int] = (0, 0)
+        self.built = 0
+        # offsets[i] is the estimated top of item i; offsets[-1] the total height.
+        self._offsets: list[float] = [0.0]
+        self._controls: OrderedDict[Hashable, ft.Control] = OrderedDict()
+        # key -> (version, control height estimate) of the item the control was built from.
+        self._versions: dict[Hashable, Hashable] = {}
+        self._heights: dict[Hashable, tuple[Hashable, float]] = {}
+        self._top = ft.Container(height=0)
+        self._bottom = ft.Container(height=0)
+        self.column = ft.Column(
+            controls=[self._top, self._bottom],
+            spacing=0,
+            scroll=ft.ScrollMode.AUTO,
+            on_scroll=self._on_scroll,
+            on_scroll_interval=30,
+            expand=True,
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def total_height(self) -> float:
+        return self._offsets[-1]
+
+    @property
+    def materialized(self) -> int:
+        return self.window[1] - self.window[0]
+
+    # --- Items ------------------------------------------------------------ #
+    def set_items(self, items: Sequence[T], *, at_end: bool = True) -> bool:
+        """Reconcile against ``items``; by default the view is scrolled to the last item.
+
+        Returns False if the rendered controls did not change.
+        """
+        self.items = list(items)
+        self._rebuild_offsets()
+        self.follow_tail = at_end
+        self.scroll_offset = self._tail_offset() if at_end else min(self.scroll_offset, self._tail_offset())
+        return self._render()
+
+    def append(self, item: T) -> bool:
+        return self.extend([item])
+
+    def extend(self, items: Sequence[T]) -> bool:
+        """Add items at the end; costs O(len(items)) however long the list already is."""
+        total = self._offsets[-1]
+        for item in items:
+            self.items.append(item)
+            total += self._height(item)
+            self._offsets.append(total)
+        if self.follow_tail:
+            self.scroll_offset = self._tail_offset()
+        return self._render()
+
+    def prepend(self, items: Sequence[T]) -> bool:
+        """Add items at the start (e.g. older history) without moving what is on screen."""
+        if not items:
+            return False
+        before = self.total_height
+        self.items[:0] = items
+        self._rebuild_offsets()
+        self.follow_tail = False
+        self.scroll_offset += self.total_height - before
+        changed = self._render()
+        if self.column.page:
+            # The taller top spacer must reach the client before the scroll position does.
+            if changed:
+                self.column.update()
+            self.column.scroll_to(offset=self.scroll_offset, duration=0)
+        return changed
+
+    def refresh(self) -> bool:
+        """Re-render after items changed in place; only items whose version moved are rebuilt."""
+        self._rebuild_offsets()
+        return self._render()
+
+    def touch(self, item: T) -> bool:
+        """Accept an item whose control already updated itself in place.
+
+        Its cached control is kept (instead of being rebuilt for the new version) and only the
+        height estimates and window are recomputed. Returns True if the window changed.
+        """
+        key = self.key(item)
+        if key in self._controls:
+            self._versions[key] = self.version(item)
+        if not self.items or self.key(self.items[-1]) != key:
+            return self.refresh()
+        # The streaming case: only the last offset moves.
+        self._offsets[-1] = self._offsets[-2] + self._height(item)
+        if self.follow_tail:
+            self.scroll_offset = self._tail_offset()
+        return self._render()
+
+    def _height(self, item: T) -> float:
+        key, version = self.key(item), self.version(item)
+        cached = self._heights.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        height = self.estimate_height(item)
+        self._heights[key] = (version, height)
+        return height
+
+    def _rebuild_offsets(self) -> None:
+        offsets = [0.0]
+        total = 0.0
+        for item in self.items:
+            total += self._height(item)
+            offsets.append(total)
+        self._offsets = offsets
+        if len(self._heights) > 4 * len(self.items) + self.cache_size:
+            keys = {self.key(item) for item in self.items}
+            self._heights = {key: value for key, value in self._heights.items() if key in keys}
+
+    def _tail_offset(self) -> float:
+        return max(0.0, self.total_height - self.viewport_height)
+
+    # --- Windowing -------------------------------------------------------- #
+    def visible_range(self) -> tuple[int, int]:
+        """Indices [start, end) of the items within the viewport plus overscan."""
+        if not self.items:
+            return 0, 0
+        top = self.scroll_offset - self.overscan
+        bottom = self.scroll_offset + self.viewport_height + self.overscan
+        start = max(0, bisect_right(self._offsets, top) - 1)
+        end = min(len(self.items), max(start + 1, bisect_left(self._offsets, bottom)))
+        return start, end
+
+    def _control_for(self, item: T) -> ft.Control:
+        key, version = self.key(item), self.version(item)
+        control = self._controls.get(key)
+        if control is None or self._versions.get(key) != version:
+            control = self._controls[key] = self.build_item(item)
+            self._versions[key] = version
+            self.built += 1
+        self._controls.move_to_end(key)
+        return control
+
+    def _render(self) -> bool:
+        start, end = self.window = self.visible_range()
+        controls = [self._top, *(self._control_for(item) for item in self.items[start:end]), self._bottom]
+        top, bottom = self._offsets[start], self.total_height - self._offsets[end]
+        changed = (
+            self._top.height != top
+            or self._bottom.height != bottom
+            or len(controls) != len(self.column.controls)
+            or any(new is not old for new, old in zip(controls, self.column.controls))
+        )
+        if changed:
+            self._top.height = top
+            self._bottom.height = bottom
+            self.column.controls = controls
+        self._evict({self.key(item) for item in self.items[start:end]})
+        return changed
+
+    def _evict(self, keep: set) -> None:
+        while len(self._controls) > max(self.cache_size, len(keep)):
+            for key in self._controls:
+                if key not in keep:
+                    del self._controls[key]
+                    self._versions.pop(key, None)
+                    break
+            else:
+                return
+
+    def _on_scroll(self, e: Any) -> None:
+        if e.pixels is None:
+            return
+        self.scroll_offset = e.pixels
+        if e.viewport_dimension:
+            self.viewport_height = e.viewport_dimension
+        if e.max_scroll_extent is not None:
+            self.follow_tail = e.pixels >= e.max_scroll_extent - 4
+        if self._render() and self.column.page:
+            self.column.update()
+        if self.on_scroll is not None:
+            self.on_scroll(e)
+
+    def scroll_to_end(self) -> None:
+        self.follow_tail = True
+        self.scroll_offset = self._tail_offset()
+        if self._render() and self.column.page:
+            self.column.update()
+        if self.column.page:
+            self.column.scroll_to(offset=-1, duration=0)
+
+    def cached_controls(self) -> list[ft.Control]:
+        """Every built control, in and out of the window (bounded by ``cache_size``)."""
+        return list(self._controls.values())
+
+    def control_for_key(self, key: Hashable) -> ft.Control | None:
+        """The built control of an item, None if it is not materialized."""
+        return self._controls.get(key)
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from concurrent.futures import Future
 from typing import Optional, TYPE_CHECKING
 
 import flet as ft
 
+from anycode_py.ui.components import theming
 from anycode_py.ui.models.chat import ChatModel, Conversation, Message
+from anycode_py.ui.models.turn import TurnMessages
+from anycode_py.ui.update_scheduler import UpdateScheduler
 
-from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.base import BaseProcessManager
+from anycode_py.process_manager.codex_app_server import codex_manager_class
+from anycode_py.process_manager.events import decode_event
+from anycode_py.process_manager.prompt_queue import PromptQueue, QueuedPrompt, turn_events
+from anycode_py.session_manager.codex.prefetch import HistoryPrefetcher
 
 if TYPE_CHECKING:
     from anycode_py.ui.views.main_view import ChatView
@@ -19,6 +29,22 @@ class ChatController:
         self.page = page
         self.model = model
         self.view: Optional["ChatView"] = None
+        # Every UI change goes through here, so streamed events reach the client once per frame.
+        self.updates = UpdateScheduler.for_page(page)
+        # Process manager of the turn in flight, so the stop button can cancel it.
+        self.active_process: BaseProcessManager | None = None
+        # Per conversation, keyed by id(conversation): the prompt queue and the process manager
+        # its turns reuse, so queued follow-ups resume the same session back to back.
+        self.prompt_queues: dict[int, PromptQueue] = {}
+        self.processes: dict[int, BaseProcessManager] = {}
+        self.pending_messages: dict[int, Message] = {}
+        # Warms the history of hovered and neighbouring conversations so opening them is a cache hit.
+        self.prefetcher = HistoryPrefetcher(model.conversation_manager, page.loop)
+        # History load of the conversation being opened; the next selection cancels it.
+        self.select_future: Future | None = None
+        self.superseded_loads = 0
+        # Clicks are handled on Flet's worker threads.
+        self._select_lock = threading.Lock()
 
     def attach_view(self, view: "ChatView") -> None:
         self.view = view
@@ -28,48 +54,170 @@ class ChatController:
         self.model.select_model(model_name)
         if self.view:
             self.view.update_model_label(model_name)
-        self.page.update()
+        self.update_page()
 
     def select_conversation(self, session_id: str) -> None:
-        self.model.select_conversation(session_id)
+        """Open a conversation; a newer selection abandons this one before it is rendered.
+
+        The sidebar highlight moves at once, the history is read in a worker thread by a task
+        that the next selection cancels (latest wins), so clicking through rows quickly never
+        queues up loads.
+        """
+        self.prefetcher.cancel()
+        conversation = self.model.select_conversation(session_id)
         if self.view:
             self.view.refresh_sidebar()
-            self.view.refresh_messages(self.model.active_conversation)
-        self.page.update()
+        self.update_page()
+        with self._select_lock:
+            if self.select_future is not None and not self.select_future.done():
+                self.select_future.cancel()
+                self.superseded_loads += 1
+            self.select_future = self.page.run_task(self._open_conversation, conversation) if conversation else None
+
+    async def _open_conversation(self, conversation: Conversation) -> None:
+        # Set on cancellation so the read stops mid-parse instead of finishing in the background.
+        cancelled = threading.Event()
+        try:
+            # Older pages are read in the same worker until the viewport is filled and can scroll.
+            enough = self.view.fills_viewport if self.view else None
+            page = await asyncio.to_thread(self.model.read_history, conversation.id, cancelled, enough)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        if conversation is not self.model.active_conversation:
+            return
+        self.model.set_history(conversation, page)
+        if self.view:
+            self.view.refresh_messages(conversation)
+        self.update_page()
+        self.prefetcher.hint(self._neighbours(conversation.id))
+
+    def prefetch_conversation(self, session_id: str | None) -> None:
+        """Warm the history of the hovered conversation; None withdraws the hint."""
+        self.prefetcher.hint([session_id])
+
+    def _neighbours(self, session_id: str) -> list[str | None]:
+        conversations = self.model.conversations
+        for index, conversation in enumerate(conversations):
+            if conversation.id == session_id:
+                return [c.id for c in conversations[index + 1 : index + 2] + conversations[max(0, index - 1) : index]]
+        return []
 
     def load_more_conversations(self) -> None:
         """Fetch another page of conversations and refresh the sidebar."""
         added = self.model.load_more_conversations()
         if added and self.view:
             self.view.refresh_sidebar()
-            self.page.update()
+            self.update_page()
+
+    def load_older_messages(self) -> None:
+        """Prepend the previous page of the active conversation's history."""
+        conversation = self.model.active_conversation
+        older = self.model.load_older_messages(conversation) if conversation else []
+        if older and self.view:
+            self.view.prepend_messages(older)
 
     async def send_message(self, text: str) -> None:
+        """Queue ``text`` on the active conversation; it runs as soon as the current turn is done."""
         text = (text or "").strip()
         if not text:
             return
 
         message = self.model.add_message("user", text)
+        conversation = self.model.active_conversation
+        queue = self._prompt_queue(conversation)
+        message.pending = queue.busy
         if self.view:
             self.view.append_user_message(message)
+        prompt = queue.submit(text)
+        if message.pending:
+            self.pending_messages[prompt.id] = message
+
+    def _prompt_queue(self, conversation: Conversation) -> PromptQueue:
+        queue = self.prompt_queues.get(id(conversation))
+        if queue is None:
+
+            async def run_turn(prompt: QueuedPrompt) -> None:
+                await self._run_turn(conversation, queue, prompt)
 
-        process_manager: CodexProcessManager | None = None
-        session_id = self.model.active_conversation.id if self.model.active_conversation else None
+            queue = self.prompt_queues[id(conversation)] = PromptQueue(run_turn, on_state=self._on_prompt_state)
+        return queue
 
+    def _on_prompt_state(self, prompt: QueuedPrompt) -> None:
+        message = self.pending_messages.pop(prompt.id, None)
+        if message is None:
+            return
+        if self.view:
+            self.view.mark_message_sent(message)
+        else:
+            message.pending = False
+
+    async def _run_turn(self, conversation: Conversation, queue: PromptQueue, prompt: QueuedPrompt) -> None:
+        process_manager = self.processes.get(id(conversation))
+        turn = TurnMessages(self.model, conversation)
         try:
-            process_manager = await CodexProcessManager.create()
-            if session_id:
-                await process_manager.resume(session_id=session_id)
-            async for line in process_manager.chat(text):
-                self.add_assistant_reply(str(line))
+            if process_manager is None:
+                process_manager = self.processes[id(conversation)] = await codex_manager_class().create(
+                    session_id=conversation.id
+                )
+            self.active_process = process_manager
+            if self.view:
+                self.view.set_turn_running(True)
+            async for raw in turn_events(process_manager, prompt.text):
+                touched = turn.apply(decode_event(raw))
+                if touched:
+                    self._show_turn_message(conversation, *touched)
         except Exception as exc:
-            self.add_assistant_reply(f"Error: {exc}")
+            self._show_turn_message(conversation, turn.add_error(str(exc)), True)
         finally:
-            if process_manager:
-                await process_manager.close()
+            turn.close()
+            self.active_process = None
+            if process_manager and not conversation.id:
+                conversation.id = process_manager.current_session_id
+            if not queue.pending:
+                if self.view:
+                    self.view.set_turn_running(False)
+                await self._release(conversation, queue)
 
         # self.show_snackbar(f"Message sent: {text[:50]}...")
-        self.page.update()
+        self.update_page()
+
+    async def _release(self, conversation: Conversation, queue: PromptQueue) -> None:
+        """The queue drained: close the conversation's process and forget its queue.
+
+        `turn_events` stops at the terminal event, so without this the last turn would leave its
+        codex process, resource sampler and stream recorder running.
+        """
+        process_manager = self.processes.pop(id(conversation), None)
+        if process_manager is not None:
+            await process_manager.close()
+            if process_manager.recorder is not None:
+                # Joins the writer thread, so not on the event loop.
+                await asyncio.to_thread(process_manager.recorder.close)
+        # A prompt submitted while closing keeps the queue; its turn starts a fresh process.
+        if not queue.pending and self.prompt_queues.get(id(conversation)) is queue:
+            del self.prompt_queues[id(conversation)]
+
+    def _show_turn_message(self, conversation: Conversation, message: Message, added: bool) -> None:
+        """Append a new item message, or update the control of an existing one in place."""
+        if not self.view or conversation is not self.model.active_conversation:
+            return
+        if added:
+            self.view.append_assistant_message(message)
+        else:
+            self.view.update_message(message)
+
+    async def cancel_turn(self) -> None:
+        """Stop the running turn, including every command codex spawned for it.
+
+        Prompts queued behind it are kept and start right after.
+        """
+        process_manager = self.active_process
+        if process_manager is None:
+            return
+        elapsed = await process_manager.cancel()
+        if elapsed is not None:
+            self.show_snackbar(f"Stopped in {elapsed:.2f}s", bgcolor=theming.ACCENT_BLUE)
 
     def add_assistant_reply(self, text: str, code: str | None = None, language: str | None = None) -> None:
         message = self.model.add_message(
@@ -77,11 +225,12 @@ class ChatController:
         )
         if self.view:
             self.view.append_assistant_message(message)
-        self.page.update()
+        self.update_page()
 
     # --- Helpers --------------------------------------------------------- #
     def show_snackbar(self, message: str, bgcolor: str = "#4caf50") -> None:
         self.page.open(ft.SnackBar(content=ft.Text(message), bgcolor=bgcolor))
 
-    def update_page(self) -> None:
-        self.page.update()
+    def update_page(self, immediate: bool = False) -> None:
+        """Schedule a page update; ``immediate`` pushes it now (e.g. to echo user input)."""
+        self.updates.request(immediate=immediate)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import threading
+import uuid
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Callable
 
 from anycode_py.process_manager.codex import CodexProcessManager
 from anycode_py.session_manager.codex.manager import CodexSessionManager
@@ -13,9 +15,13 @@ class Message:
 
     role: str
     content: str
-    kind: str = "text"  # text | rich | code
-    language: Optional[str] = None
-    code: Optional[str] = None
+    kind: str = "text"  # text | rich | code | reasoning | command | file_change | todo | error
+    language: str | None = None
+    code: str | None = None
+    # User prompt waiting in the conversation's queue behind a running turn.
+    pending: bool = False
+    # Stable identity used by the view to key built controls.
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
 
 
 @dataclass
@@ -23,10 +29,13 @@ class Conversation:
     """Represents a chat conversation shown in the sidebar."""
 
     title: str
-    id: Optional[str] = None
+    id: str | None = None
     selected: bool = False
     indicator: bool = False
-    messages: List[Message] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=list)
+    # Byte offset in the session file before which older history is still unread; None once
+    # the whole history is loaded (or for conversations without one).
+    history_before: int | None = None
 
 
 class ChatModel:
@@ -35,7 +44,7 @@ class ChatModel:
     def __init__(self) -> None:
         self.conversation_manager = CodexSessionManager()
 
-        self.available_models: List[str] = [
+        self.available_models: list[str] = [
             "ChatGPT 5.1",
             "ChatGPT 4o",
             "ChatGPT 4",
@@ -43,13 +52,14 @@ class ChatModel:
             "GPT-3.5 Turbo",
         ]
         self.selected_model: str = self.available_models[0]
-        self.conversations: List[Conversation] = self._build_conversations()
+        self.conversations: list[Conversation] = self._build_conversations()
         self.loaded_count: int = len(self.conversations)
         self.total_sessions: int = self.conversation_manager.get_total_sessions()
         self.loading_more: bool = False
+        self.loading_history: bool = False
         # self._seed_default_messages()
 
-    def _build_conversations(self, limit: int = 20) -> List[Conversation]:
+    def _build_conversations(self, limit: int = 20) -> list[Conversation]:
         _conversations = self.conversation_manager.get_session_list(start=0, end=limit)
         conversations = [
             Conversation(title=conversation["title"], id=conversation["session_id"]) for conversation in _conversations
@@ -97,7 +107,7 @@ class ChatModel:
         conversation.messages.extend([user_message, assistant_message])
 
     @property
-    def active_conversation(self) -> Optional[Conversation]:
+    def active_conversation(self) -> Conversation | None:
         for conversation in self.conversations:
             if conversation.selected:
                 return conversation
@@ -107,17 +117,58 @@ class ChatModel:
         if model_name in self.available_models:
             self.selected_model = model_name
 
-    def select_conversation(self, session_id: str) -> None:
+    def select_conversation(self, session_id: str) -> Conversation | None:
+        """Mark ``session_id`` selected and return it; its history is read with `read_history`."""
+        selected = None
         for conversation in self.conversations:
             conversation.selected = conversation.id == session_id
-            if not conversation.selected:
-                continue
-            history = self.conversation_manager.load_chat_history(session_id)
-            messages: List[Message] = []
-            if history:
-                for item in history:
-                    messages.append(Message(role=item.get("role", ""), content=item.get("content", "")))
-            conversation.messages = messages
+            if conversation.selected:
+                selected = conversation
+        return selected
+
+    def read_history(
+        self,
+        session_id: str,
+        cancelled: threading.Event | None = None,
+        enough: Callable[[list[Message]], bool] | None = None,
+    ) -> tuple[list[Message], int | None]:
+        """The newest page of a conversation's history; safe to call from a worker thread.
+
+        Older pages are only read until ``enough`` accepts the messages (e.g. once they fill the
+        viewport, so it can be scrolled up); the rest follow as the user scrolls. Setting
+        ``cancelled`` abandons the read with `HistoryLoadCancelled`.
+        """
+        messages, before = self._history_page(session_id, cancelled=cancelled)
+        while enough is not None and before is not None and not enough(messages):
+            older, before = self._history_page(session_id, before, cancelled=cancelled)
+            messages = older + messages
+        return messages, before
+
+    def set_history(self, conversation: Conversation, page: tuple[list[Message], int | None]) -> None:
+        conversation.messages, conversation.history_before = page
+
+    def load_older_messages(self, conversation: Conversation) -> list[Message]:
+        """Prepend the page of history before the loaded messages; returns the added messages."""
+        if conversation.history_before is None or self.loading_history:
+            return []
+        self.loading_history = True
+        try:
+            older, conversation.history_before = self._history_page(conversation.id, conversation.history_before)
+            conversation.messages[:0] = older
+        finally:
+            self.loading_history = False
+        return older
+
+    def _history_page(
+        self, session_id: str, before: int | None = None, cancelled: threading.Event | None = None
+    ) -> tuple[list[Message], int | None]:
+        history, next_before = self.conversation_manager.load_chat_history_page(session_id, before, cancelled=cancelled)
+        # Ids derived from the record's byte offset keep the view's controls across reloads.
+        messages = [
+            Message(role=item.get("role", ""), content=item.get("content", ""), id=f"{session_id}:{item['offset']}")
+            for item in history
+        ]
+        return messages, next_before
 
     def load_more_conversations(self, batch_size: int = 20) -> bool:
         """Fetch the next batch of conversations; returns True if any were added."""
@@ -146,10 +197,11 @@ class ChatModel:
         role: str,
         content: str,
         kind: str = "text",
-        language: Optional[str] = None,
-        code: Optional[str] = None,
+        language: str | None = None,
+        code: str | None = None,
+        conversation: Conversation | None = None,
     ) -> Message:
-        conversation = self.active_conversation
+        conversation = conversation or self.active_conversation
         if conversation is None:
             conversation = Conversation(title="Default", selected=True)
             self.conversations.append(conversation)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from array import array
+from collections import deque
+from itertools import islice
+from typing import BinaryIO
+
+
+class OutputBuffer:
+    """Command output kept as lines: the last ``max_lines`` in memory, the rest in a temp file.
+
+    `sync` takes the cumulative ``aggregated_output`` codex sends with every update and only
+    processes what was added since the previous call. Once the ring overflows, every line is
+    also appended to an anonymous temp file with its byte offset indexed, so `read_lines` can
+    page through any range of a multi-megabyte log while memory stays bounded.
+    """
+
+    def __init__(self, max_lines: int = 2000, spill_dir: str | None = None) -> None:
+        self.max_lines = max_lines
+        self.spill_dir = spill_dir
+        self.total_chars = 0
+        self.total_lines = 0
+        self._ring: deque[str] = deque()
+        self._partial = ""
+        # Start offset of every spilled line, plus the end offset of the last one.
+        self._offsets = array("q", [0])
+        self._spill: BinaryIO | None = None
+
+    def __len__(self) -> int:
+        """Number of lines, counting an unterminated last line."""
+        return self.total_lines + (1 if self._partial else 0)
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill is not None
+
+    def sync(self, output: str) -> bool:
+        """Catch up with the full output so far; returns False if nothing was added."""
+        if len(output) == self.total_chars:
+            return False
+        if len(output) < self.total_chars:
+            # The output was replaced rather than extended.
+            self.clear()
+        self.feed(output[self.total_chars :])
+        return True
+
+    def feed(self, chunk: str) -> None:
+        self.total_chars += len(chunk)
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._append(line)
+
+    def _append(self, line: str) -> None:
+        self.total_lines += 1
+        self._ring.append(line)
+        if self._spill is not None:
+            self._write([line])
+        if len(self._ring) > self.max_lines:
+            if self._spill is None:
+                # First overflow: everything so far is still in the ring.
+                # Lives as long as the buffer and is released by `close()`, not a `with` block.
+                self._spill = tempfile.TemporaryFile(dir=self.spill_dir)  # noqa: SIM115
+                self._write(self._ring)
+            self._ring.popleft()
+
+    def _write(self, lines) -> None:
+        data = bytearray()
+        end = self._offsets[-1]
+        for line in lines:
+            encoded = line.encode("utf-8", "replace") + b"\n"
+            data += encoded
+            end += len(encoded)
+            self._offsets.append(end)
+        self._spill.seek(0, os.SEEK_END)
+        self._spill.write(data)
+
+    def tail(self, count: int) -> list[str]:
+        """The last ``count`` lines, including the unterminated one."""
+        if count <= 0:
+            return []
+        from_ring = count - 1 if self._partial else count
+        ring = self._ring
+        lines = list(islice(ring, max(0, len(ring) - from_ring), len(ring))) if from_ring else []
+        if self._partial:
+            lines.append(self._partial)
+        return lines
+
+    def read_lines(self, start: int, end: int) -> list[str]:
+        """Lines ``[start, end)``; those no longer in memory are read from the spill file."""
+        start = max(0, start)
+        end = min(end, len(self))
+        if start >= end:
+            return []
+        first_in_ring = self.total_lines - len(self._ring)
+        lines: list[str] = []
+        if start < first_in_ring:
+            disk_end = min(end, first_in_ring)
+            self._spill.seek(self._offsets[start])
+            data = self._spill.read(self._offsets[disk_end] - self._offsets[start])
+            lines = data.decode("utf-8", "replace").split("\n")[:-1]
+            start = disk_end
+        ring_end = min(end, self.total_lines) - first_in_ring
+        if ring_end > start - first_in_ring >= 0:
+            lines.extend(islice(self._ring, start - first_in_ring, ring_end))
+        if end > self.total_lines:
+            lines.append(self._partial)
+        return lines
+
+    def clear(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the spill file and drop all output; later `sync` / `feed` calls start afresh."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        # The offsets point into the closed file, so nothing indexed by them may survive it.
+        self.total_chars = 0
+        self.total_lines = 0
+        self._ring.clear()
+        self._partial = ""
+        self._offsets = array("q", [0])
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Any, Callable, ClassVar
+
+from anycode_py.process_manager.events import CodexEvent, EventKind
+from anycode_py.ui.models.chat import ChatModel, Conversation, Message
+from anycode_py.ui.models.output_buffer import OutputBuffer
+
+# Lines of command output shown under a running or finished command.
+COMMAND_OUTPUT_LINES = 40
+
+
+def _text(item: dict[str, Any], _outputs: dict[str, OutputBuffer]) -> tuple[str, str | None]:
+    return item.get("text") or "", None
+
+
+def _command(item: dict[str, Any], outputs: dict[str, OutputBuffer]) -> tuple[str, str | None]:
+    content = f"`{item.get('command', '')}`"
+    exit_code = item.get("exit_code")
+    if exit_code is not None:
+        content += f" exited with {exit_code}"
+    buffer = outputs.get(item.get("id"))
+    if buffer is None:
+        buffer = outputs[item.get("id")] = OutputBuffer(max_lines=COMMAND_OUTPUT_LINES)
+    buffer.sync(item.get("aggregated_output") or "")
+    return content, "\n".join(buffer.tail(COMMAND_OUTPUT_LINES)) or None
+
+
+def _file_change(item: dict[str, Any], _outputs: dict[str, OutputBuffer]) -> tuple[str, str | None]:
+    changes = item.get("changes") or []
+    return "\n".join(f"- {change.get('kind', 'update')} `{change.get('path', '')}`" for change in changes), None
+
+
+def _todo_list(item: dict[str, Any], _outputs: dict[str, OutputBuffer]) -> tuple[str, str | None]:
+    todos = item.get("items") or []
+    return "\n".join(f"- [{'x' if todo.get('completed') else ' '}] {todo.get('text', '')}" for todo in todos), None
+
+
+class TurnMessages:
+    """The assistant messages of one turn, one per Codex item.
+
+    `apply` folds a decoded event into the message of its ``item.id``: the first event of an
+    item adds the message to ``conversation``, later ``item.updated`` / ``item.completed``
+    events rewrite it in place. A turn therefore adds as many messages as it has logical items,
+    however many events stream in. Errors add one message each; lifecycle events
+    (thread/turn started or completed) add nothing.
+    """
+
+    # item.type -> (Message.kind, renderer returning the content and the optional code block).
+    ITEM_RENDERERS: ClassVar[dict[str | None, tuple[str, Callable[..., tuple[str, str | None]]]]] = {
+        "agent_message": ("text", _text),
+        "reasoning": ("reasoning", _text),
+        "command_execution": ("command", _command),
+        "file_change": ("file_change", _file_change),
+        "todo_list": ("todo", _todo_list),
+    }
+
+    def __init__(self, model: ChatModel, conversation: Conversation) -> None:
+        self.model = model
+        self.conversation = conversation
+        self.messages: dict[str, Message] = {}
+        self._outputs: dict[str, OutputBuffer] = {}
+
+    def apply(self, event: CodexEvent) -> tuple[Message, bool] | None:
+        """Returns the message ``event`` touched and whether it was just added, or None."""
+        if event.is_item:
+            return self._apply_item(event)
+        if event.kind in (EventKind.ERROR, EventKind.TURN_FAILED):
+            return self.add_error(self._error_message(event.raw)), True
+        return None
+
+    def _apply_item(self, event: CodexEvent) -> tuple[Message, bool] | None:
+        renderer = self.ITEM_RENDERERS.get(event.item_type)
+        if not event.item_id or renderer is None:
+            return None
+        kind, render = renderer
+        content, code = render(event.item, self._outputs)
+        message = self.messages.get(event.item_id)
+        if message is None:
+            message = self.messages[event.item_id] = self.model.add_message(
+                "assistant",
+                content,
+                kind=kind,
+                language="bash" if kind == "command" else None,
+                code=code,
+                conversation=self.conversation,
+            )
+            return message, True
+        if message.content == content and message.code == code:
+            return None
+        message.content, message.code = content, code
+        return message, False
+
+    def add_error(self, text: str) -> Message:
+        return self.model.add_message("assistant", f"Error: {text}", kind="error", conversation=self.conversation)
+
+    @staticmethod
+    def _error_message(raw: dict[str, Any]) -> str:
+        error = raw.get("error")
+        if isinstance(error, dict):
+            return error.get("message") or "Unknown error"
+        return raw.get("message") or str(error or "Unknown error")
+
+    def close(self) -> None:
+        for buffer in self._outputs.values():
+            buffer.close()
+        self._outputs.clear()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import weakref
+from typing import Any
+
+import flet as ft
+from flet.core.protocol import CommandEncoder
+from loguru import logger
+
+from anycode_py.configs import UI_COUNT_PAYLOAD, UI_UPDATE_HZ
+
+_SCHEDULERS: weakref.WeakKeyDictionary[ft.Page, UpdateScheduler] = weakref.WeakKeyDictionary()
+
+
+class UpdateScheduler:
+    """Coalesces `page.update()` calls into at most one flush per frame.
+
+    Callers `request` an update (optionally naming the dirty controls) instead of updating the
+    page themselves; the first request after an idle period is flushed on the next loop
+    iteration, later ones are batched until one frame (``1 / hz`` s) after the previous flush.
+    `flush` pushes immediately, for echoing user input. Requests may come from Flet's handler
+    threads; flushes always run on the page's event loop. ``stats()`` reports flushes and
+    requests; with ``count_payload`` (`UI_COUNT_PAYLOAD`, for debugging and benchmarks only, as
+    it re-encodes every batch) also the JSON size of what was sent. Use `for_page` to share one
+    scheduler per page.
+    """
+
+    @classmethod
+    def for_page(cls, page: ft.Page, **kwargs: Any) -> UpdateScheduler:
+        scheduler = _SCHEDULERS.get(page)
+        if scheduler is None:
+            scheduler = _SCHEDULERS[page] = cls(page, **kwargs)
+        return scheduler
+
+    def __init__(self, page: ft.Page, *, hz: float = UI_UPDATE_HZ, count_payload: bool = UI_COUNT_PAYLOAD) -> None:
+        self.page = page
+        self.interval = 1.0 / hz if hz > 0 else 0.0
+        self.count_payload = count_payload
+        self.requests = 0
+        self.flushes = 0
+        self.payload_bytes = 0
+        self.max_payload_bytes = 0
+        self._lock = threading.Lock()
+        # Dirty controls by id() in request order; None marks the whole page dirty.
+        self._dirty: dict[int, ft.Control] | None = {}
+        self._scheduled = False
+        self._handle: asyncio.TimerHandle | None = None
+        self._last_flush = 0.0
+        self._flushing = False
+        self._connection: Any = None
+
+    def request(self, *controls: ft.Control, immediate: bool = False) -> None:
+        """Mark ``controls`` (or the whole page) dirty and schedule a flush."""
+        with self._lock:
+            self.requests += 1
+            if not controls:
+                self._dirty = None
+            elif self._dirty is not None:
+                for control in controls:
+                    self._dirty[id(control)] = control
+            if immediate:
+                self._scheduled = False
+            elif self._scheduled:
+                return
+            else:
+                self._scheduled = True
+        callback = self.flush if immediate else self._arm
+        loop = self.page.loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback()
+        else:
+            # `page.update` and the timer handle belong to the loop.
+            loop.call_soon_threadsafe(callback)
+
+    def _arm(self) -> None:
+        with self._lock:
+            if self._handle is not None or not self._scheduled:
+                return
+            delay = max(0.0, self._last_flush + self.interval - time.monotonic())
+            self._handle = self.page.loop.call_later(delay, self.flush)
+
+    def flush(self) -> None:
+        """Push every pending change to the client now."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+            self._scheduled = False
+            dirty, self._dirty = self._dirty, {}
+        if dirty is not None and not dirty:
+            return
+        controls = list(dirty.values()) if dirty is not None else []
+        # Controls that are not on the page yet are only sent as part of a parent update.
+        if any(control.page is None for control in controls):
+            controls = []
+        if self.count_payload:
+            self._count_payload()
+        self._flushing = True
+        try:
+            self.page.update(*controls)
+        except Exception as e:
+            logger.warning(f"Page update failed: {e}")
+        finally:
+            self._flushing = False
+            self._last_flush = time.monotonic()
+            self.flushes += 1
+
+    def _count_payload(self) -> None:
+        # Sizes are taken from the commands handed to the connection while we flush.
+        connection = self.page.connection
+        if connection is None or connection is self._connection:
+            return
+        self._connection = connection
+        send_commands = connection.send_commands
+
+        def counting_send_commands(session_id, commands):
+            if self._flushing:
+                size = len(json.dumps(commands, cls=CommandEncoder, separators=(",", ":")))
+                self.payload_bytes += size
+                self.max_payload_bytes = max(self.max_payload_bytes, size)
+            return send_commands(session_id, commands)
+
+        connection.send_commands = counting_send_commands
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "flushes": self.flushes,
+            "coalesced": self.requests - self.flushes,
+            "payload_bytes": self.payload_bytes,
+            "max_payload_bytes": self.max_payload_bytes,
+        }
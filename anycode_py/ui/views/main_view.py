@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import weakref
+
 import flet as ft
 
 from anycode_py.ui.components import theming
@@ -7,9 +9,29 @@ from anycode_py.ui.components.header import HeaderBar
 from anycode_py.ui.components.input_bar import InputBar
 from anycode_py.ui.components.messages import AssistantMessageBlock, UserMessageBubble
 from anycode_py.ui.components.sidebar import Sidebar
+from anycode_py.ui.components.virtual_list import VirtualList
 from anycode_py.ui.controllers.chat_controller import ChatController
 from anycode_py.ui.models.chat import ChatModel, Conversation, Message
 
+# Rough layout metrics of the message components, used to size off-screen messages.
+_CHARS_PER_LINE = 80
+_LINE_HEIGHT = 20.0
+_USER_CHROME = 110.0
+_ASSISTANT_CHROME = 90.0
+_CODE_CHROME = 60.0
+
+
+def estimate_message_height(message: Message) -> float:
+    lines = sum(len(line) // _CHARS_PER_LINE + 1 for line in message.content.split("\n"))
+    height = lines * _LINE_HEIGHT + (_USER_CHROME if message.role == "user" else _ASSISTANT_CHROME)
+    if message.code:
+        height += _CODE_CHROME + (message.code.count("\n") + 1) * _LINE_HEIGHT
+    return height
+
+
+def _message_version(message: Message) -> tuple:
+    return message.role, message.kind, message.content, message.code, message.language
+
 
 class ChatView:
     """Main view that composes the sidebar, chat area and input bar."""
@@ -21,7 +43,19 @@ class ChatView:
         self.header = HeaderBar(controller, model)
         self.sidebar = Sidebar(controller, model)
         self.input_bar = InputBar(controller)
-        self.message_column = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
+        # Only messages near the viewport get controls, so long sessions open in constant time.
+        self.message_list: VirtualList[Message] = VirtualList(
+            self._build_message,
+            estimate_message_height,
+            version=_message_version,
+            on_scroll=self._on_message_scroll,
+        )
+        self.message_column = self.message_list.column
+        # Bubbles of queued prompts, keyed by message id, until their turn starts.
+        self.pending_bubbles: dict[str, UserMessageBubble] = {}
+        # Built assistant blocks by message id, so streamed items update their control in place.
+        # Weak: a block goes away with its control once the list evicts it.
+        self.assistant_blocks: weakref.WeakValueDictionary[str, AssistantMessageBlock] = weakref.WeakValueDictionary()
         controller.attach_view(self)
 
     def build(self) -> ft.Row:
@@ -50,26 +84,64 @@ class ChatView:
 
     # --- View update helpers -------------------------------------------- #
     def refresh_messages(self, conversation: Conversation | None) -> None:
-        self.message_column.controls.clear()
-        if conversation is None:
-            return
-        for message in conversation.messages:
-            if message.role == "user":
-                self.append_user_message(message, update=False)
-            else:
-                self.append_assistant_message(message, update=False)
-        self.controller.update_page()
+        """Reconcile the message list with ``conversation``; unchanged messages keep their controls."""
+        self.pending_bubbles = {key: bubble for key, bubble in self.pending_bubbles.items() if bubble.message.pending}
+        if self.message_list.set_items(conversation.messages if conversation else []):
+            self.controller.update_page()
+        self.message_list.scroll_to_end()
+
+    def fills_viewport(self, messages: list[Message]) -> bool:
+        """Whether ``messages`` are tall enough to scroll; history reads stop there. Thread-safe."""
+        return sum(map(estimate_message_height, messages)) >= self.message_list.viewport_height
+
+    def _on_message_scroll(self, e: ft.OnScrollEvent) -> None:
+        # Within a screen of the top: read the previous page of history, if there is one.
+        conversation = self.model.active_conversation
+        if conversation and conversation.history_before is not None and e.pixels < self.message_list.viewport_height:
+            self.controller.load_older_messages()
+
+    def prepend_messages(self, messages: list[Message]) -> None:
+        self.message_list.prepend(messages)
+
+    def _build_message(self, message: Message) -> ft.Control:
+        if message.role != "user":
+            block = self.assistant_blocks[message.id] = AssistantMessageBlock(message, self.controller)
+            return block.build()
+        bubble = UserMessageBubble(message, self.controller)
+        if message.pending:
+            self.pending_bubbles[message.id] = bubble
+        return bubble.build()
 
     def append_user_message(self, message: Message, update: bool = True) -> None:
-        self.message_column.controls.append(UserMessageBubble(message, self.controller).build())
+        self.message_list.append(message)
         if update:
+            self.controller.update_page(immediate=True)
+
+    def mark_message_sent(self, message: Message) -> None:
+        message.pending = False
+        bubble = self.pending_bubbles.pop(message.id, None)
+        if bubble:
+            bubble.set_pending(False)
             self.controller.update_page()
 
     def append_assistant_message(self, message: Message, update: bool = True) -> None:
-        self.message_column.controls.append(AssistantMessageBlock(message, self.controller).build())
+        self.message_list.append(message)
         if update:
             self.controller.update_page()
 
+    def update_message(self, message: Message) -> None:
+        """Show a message that changed in place (a streamed Codex item) without rebuilding it."""
+        block = self.assistant_blocks.get(message.id)
+        changed = bool(block and block.refresh())
+        if self.message_list.touch(message):
+            self.controller.update_page()
+        elif changed and block.container is not None:
+            self.controller.updates.request(block.container)
+
+    def set_turn_running(self, running: bool) -> None:
+        self.input_bar.set_running(running)
+        self.controller.update_page()
+
     def refresh_sidebar(self) -> None:
         self.sidebar.refresh()
 
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any, TypeVar
+
+from loguru import logger
+
+from ..configs import USE_UVLOOP
+
+T = TypeVar("T")
+
+
+def loop_factory(use_uvloop: bool = USE_UVLOOP) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """uvloop's loop factory when requested and importable, otherwise None (the default loop)."""
+    if not use_uvloop:
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("USE_UVLOOP is set but uvloop is not installed, using the default event loop")
+        return None
+    return uvloop.new_event_loop
+
+
+def run(main: Coroutine[Any, Any, T], *, use_uvloop: bool = USE_UVLOOP) -> T:
+    """`asyncio.run` on uvloop when `USE_UVLOOP` is enabled (``pip install AnyCode-Py[uvloop]``)."""
+    with asyncio.Runner(loop_factory=loop_factory(use_uvloop)) as runner:
+        return runner.run(main)
@@ -1,8 +1,46 @@
+import os
+from collections.abc import Iterator
 from pathlib import Path
 import orjson
-from typing import List, Dict
+from typing import Optional
 
 
-def load_jsonl(path: Path) -> List[Dict]:
+def load_jsonl(path: Path) -> list[dict]:
     with open(path, "r", encoding="utf-8") as f:
         return [orjson.loads(line) for line in f]
+
+
+def iter_lines_reversed(
+    path: Path, end: Optional[int] = None, chunk_size: int = 64 * 1024
+) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(offset, line)`` for the non-blank lines before byte ``end`` (EOF by default), last first.
+
+    The file is read backwards in ``chunk_size`` blocks, so the newest records of a large JSONL
+    file cost only the bytes they take. ``offset`` is where the line starts; pass it back as
+    ``end`` to continue with the lines before it.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        # Pieces of the line that straddles the blocks read so far, last piece first.
+        carry: list[bytes] = []
+        while pos > 0:
+            size = min(chunk_size, pos)
+            pos -= size
+            f.seek(pos)
+            lines = f.read(size).split(b"\n")
+            if len(lines) == 1:
+                carry.append(lines[0])
+                continue
+            cursor = pos + size
+            for index in range(len(lines) - 1, 0, -1):
+                line = lines[index]
+                cursor -= len(line)
+                if index == len(lines) - 1 and carry:
+                    line += b"".join(reversed(carry))
+                if line.strip():
+                    yield cursor, line
+                cursor -= 1
+            carry = [lines[0]]
+        line = b"".join(reversed(carry))
+        if line.strip():
+            yield 0, line
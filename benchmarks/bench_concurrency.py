@@ -0,0 +1,171 @@
+"""Concurrent load benchmark for the codex process managers.
+
+Drives N concurrent `CodexProcessManager.chat()` streams (1 to 256 by default) against the
+local replay stand-in `anycode_py/testing/fake_codex.py` and reports, per concurrency level:
+aggregate events/sec, p50/p99 time-to-first-event, event-loop lag and parent-process CPU.
+
+    python -m benchmarks.bench_concurrency --levels 1,16,256 --output bench.json
+    python -m benchmarks.bench_concurrency --compare bench.json
+
+Reports are JSON tagged with the git revision, so runs from two commits can be diffed with
+``--compare`` (the baseline report is printed side by side with the current run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.metrics import LoopLagMonitor, percentile
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FAKE_CODEX = ROOT_DIR / "anycode_py" / "testing" / "fake_codex.py"
+DEFAULT_LEVELS = "1,2,4,8,16,32,64,128,256"
+
+
+def git_revision() -> str:
+    git = shutil.which("git")
+    if git is None:
+        return "unknown"
+    try:
+        # A fixed argv without a shell; only the resolved path of `git` comes from the environment.
+        return subprocess.check_output([git, "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()  # noqa: S603
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def fake_codex_command(timing: str, repeat: int, pad_bytes: int) -> list[str]:
+    return [
+        sys.executable,
+        str(FAKE_CODEX),
+        "--no-session",
+        "--timing",
+        timing,
+        "--repeat",
+        str(repeat),
+        "--pad-bytes",
+        str(pad_bytes),
+        "exec",
+        "--json",
+        "-",
+    ]
+
+
+async def run_stream(turns: int, sample_interval: float) -> dict[str, Any]:
+    manager = CodexProcessManager()
+    manager.sample_interval = sample_interval
+    first_events: list[float] = []
+    events = 0
+    try:
+        for turn in range(turns):
+            started = time.perf_counter()
+            first = None
+            async for _ in manager.chat(f"turn {turn}"):
+                if first is None:
+                    first = time.perf_counter() - started
+                events += 1
+            if first is not None:
+                first_events.append(first)
+    finally:
+        await manager.close()
+    return {"events": events, "first_event_s": first_events}
+
+
+async def run_level(concurrency: int, turns: int, sample_interval: float) -> dict[str, Any]:
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    async with LoopLagMonitor() as lag:
+        results = await asyncio.gather(*(run_stream(turns, sample_interval) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    events = sum(result["events"] for result in results)
+    first_events = [value for result in results for value in result["first_event_s"]]
+    parent_cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    return {
+        "concurrency": concurrency,
+        "turns": concurrency * turns,
+        "events": events,
+        "wall_s": wall,
+        "events_per_s": events / wall if wall else 0.0,
+        "first_event_p50_s": percentile(first_events, 50),
+        "first_event_p99_s": percentile(first_events, 99),
+        "loop_lag": lag.summary(),
+        "parent_cpu_s": parent_cpu,
+        "parent_cpu_pct": 100 * parent_cpu / wall if wall else 0.0,
+    }
+
+
+def format_row(level: dict[str, Any]) -> str:
+    lag = level["loop_lag"]
+    return (
+        f"{level['concurrency']:>5} {level['events_per_s']:>11.0f} "
+        f"{1000 * (level['first_event_p50_s'] or 0):>9.1f} {1000 * (level['first_event_p99_s'] or 0):>9.1f} "
+        f"{1000 * (lag['p99_s'] or 0):>9.2f} {1000 * (lag['max_s'] or 0):>9.2f} {level['parent_cpu_pct']:>7.1f}"
+    )
+
+
+HEADER = f"{'N':>5} {'events/s':>11} {'ttfe p50':>9} {'ttfe p99':>9} {'lag p99':>9} {'lag max':>9} {'cpu %':>7}"
+
+
+def print_report(report: dict[str, Any], baseline: dict[str, Any] | None = None):
+    print(f"revision {report['revision']}  python {report['python']}  ({report['config']})")
+    print(HEADER + "   (times in ms)")
+    baseline_levels = {level["concurrency"]: level for level in (baseline or {}).get("levels", [])}
+    for level in report["levels"]:
+        print(format_row(level))
+        previous = baseline_levels.get(level["concurrency"])
+        if previous is not None:
+            print(format_row(previous) + f"   <- {baseline['revision']}")
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    codex_module.CODEX_COMMAND = fake_codex_command(args.timing, args.repeat, args.pad_bytes)
+    levels = []
+    for concurrency in (int(value) for value in args.levels.split(",")):
+        level = await run_level(concurrency, args.turns, args.sample_interval)
+        print(format_row(level), file=sys.stderr)
+        levels.append(level)
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "loop": type(asyncio.get_running_loop()).__module__,
+        "config": f"timing={args.timing} repeat={args.repeat} pad_bytes={args.pad_bytes} turns={args.turns}",
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="comma separated concurrency levels")
+    parser.add_argument("--turns", type=int, default=2, help="sequential turns per stream")
+    parser.add_argument("--timing", default="burst", help="fake codex timing: real | scale:<f> | burst")
+    parser.add_argument("--repeat", type=int, default=20, help="fake codex item repetitions per turn")
+    parser.add_argument("--pad-bytes", type=int, default=1024)
+    parser.add_argument("--sample-interval", type=float, default=0.0, help="/proc sampler interval, 0 disables")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report to print alongside")
+    args = parser.parse_args()
+
+    print(HEADER, file=sys.stderr)
+    report = asyncio.run(main_async(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Event-loop lag while `read_stream` decodes multi-megabyte events, inline vs off-loop.
+
+Streams ``--events`` `command_execution` events whose ``aggregated_output`` is about
+``--output-bytes`` of log-like text (newlines, quotes, non-ASCII, so it is escape heavy like
+real diffs and command output) from ``cat`` through `BaseProcessManager.read_stream`, under a
+`LoopLagMonitor`, interleaved with small events. ``cat`` keeps the child's CPU use negligible,
+so the lag is the parent's own. ``inline`` decodes every line on the loop; ``offload`` sends
+lines of at least `DECODE_OFFLOAD_BYTES` to a worker thread.
+
+    python -m benchmarks.bench_decode_offload --output-bytes 8000000 --events 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from anycode_py.configs import DECODE_OFFLOAD_BYTES
+from anycode_py.process_manager.base import BaseProcessManager
+from anycode_py.process_manager.metrics import LoopLagMonitor
+
+MODES = {"inline": math.inf, "offload": DECODE_OFFLOAD_BYTES}
+
+
+def write_stream(path: Path, events: int, output_bytes: int):
+    log_line = 'INFO  "ok"  ünïcode ✓ path/to/file.py:42 -> done\n'
+    output = log_line * (output_bytes // len(log_line.encode()))
+    with path.open("w") as f:
+        for index in range(events):
+            item = {"id": f"item_{index}", "type": "command_execution", "aggregated_output": output}
+            f.write(json.dumps({"type": "item.completed", "item": item}) + "\n")
+            small = {"id": f"msg_{index}", "type": "agent_message", "text": "done"}
+            f.write(json.dumps({"type": "item.completed", "item": small}) + "\n")
+
+
+async def stream(offload_bytes: float, path: Path) -> dict:
+    manager = BaseProcessManager(["cat", str(path)], sample_interval=0)
+    manager.decode_offload_bytes = offload_bytes
+    await manager.ensure_started()
+    events = 0
+    started = time.perf_counter()
+    async with LoopLagMonitor(interval=0.005) as lag:
+        async for _ in manager.read_stream():
+            events += 1
+    wall = time.perf_counter() - started
+    await manager.close()
+    return {"events": events, "wall_s": wall, **lag.summary()}
+
+
+async def main_async(args: argparse.Namespace):
+    results: dict[str, list[dict]] = {mode: [] for mode in MODES}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "stream.jsonl"
+        write_stream(path, args.events, args.output_bytes)
+        for _ in range(args.rounds):
+            for mode, offload_bytes in MODES.items():
+                results[mode].append(await stream(offload_bytes, path))
+    print(f"{args.events} events of {args.output_bytes / 1e6:.1f} MB, medians over {args.rounds} rounds")
+    print(f"{'mode':>8} {'wall s':>8} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}")
+    for mode, runs in results.items():
+        wall, p50, p99, worst = (
+            statistics.median(run[key] or 0 for run in runs) for key in ("wall_s", "p50_s", "p99_s", "max_s")
+        )
+        print(f"{mode:>8} {wall:>8.3f} {1000 * p50:>7.1f}ms {1000 * p99:>7.1f}ms {1000 * worst:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-bytes", type=int, default=8_000_000)
+    parser.add_argument("--events", type=int, default=10, help="large events per stream")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Microbenchmark: Codex events/sec through decoding and `CodexWidgetFactory` dispatch.
+
+Builds a synthetic turn (reasoning, commands and agent messages streamed as
+item.started / item.updated* / item.completed) and measures:
+
+- ``decode``:  `decode_event` into slotted `CodexEvent` objects
+- ``legacy``:  the former `chunk.get("type")` / `chunk.get("item", {})` if/elif routing
+- ``typed``:   decode + `EventKind` handler table + widget class lookup
+- ``factory``: decode + `CodexWidgetFactory.create_widget` (builds Flet controls)
+
+``legacy`` and ``typed`` stop short of rendering, so they isolate the routing cost the
+decoding layer replaces; ``factory`` shows what widget construction adds on top.
+
+    python -m benchmarks.bench_event_dispatch --events 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+from anycode_py.process_manager.events import ITEM_KINDS, CodexEvent, EventKind, decode_event
+from flet_chat.widgets.factory import CodexWidgetFactory
+
+ITEM_TYPES = ("reasoning", "command_execution", "agent_message", "todo_list")
+
+
+def synthetic_stream(count: int, updates_per_item: int = 8) -> list[dict[str, Any]]:
+    events: list[dict[str, Any]] = [{"type": "thread.started", "thread_id": "t"}, {"type": "turn.started"}]
+    item_index = 0
+    while len(events) < count - 1:
+        item_type = ITEM_TYPES[item_index % len(ITEM_TYPES)]
+        item = {"id": f"item_{item_index}", "type": item_type, "text": "x" * 64}
+        events.append({"type": "item.started", "item": item})
+        events.extend({"type": "item.updated", "item": item} for _ in range(updates_per_item))
+        events.append({"type": "item.completed", "item": item})
+        item_index += 1
+    events = events[: count - 1]
+    events.append({"type": "turn.completed", "usage": {}})
+    return events
+
+
+# The former `create_widget` item-type chain; unknown types fell back to "assistant".
+_LEGACY_ITEM_WIDGETS = {
+    "reasoning": "reasoning",
+    "command_execution": "command",
+    "agent_message": "assistant",
+    "file_change": "edit",
+    "todo_list": "todo",
+}
+
+
+def legacy_widget_class(chunk: dict[str, Any]) -> Any:
+    """The former `create_widget` lookup, re-reading `type` / `item` / `id` from the dict."""
+    event_type = chunk.get("type")
+    if event_type in ["turn.completed", "turn.failed", "error"]:
+        return "system"
+    elif event_type in ["item.started", "item.updated", "item.completed"]:
+        item = chunk.get("item", {})
+        if not item.get("id"):
+            return None
+        return _LEGACY_ITEM_WIDGETS.get(item.get("type"), "assistant")
+    return None
+
+
+def legacy_router() -> Callable[[dict[str, Any]], Any]:
+    """The former `ChatApp.handle_submit` routing, minus widget rendering."""
+    active_items: dict[str, Any] = {}
+
+    def route(chunk: dict[str, Any]) -> Any:
+        event_type = chunk.get("type")
+        if event_type in ["item.started", "item.updated", "item.completed"]:
+            item_data = chunk.get("item", {})
+            item_id = item_data.get("id")
+            if not item_id:
+                return None
+            if item_id in active_items:
+                return active_items[item_id], event_type == "item.completed"
+            active_items[item_id] = legacy_widget_class(chunk)
+            return active_items[item_id]
+        elif event_type in ["turn.completed", "thread.started", "error", "turn.failed", "response_item"]:
+            return legacy_widget_class(chunk)
+        return None
+
+    return route
+
+
+def typed_router() -> Callable[[dict[str, Any]], Any]:
+    """`ChatApp` routing on decoded events: one table lookup per event."""
+    active_items: dict[str, Any] = {}
+
+    def on_item(event: CodexEvent) -> Any:
+        if not event.item_id:
+            return None
+        widget = active_items.get(event.item_id)
+        if widget is not None:
+            return widget, event.is_completed
+        widget = active_items[event.item_id] = CodexWidgetFactory.ITEM_WIDGETS.get(event.item_type)
+        return widget
+
+    def on_system(event: CodexEvent) -> Any:
+        return CodexWidgetFactory.EVENT_BUILDERS.get(event.kind)
+
+    handlers = dict.fromkeys(ITEM_KINDS, on_item)
+    handlers.update(dict.fromkeys((EventKind.TURN_COMPLETED, EventKind.TURN_FAILED, EventKind.ERROR), on_system))
+
+    def route(chunk: dict[str, Any]) -> Any:
+        event = decode_event(chunk)
+        handler = handlers.get(event.kind)
+        return handler(event) if handler else None
+
+    return route
+
+
+def measure(name: str, fn: Callable[[dict[str, Any]], Any], stream: list[dict[str, Any]], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for chunk in stream:
+            fn(chunk)
+        best = min(best, time.perf_counter() - started)
+    rate = len(stream) / best
+    print(f"{name:>10}: {rate:>12,.0f} events/s  ({1e9 / rate:,.0f} ns/event)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--factory-events", type=int, default=5_000, help="events for the widget-building pass")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    stream = synthetic_stream(args.events)
+    measure("decode", decode_event, stream, args.rounds)
+    measure("legacy", legacy_router(), stream, args.rounds)
+    measure("typed", typed_router(), stream, args.rounds)
+    measure("factory", CodexWidgetFactory.create_widget, synthetic_stream(args.factory_events), 1)
+
+
+if __name__ == "__main__":
+    main()
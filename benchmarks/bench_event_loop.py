@@ -0,0 +1,91 @@
+"""`read_stream` throughput and spawn latency on the default asyncio loop vs uvloop.
+
+Each loop runs in its own `asyncio.Runner` in this process, uvloop through the same factory
+as `anycode_py.utils.event_loop`. Spawn latency times `create_subprocess_exec` of a trivial
+executable. Throughput streams a burst from `anycode_py/testing/fake_codex.py` through
+`BaseProcessManager.read_stream`.
+
+    pip install uvloop
+    python -m benchmarks.bench_event_loop --spawns 200 --repeat 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import shutil
+import sys
+import time
+from typing import Any
+
+from anycode_py.process_manager.base import BaseProcessManager
+from anycode_py.process_manager.metrics import percentile
+from anycode_py.utils.event_loop import loop_factory
+
+from .bench_concurrency import fake_codex_command
+
+TRUE = shutil.which("true") or "/bin/true"
+
+
+async def spawn_latency(spawns: int) -> list[float]:
+    latencies = []
+    for _ in range(spawns):
+        started = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(TRUE)
+        latencies.append(time.perf_counter() - started)
+        await proc.wait()
+    return latencies
+
+
+async def stream_throughput(repeat: int, pad_bytes: int) -> tuple[int, float]:
+    manager = BaseProcessManager(fake_codex_command("burst", repeat, pad_bytes), sample_interval=0)
+    await manager.ensure_started()
+    await manager.send("bench", close_stdin=True)
+    events = 0
+    started = time.perf_counter()
+    async for _ in manager.read_stream():
+        events += 1
+    wall = time.perf_counter() - started
+    await manager.close()
+    return events, wall
+
+
+async def measure(args: argparse.Namespace) -> dict[str, Any]:
+    latencies = await spawn_latency(args.spawns)
+    walls = []
+    for _ in range(args.rounds):
+        events, wall = await stream_throughput(args.repeat, args.pad_bytes)
+        walls.append(wall)
+    wall = sorted(walls)[len(walls) // 2]
+    return {
+        "loop": type(asyncio.get_running_loop()).__module__,
+        "spawn_p50_ms": 1000 * percentile(latencies, 50),
+        "spawn_p99_ms": 1000 * percentile(latencies, 99),
+        "events": events,
+        "events_per_s": events / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spawns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5000, help="fake codex item repetitions per stream")
+    parser.add_argument("--pad-bytes", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=5, help="streams per loop, the median is reported")
+    args = parser.parse_args()
+
+    factories = {"asyncio": None, "uvloop": loop_factory(use_uvloop=True)}
+    if factories["uvloop"] is None:
+        del factories["uvloop"]
+    print(f"{'loop':>8} {'spawn p50':>10} {'spawn p99':>10} {'events/s':>10}   (python {sys.version.split()[0]})")
+    for name, factory in factories.items():
+        with asyncio.Runner(loop_factory=factory) as runner:
+            result = runner.run(measure(args))
+        print(
+            f"{name:>8} {result['spawn_p50_ms']:>8.2f}ms {result['spawn_p99_ms']:>8.2f}ms "
+            f"{result['events_per_s']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Overhead of the raw stream recorder on `CodexProcessManager.chat()` throughput.
+
+Streams bursts from the replay stand-in `anycode_py/testing/fake_codex.py` with recording off,
+on, and on with gzip, interleaving the modes across rounds, and reports the median
+throughput of each mode and its overhead relative to recording off.
+
+    python -m benchmarks.bench_recorder --rounds 7 --repeat 2000 --pad-bytes 1024
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.recorder import StreamRecorder
+
+from .bench_concurrency import fake_codex_command
+
+MODES = ("off", "plain", "gzip")
+
+
+async def stream_once(mode: str, directory: Path) -> tuple[int, int, float]:
+    manager = CodexProcessManager()
+    manager.sample_interval = 0
+    if mode != "off":
+        manager.recorder = StreamRecorder(directory, compress=mode == "gzip")
+    events = 0
+    started = time.perf_counter()
+    async for _ in manager.chat("bench"):
+        events += 1
+    wall = time.perf_counter() - started
+    await manager.close()
+    recorded = 0
+    if manager.recorder is not None:
+        # Draining happens off the loop; close() here only makes the files complete.
+        manager.recorder.close()
+        recorded = manager.recorder.recorded_bytes
+    return events, recorded, wall
+
+
+async def main_async(args: argparse.Namespace):
+    codex_module.CODEX_COMMAND = fake_codex_command("burst", args.repeat, args.pad_bytes)
+    walls: dict[str, list[float]] = {mode: [] for mode in MODES}
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(args.rounds):
+            for mode in MODES:
+                events, recorded, wall = await stream_once(mode, Path(directory))
+                walls[mode].append(wall)
+    baseline = statistics.median(walls["off"])
+    print(f"{events} events per turn, {recorded / 1e6:.1f} MB recorded per turn (last gzip run)")
+    print(f"{'mode':>6} {'median s':>9} {'events/s':>11} {'overhead':>9}")
+    for mode in MODES:
+        median = statistics.median(walls[mode])
+        print(f"{mode:>6} {median:>9.3f} {events / median:>11.0f} {100 * (median / baseline - 1):>8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=2000, help="fake codex item repetitions per turn")
+    parser.add_argument("--pad-bytes", type=int, default=1024)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
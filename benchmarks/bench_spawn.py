@@ -0,0 +1,83 @@
+"""Spawn latency as the parent's RSS grows: the previous spawn arguments vs `BaseProcessManager`'s.
+
+A Flet app has a large heap, and `fork()` copies its page tables, so spawn time would grow
+with RSS; CPython's `vfork()` path does not copy them. For each ballast size this spawns a
+trivial executable ``--spawns`` times in two ways:
+
+- ``baseline``: the arguments `BaseProcessManager` used before, a fresh ``{**os.environ, **env}``
+  copy per manager, a bare executable name and a new session, without `preexec_fn`.
+- ``manager``: `BaseProcessManager` with no env overrides and no limits, so the environment
+  is inherited and the executable is resolved once.
+
+Both sides are eligible for vfork, so this measures what the copy and the PATH lookup cost.
+
+    python -m benchmarks.bench_spawn --rss-mb 0,256,1024,2048
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import resource
+import time
+from asyncio.subprocess import PIPE, STDOUT
+
+from anycode_py.process_manager.base import BaseProcessManager
+from anycode_py.process_manager.metrics import percentile
+
+
+async def spawn_baseline(spawns: int) -> list[float]:
+    latencies = []
+    for _ in range(spawns):
+        started = time.perf_counter()
+        # What `{**os.environ, **(env or {})}` built for every manager.
+        env = {**os.environ}
+        proc = await asyncio.create_subprocess_exec(
+            "true", stdin=PIPE, stdout=PIPE, stderr=STDOUT, env=env, start_new_session=True
+        )
+        latencies.append(time.perf_counter() - started)
+        await proc.wait()
+    return latencies
+
+
+async def spawn_manager(spawns: int) -> list[float]:
+    latencies = []
+    for _ in range(spawns):
+        started = time.perf_counter()
+        manager = BaseProcessManager(["true"], sample_interval=0)
+        await manager.ensure_started()
+        latencies.append(time.perf_counter() - started)
+        await manager.proc.wait()
+    return latencies
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def main_async(args: argparse.Namespace):
+    ballast: list[bytearray] = []
+    print(f"{'rss MB':>7} {'base p50':>9} {'base p99':>9} {'mgr p50':>9} {'mgr p99':>9}   (ms)")
+    for target in (int(value) for value in args.rss_mb.split(",")):
+        while rss_mb() < target:
+            # Filled rather than zeroed, so the pages are really resident.
+            ballast.append(bytearray(b"\x01") * (64 * 1024 * 1024))
+        baseline = await spawn_baseline(args.spawns)
+        manager = await spawn_manager(args.spawns)
+        print(
+            f"{rss_mb():>7.0f} {1000 * percentile(baseline, 50):>9.2f} {1000 * percentile(baseline, 99):>9.2f} "
+            f"{1000 * percentile(manager, 50):>9.2f} {1000 * percentile(manager, 99):>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rss-mb", default="0,256,1024,2048", help="comma separated parent RSS targets")
+    parser.add_argument("--spawns", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@ import json
 from dotenv import load_dotenv
 
 load_dotenv()
-from anycode_py.process_manager.codex import CodexProcessManager
+# anycode_py.configs reads the environment on import, so .env has to be loaded first.
+from anycode_py.process_manager.codex import CodexProcessManager  # noqa: E402
+from anycode_py.utils.event_loop import run  # noqa: E402
 from loguru import logger
 
 
@@ -16,6 +18,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
-
-    asyncio.run(main())
+    run(main())
@@ -1,9 +1,13 @@
 import asyncio
 from typing import Optional, Dict
-from datetime import datetime
 import flet as ft
 from loguru import logger
-from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.base import BaseProcessManager
+from anycode_py.process_manager.codex_app_server import codex_manager_class
+from anycode_py.process_manager.bus import EventBus, OverflowPolicy
+from anycode_py.process_manager.events import CodexEvent, EventKind
+from anycode_py.process_manager.prompt_queue import PromptQueue, QueuedPrompt, turn_events
+from anycode_py.ui.update_scheduler import UpdateScheduler
 from .widgets.factory import CodexWidgetFactory
 from .widgets.base import CodexWidget
 from .widgets.message_bubbles import UserMessageBubble
@@ -15,9 +19,23 @@ class ChatApp(ft.Row):
 
     def __init__(self, page: ft.Page):
         self.page = page
-        self.codex: Optional[CodexProcessManager] = None
-        self.is_processing = False
+        # Streamed events mark the page dirty; it is pushed to the client once per frame.
+        self.updates = UpdateScheduler.for_page(page)
+        self.codex: Optional[BaseProcessManager] = None
+        # Prompts submitted while a turn is running wait here and run back to back on self.codex.
+        self.prompt_queue = PromptQueue(self._run_turn, on_state=self._on_prompt_state)
+        self.pending_bubbles: dict[int, UserMessageBubble] = {}
         self.active_items: Dict[str, CodexWidget] = {}
+        self._event_handlers = {
+            EventKind.ITEM_STARTED: self._on_item_event,
+            EventKind.ITEM_UPDATED: self._on_item_event,
+            EventKind.ITEM_COMPLETED: self._on_item_event,
+            EventKind.TURN_COMPLETED: self._on_system_event,
+            EventKind.THREAD_STARTED: self._on_system_event,
+            EventKind.TURN_FAILED: self._on_system_event,
+            EventKind.ERROR: self._on_system_event,
+            EventKind.RESPONSE_ITEM: self._on_response_item,
+        }
 
         # --- Sidebar Components ---
 
@@ -307,105 +325,117 @@ class ChatApp(ft.Row):
     def _on_new_conversation_click(self, e):
         # Reset UI
         self.chat_list_view.controls.clear()
-        self.page.update()
+        self.updates.request()
         if self.codex:
             self.page.run_task(self.new_conversation, e)
 
     async def initialize_codex(self):
         if not self.codex:
             try:
-                self.codex = await CodexProcessManager.create()
+                self.codex = await codex_manager_class().create()
                 logger.info("Codex initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Codex: {e}")
                 self.chat_list_view.controls.append(ft.Text(f"Error: {e}", color="red"))
-                self.page.update()
+                self.updates.request()
 
     async def handle_submit(self, e):
-        logger.info(f"Submit triggered. Processing: {self.is_processing}")
-        if self.is_processing:
-            return
-        text = self.input_field.value
-        logger.info(f"Input text: {text}")
-        if not text or not text.strip():
+        text = (self.input_field.value or "").strip()
+        logger.info(f"Submit triggered. Queue: {self.prompt_queue.stats()}")
+        if not text:
             return
 
         self.input_field.value = ""
-        self.is_processing = True
-        self.page.update()
-
-        self.chat_list_view.controls.append(UserMessageBubble(text.strip()))
-        self.page.update()
-
+        pending = self.prompt_queue.busy
+        bubble = UserMessageBubble(text, pending=pending)
+        self.chat_list_view.controls.append(bubble)
+        prompt = self.prompt_queue.submit(text)
+        if pending:
+            self.pending_bubbles[prompt.id] = bubble
+        self.updates.request(immediate=True)
+
+    def _on_prompt_state(self, prompt: QueuedPrompt):
+        bubble = self.pending_bubbles.pop(prompt.id, None)
+        if bubble is not None:
+            bubble.set_pending(False)
+            self.updates.request()
+
+    async def _run_turn(self, prompt: QueuedPrompt):
         await self.initialize_codex()
         if not self.codex:
             logger.error("Codex init failed")
-            self.is_processing = False
-            self.page.update()
             return
 
         self.active_items = {}
         try:
             logger.info("Starting chat stream...")
-            async for chunk in self.codex.chat(text.strip()):
-                event_type = chunk.get("type")
-                logger.debug(f"Received chunk: {event_type}")
-
-                if event_type in ["item.started", "item.updated", "item.completed"]:
-                    item_data = chunk.get("item", {})
-                    item_id = item_data.get("id")
-                    logger.debug(f"Item event {event_type}: {item_data}")
-                    if not item_id:
-                        continue
-
-                    if item_id in self.active_items:
-                        self.active_items[item_id].update_data(item_data, is_completed=(event_type == "item.completed"))
-                        self.page.update()
-                    else:
-                        # Some providers may send item.completed without item.started.
-                        widget = CodexWidgetFactory.create_widget(chunk)
-                        if widget:
-                            self.active_items[item_id] = widget
-                            self.chat_list_view.controls.append(widget)
-                            # 初始化 widget 数据
-                            widget.update_data(item_data, is_completed=(event_type == "item.completed"))
-                            self.page.update()
-                            logger.info(f"Added widget for item {item_id} ({item_data.get('type')})")
-
-                elif event_type in ["turn.completed", "thread.started", "error", "turn.failed"]:
-                    item_id = f"sys_{event_type}_{datetime.now().timestamp()}"
-                    widget = CodexWidgetFactory.create_widget(chunk)
-                    if widget:
-                        self.chat_list_view.controls.append(widget)
-                        # 对系统事件也需要初始化数据
-                        widget.update_data(chunk, is_completed=True)
-                        self.page.update()
-
-                elif event_type == "response_item":
-                    # 处理 response_item 事件
-                    widget = CodexWidgetFactory.create_widget(chunk)
-                    if widget:
-                        self.chat_list_view.controls.append(widget)
-                        # 提取文本数据并初始化 widget
-                        payload = chunk.get("payload", {})
-                        content_list = payload.get("content", [])
-                        text = ""
-                        if isinstance(content_list, list):
-                            for c in content_list:
-                                if c.get("type") in ["text", "input_text", "output_text"]:
-                                    text += c.get("text", "")
-                        widget.update_data({"text": text}, is_completed=True)
-                        self.page.update()
-
-                await asyncio.sleep(0.005)
+            # The UI subscriber coalesces item updates, so slow rendering never stalls the codex pipe.
+            bus = EventBus()
+            ui_events = bus.subscribe("ui", policy=OverflowPolicy.COALESCE)
+            pump = asyncio.create_task(bus.pump(turn_events(self.codex, prompt.text)))
+            try:
+                async for event in ui_events:
+                    logger.debug(f"Received event: {event!r}")
+                    handler = self._event_handlers.get(event.kind)
+                    if handler:
+                        handler(event)
+                    # Let the scheduled flush run between events.
+                    await asyncio.sleep(0)
+                await pump
+            finally:
+                pump.cancel()
+                logger.debug(f"Event bus: {bus.stats()}")
         except Exception as ex:
-            logger.exception(f"Chat error: {ex}")
             self.chat_list_view.controls.append(ft.Text(f"Error: {ex}", color="red"))
+            raise
         finally:
-            self.is_processing = False
-            self.page.update()
+            self.updates.request()
+
+    # --- Event dispatch (EventKind -> handler) ---
+
+    def _on_item_event(self, event: CodexEvent):
+        if not event.item_id:
+            return
+        widget = self.active_items.get(event.item_id)
+        if widget:
+            widget.update_data(event.item, is_completed=event.is_completed)
+            self.updates.request()
+            return
+        # Some providers may send item.completed without item.started.
+        widget = CodexWidgetFactory.create_widget(event)
+        if widget:
+            self.active_items[event.item_id] = widget
+            self.chat_list_view.controls.append(widget)
+            # 初始化 widget 数据
+            widget.update_data(event.item, is_completed=event.is_completed)
+            self.updates.request()
+            logger.info(f"Added widget for item {event.item_id} ({event.item_type})")
+
+    def _on_system_event(self, event: CodexEvent):
+        widget = CodexWidgetFactory.create_widget(event)
+        if widget:
+            self.chat_list_view.controls.append(widget)
+            # 对系统事件也需要初始化数据
+            widget.update_data(event.raw, is_completed=True)
+            self.updates.request()
+
+    def _on_response_item(self, event: CodexEvent):
+        widget = CodexWidgetFactory.create_widget(event)
+        if widget:
+            self.chat_list_view.controls.append(widget)
+            # 提取文本数据并初始化 widget
+            content_list = event.raw.get("payload", {}).get("content", [])
+            text = ""
+            if isinstance(content_list, list):
+                for c in content_list:
+                    if c.get("type") in ["text", "input_text", "output_text"]:
+                        text += c.get("text", "")
+            widget.update_data({"text": text}, is_completed=True)
+            self.updates.request()
 
     async def new_conversation(self, e=None):
+        await self.prompt_queue.close()
+        self.pending_bubbles.clear()
         if self.codex:
             await self.codex.close()
             self.codex = None
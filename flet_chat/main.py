@@ -1,5 +1,6 @@
 import flet as ft
 from dotenv import load_dotenv
+from anycode_py.utils.event_loop import run
 from .app import ChatApp
 
 load_dotenv()
@@ -28,4 +29,4 @@ async def main(page: ft.Page):
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    run(ft.app_async(target=main))
@@ -1,5 +1,7 @@
 import flet as ft
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from anycode_py.ui.components.streaming_markdown import StreamingMarkdown
+from anycode_py.ui.models.output_buffer import OutputBuffer
 from ..styles import CallistoColors
 from .base import CodexWidget
 
@@ -29,8 +31,7 @@ class ReasoningWidget(CodexWidget):
         )
 
         # Details (Collapsed by default)
-        self.details_view = ft.Markdown(
-            "",
+        self.details_view = StreamingMarkdown(
             extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
             selectable=True,
             md_style_sheet=ft.MarkdownStyleSheet(p_text_style=ft.TextStyle(size=13, color="#444444")),
@@ -59,7 +60,7 @@ class ReasoningWidget(CodexWidget):
 
     def update_data(self, data: Dict[str, Any], is_completed: bool = False):
         text = data.get("text", "")
-        self.details_view.value = text
+        self.details_view.set_text(text)
 
         if is_completed:
             # Mock duration
@@ -71,23 +72,50 @@ class ReasoningWidget(CodexWidget):
 class CommandWidget(CodexWidget):
     """
     命令行执行
+    输出保存在 OutputBuffer 中: 实时只显示最后 LIVE_LINES 行, 更早的输出按页读取,
+    渲染开销与输出大小无关。
     """
 
+    LIVE_LINES = 40
+    PAGE_LINES = 200
+
     def __init__(self, item_id: str):
         super().__init__(item_id)
         self.bgcolor = "transparent"
         self.padding = ft.padding.symmetric(vertical=5)
 
+        self.output = OutputBuffer()
+        # None: 跟随最新输出; 否则为当前查看页的起始行
+        self.page_start: Optional[int] = None
+
         self.cmd_text = ft.Text(
             "", font_family="Consolas, monospace", color="#333333", weight=ft.FontWeight.W_500, size=13
         )
-        self.output_view = ft.Markdown(
-            "",
-            code_theme=ft.MarkdownCodeTheme.GITHUB,
-            extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
-            md_style_sheet=ft.MarkdownStyleSheet(
-                code_text_style=ft.TextStyle(font_family="Consolas, monospace", size=12)
+        self.output_view = ft.Text(
+            "", font_family="Consolas, monospace", size=12, color="#333333", selectable=True, no_wrap=False
+        )
+        self.range_text = ft.Text("", size=11, color="#999999")
+        self.earlier_button = ft.TextButton("Earlier", on_click=self.show_earlier, visible=False)
+        self.later_button = ft.TextButton("Later", on_click=self.show_later, visible=False)
+        self.live_button = ft.TextButton("Latest", on_click=self.show_live, visible=False)
+        self.output_container = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Container(
+                        content=self.output_view,
+                        bgcolor="#F3F3F3",
+                        border_radius=6,
+                        padding=ft.padding.symmetric(horizontal=10, vertical=8),
+                    ),
+                    ft.Row(
+                        [self.range_text, self.earlier_button, self.later_button, self.live_button],
+                        spacing=4,
+                    ),
+                ],
+                spacing=2,
             ),
+            padding=ft.padding.only(left=22),
+            visible=False,  # 有输出时才显示
         )
 
         self.status_icon = ft.Icon(ft.Icons.CIRCLE_OUTLINED, size=14, color="#999999")
@@ -103,11 +131,7 @@ class CommandWidget(CodexWidget):
                         ],
                         spacing=8,
                     ),
-                    ft.Container(
-                        content=self.output_view,
-                        padding=ft.padding.only(left=22),
-                        visible=False,  # Hide output initially for cleaner look? Or show? Let's show empty if no output.
-                    ),
+                    self.output_container,
                 ]
             ),
             padding=10,
@@ -116,14 +140,57 @@ class CommandWidget(CodexWidget):
             bgcolor="#FAFAFA",
         )
 
+    def will_unmount(self):
+        # 从页面移除 (或会话关闭) 时释放溢出的临时文件
+        self.output.close()
+
+    def _render_output(self):
+        total = len(self.output)
+        if self.page_start is None:
+            lines = self.output.tail(self.LIVE_LINES)
+            first = total - len(lines)
+        else:
+            first = self.page_start
+            lines = self.output.read_lines(first, first + self.PAGE_LINES)
+        self.output_view.value = "\n".join(lines)
+        if first > 0 or self.page_start is not None:
+            self.range_text.value = f"Lines {first + 1}-{first + len(lines)} of {total}"
+        else:
+            self.range_text.value = ""
+        self.earlier_button.visible = first > 0
+        self.later_button.visible = self.page_start is not None and first + len(lines) < total - self.LIVE_LINES
+        self.live_button.visible = self.page_start is not None
+
+    def show_earlier(self, e=None):
+        total = len(self.output)
+        current = self.page_start if self.page_start is not None else max(0, total - self.LIVE_LINES)
+        self.page_start = max(0, current - self.PAGE_LINES)
+        self._render_output()
+        self.safe_update()
+
+    def show_later(self, e=None):
+        if self.page_start is None:
+            return
+        self.page_start += self.PAGE_LINES
+        if self.page_start + self.PAGE_LINES >= len(self.output):
+            self.page_start = None
+        self._render_output()
+        self.safe_update()
+
+    def show_live(self, e=None):
+        self.page_start = None
+        self._render_output()
+        self.safe_update()
+
     def update_data(self, data: Dict[str, Any], is_completed: bool = False):
         if "command" in data:
             self.cmd_text.value = data["command"]
 
-        output = data.get("aggregated_output", "")
-        if output:
-            self.output_view.value = f"```bash\n{output}\n```"
-            self.content.content.controls[1].visible = True
+        output = data.get("aggregated_output") or ""
+        if self.output.sync(output):
+            self.output_container.visible = True
+            # 翻看历史时不打断阅读, 只更新行数
+            self._render_output()
 
         if is_completed:
             exit_code = data.get("exit_code")
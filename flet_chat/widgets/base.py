@@ -2,6 +2,8 @@ import flet as ft
 from typing import Any, Dict
 from abc import ABC, abstractmethod
 
+from anycode_py.ui.update_scheduler import UpdateScheduler
+
 
 class CodexWidget(ft.Container):
     """
@@ -23,9 +25,8 @@ class CodexWidget(ft.Container):
         pass
 
     def safe_update(self):
-        """安全更新，避免未添加到 page 时报错"""
-        try:
-            self.update()
-        except Exception:
+        """安全更新，避免未添加到 page 时报错; 通过 UpdateScheduler 合并到下一帧"""
+        if self.page is None:
             # 忽略 "Control must be added to the page first"
-            pass
+            return
+        UpdateScheduler.for_page(self.page).request(self)
@@ -1,5 +1,6 @@
 import flet as ft
 from typing import Any, Dict
+from anycode_py.ui.components.streaming_markdown import StreamingMarkdown
 from ..styles import CallistoColors, TextStyles
 from .base import CodexWidget
 
@@ -11,25 +12,40 @@ class UserMessageBubble(ft.Container):
     - 右侧对齐
     """
 
-    def __init__(self, content: str):
+    def __init__(self, content: str, pending: bool = False):
+        # Shown under the bubble while the prompt waits in the queue behind a running turn.
+        self.pending_label = ft.Text("Queued", size=12, color=CallistoColors.TEXT_TERTIARY, visible=pending)
         super().__init__(
-            content=ft.Container(
-                content=ft.Markdown(
-                    content,
-                    selectable=True,
-                    extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
-                    code_theme=ft.MarkdownCodeTheme.MONOKAI,
-                    md_style_sheet=ft.MarkdownStyleSheet(p_text_style=TextStyles.MSG_USER),
-                ),
-                padding=ft.padding.symmetric(horizontal=20, vertical=12),
-                bgcolor=CallistoColors.BUBBLE_USER_BG,
-                border_radius=24,
-                width=None,  # Auto width
+            content=ft.Column(
+                [
+                    ft.Container(
+                        content=ft.Markdown(
+                            content,
+                            selectable=True,
+                            extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
+                            code_theme=ft.MarkdownCodeTheme.MONOKAI,
+                            md_style_sheet=ft.MarkdownStyleSheet(p_text_style=TextStyles.MSG_USER),
+                        ),
+                        padding=ft.padding.symmetric(horizontal=20, vertical=12),
+                        bgcolor=CallistoColors.BUBBLE_USER_BG,
+                        border_radius=24,
+                        width=None,  # Auto width
+                    ),
+                    self.pending_label,
+                ],
+                spacing=4,
+                horizontal_alignment=ft.CrossAxisAlignment.END,
+                tight=True,
             ),
             alignment=ft.alignment.center_right,
             padding=ft.padding.only(bottom=20),
+            opacity=0.6 if pending else 1.0,
         )
 
+    def set_pending(self, pending: bool):
+        self.pending_label.visible = pending
+        self.opacity = 0.6 if pending else 1.0
+
 
 class AssistantMessageWidget(CodexWidget):
     """
@@ -43,8 +59,8 @@ class AssistantMessageWidget(CodexWidget):
         super().__init__(item_id)
         self.padding = ft.padding.only(bottom=20)
 
-        self.text_view = ft.Markdown(
-            "",
+        # 流式渲染: 已完成的段落/代码块只发送一次, 只有末尾段落随更新变化
+        self.text_view = StreamingMarkdown(
             selectable=True,
             extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
             code_theme=ft.MarkdownCodeTheme.MONOKAI_SUBLIME,
@@ -78,8 +94,8 @@ class AssistantMessageWidget(CodexWidget):
 
     def update_data(self, data: Dict[str, Any], is_completed: bool = False):
         text = data.get("text", "")
-        self.text_view.value = text
-        self.safe_update()
+        if self.text_view.set_text(text):
+            self.safe_update()
 
 
 class SystemInfoWidget(CodexWidget):
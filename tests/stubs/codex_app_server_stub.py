@@ -0,0 +1,114 @@
+"""Local stand-in for `codex app-server` used by the process manager tests.
+
+Speaks the line-delimited JSON-RPC protocol: answers `initialize`, `thread/start`,
+`thread/resume` and `turn/start`, then streams turn notifications. The first notification of
+every turn is written *before* the `turn/start` response to exercise client-side buffering.
+Each agent message echoes the prompt together with the server pid and its thread/turn counters
+so tests can tell whether the process and thread were reused. Threads must be opened with an
+approval policy and a sandbox. The prompt ``run`` streams a command's output first, ``approve``
+asks the client for a command approval and echoes its decision, ``late`` sends one more delta
+after its turn completed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+threads_opened = 0
+turns_started = 0
+
+
+def emit(message: dict) -> None:
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def handle_turn(request_id: int, params: dict) -> None:
+    global turns_started
+    turns_started += 1
+    thread_id = params["threadId"]
+    turn_id = f"turn_{turns_started}"
+    prompt = "".join(part.get("text", "") for part in params.get("input", []))
+    item_id = f"msg_{turns_started}"
+    reply = f"{prompt}|pid={os.getpid()}|threads={threads_opened}|turns={turns_started}"
+
+    emit({"method": "turn/started", "params": {"threadId": thread_id, "turn": {"id": turn_id}}})
+    emit({"id": request_id, "result": {"turn": {"id": turn_id, "status": "inProgress"}}})
+    if prompt == "run":
+        run_command(thread_id, turn_id)
+    elif prompt == "approve":
+        approval = {"threadId": thread_id, "turnId": turn_id, "itemId": "cmd"}
+        emit({"id": "approval", "method": "item/commandExecution/requestApproval", "params": approval})
+        response = json.loads(sys.stdin.readline())
+        reply = f"decision={(response.get('result') or {}).get('decision')}"
+    emit(
+        {
+            "method": "item/started",
+            "params": {"threadId": thread_id, "turnId": turn_id, "item": {"id": item_id, "type": "agentMessage"}},
+        }
+    )
+    half = len(reply) // 2
+    for delta in (reply[:half], reply[half:]):
+        emit({"method": "item/agentMessage/delta", "params": {"turnId": turn_id, "itemId": item_id, "delta": delta}})
+    emit(
+        {
+            "method": "item/completed",
+            "params": {
+                "threadId": thread_id,
+                "turnId": turn_id,
+                "item": {"id": item_id, "type": "agentMessage", "text": reply},
+            },
+        }
+    )
+    emit(
+        {
+            "method": "turn/completed",
+            "params": {
+                "threadId": thread_id,
+                "turn": {"id": turn_id, "status": "completed", "usage": {"input_tokens": 1, "output_tokens": 1}},
+            },
+        }
+    )
+    if prompt == "late":
+        emit({"method": "item/agentMessage/delta", "params": {"turnId": turn_id, "itemId": item_id, "delta": "!"}})
+
+
+def run_command(thread_id: str, turn_id: str) -> None:
+    item = {"id": "cmd", "type": "commandExecution", "command": "make", "status": "inProgress"}
+    emit({"method": "item/started", "params": {"threadId": thread_id, "turnId": turn_id, "item": item}})
+    for delta in ("step 1\n", "step 2\n"):
+        params = {"threadId": thread_id, "turnId": turn_id, "itemId": "cmd", "delta": delta}
+        emit({"method": "item/commandExecution/outputDelta", "params": params})
+    item = {**item, "status": "completed", "aggregatedOutput": "step 1\nstep 2\n", "exitCode": 0}
+    emit({"method": "item/completed", "params": {"threadId": thread_id, "turnId": turn_id, "item": item}})
+
+
+def main() -> None:
+    global threads_opened
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        message = json.loads(line)
+        method = message.get("method")
+        request_id = message.get("id")
+        params = message.get("params") or {}
+        if method in ("thread/start", "thread/resume") and not (params.get("approvalPolicy") and params.get("sandbox")):
+            emit({"id": request_id, "error": {"code": -32602, "message": "approvalPolicy and sandbox are required"}})
+        elif method == "initialize":
+            emit({"id": request_id, "result": {"userAgent": "codex-stub"}})
+        elif method == "thread/start":
+            threads_opened += 1
+            emit({"id": request_id, "result": {"thread": {"id": f"thr_{os.getpid()}"}}})
+        elif method == "thread/resume":
+            threads_opened += 1
+            emit({"id": request_id, "result": {"thread": {"id": params["threadId"]}}})
+        elif method == "turn/start":
+            handle_turn(request_id, params)
+        elif request_id is not None and method is not None:
+            emit({"id": request_id, "error": {"code": -32601, "message": f"unknown method {method}"}})
+
+
+if __name__ == "__main__":
+    main()
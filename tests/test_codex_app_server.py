@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from anycode_py.process_manager import codex_app_server
+from anycode_py.process_manager.codex_app_server import CodexAppServerProcessManager
+
+STUB = Path(__file__).parent / "stubs" / "codex_app_server_stub.py"
+
+
+@pytest.fixture(autouse=True)
+def stub_server(monkeypatch):
+    monkeypatch.setattr(codex_app_server, "CODEX_APP_SERVER_COMMAND", [sys.executable, str(STUB)])
+
+
+async def _turn(manager: CodexAppServerProcessManager, prompt: str) -> list[dict]:
+    return [event async for event in manager.chat(prompt)]
+
+
+def _reply(events: list[dict]) -> str:
+    completed = [e for e in events if e["type"] == "item.completed"]
+    assert len(completed) == 1
+    return completed[0]["item"]["text"]
+
+
+def test_turns_share_one_process_and_thread():
+    async def scenario():
+        manager = await CodexAppServerProcessManager.create()
+        first = await _turn(manager, "one")
+        second = await _turn(manager, "two")
+        await manager.close()
+        return manager, first, second
+
+    manager, first, second = asyncio.run(scenario())
+    assert manager.spawn_count == 1
+    assert first[0] == {"type": "thread.started", "thread_id": manager.current_session_id}
+    assert second[0]["type"] == "turn.started"
+    pid = _reply(first).split("|")[1]
+    assert _reply(second) == f"two|{pid}|threads=1|turns=2"
+
+
+def test_events_are_reshaped_to_exec_format():
+    async def scenario():
+        manager = await CodexAppServerProcessManager.create(session_id="thr_saved")
+        events = await _turn(manager, "hi")
+        await manager.close()
+        return events
+
+    events = asyncio.run(scenario())
+    types = [e["type"] for e in events]
+    assert types == [
+        "thread.started",
+        "turn.started",
+        "item.started",
+        "item.updated",
+        "item.updated",
+        "item.completed",
+        "turn.completed",
+    ]
+    assert events[0]["thread_id"] == "thr_saved"
+    assert events[2]["item"]["type"] == "agent_message"
+    assert events[4]["item"]["text"] == _reply(events)
+    assert events[-1]["usage"] == {"input_tokens": 1, "output_tokens": 1}
+
+
+def test_concurrent_turns_are_demultiplexed():
+    async def scenario():
+        manager = await CodexAppServerProcessManager.create()
+        await _turn(manager, "warmup")
+        results = await asyncio.gather(_turn(manager, "a"), _turn(manager, "b"))
+        await manager.close()
+        return results
+
+    first, second = asyncio.run(scenario())
+    assert _reply(first).startswith("a|")
+    assert _reply(second).startswith("b|")
+    assert first[-1]["type"] == second[-1]["type"] == "turn.completed"
+
+
+def test_notifications_for_finished_turns_are_dropped():
+    async def scenario():
+        manager = await CodexAppServerProcessManager.create()
+        first = await _turn(manager, "late")
+        second = await _turn(manager, "two")
+        turns = dict(manager._turns)
+        await manager.close()
+        return first, second, turns
+
+    first, second, turns = asyncio.run(scenario())
+    assert first[-1]["type"] == "turn.completed"
+    assert _reply(second).startswith("two|")
+    assert turns == {}
+
+
+def test_command_output_deltas_update_the_whole_item():
+    async def scenario():
+        manager = await CodexAppServerProcessManager.create()
+        events = await _turn(manager, "run")
+        await manager.close()
+        return events
+
+    events = asyncio.run(scenario())
+    command = [e["item"] for e in events if e.get("item", {}).get("id") == "cmd"]
+    assert [e["type"] for e in events if e.get("item", {}).get("id") == "cmd"] == [
+        "item.started",
+        "item.updated",
+        "item.updated",
+        "item.completed",
+    ]
+    assert all(item["type"] == "command_execution" and item["command"] == "make" for item in command)
+    assert [item.get("aggregated_output") for item in command[1:3]] == ["step 1\n", "step 1\nstep 2\n"]
+    assert command[-1]["exit_code"] == 0
+    assert not any(e["type"].startswith("item.command") for e in events)
+
+
+def test_approval_requests_are_declined():
+    async def scenario():
+        manager = await CodexAppServerProcessManager.create()
+        events = await _turn(manager, "approve")
+        await manager.close()
+        return events
+
+    assert _reply(asyncio.run(scenario())) == "decision=decline"
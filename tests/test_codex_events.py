@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+
+from anycode_py.process_manager.events import CodexEvent, EventKind, decode_event, decode_stream
+from flet_chat.widgets.action_widgets import CommandWidget
+from flet_chat.widgets.factory import CodexWidgetFactory
+from flet_chat.widgets.message_bubbles import AssistantMessageWidget, SystemInfoWidget
+
+
+def test_decode_extracts_item_fields():
+    event = decode_event({"type": "item.completed", "item": {"id": "item_1", "type": "command_execution"}})
+
+    assert event.kind is EventKind.ITEM_COMPLETED
+    assert (event.item_id, event.item_type) == ("item_1", "command_execution")
+    assert event.is_item and event.is_completed
+
+
+def test_decode_unknown_and_non_item_events():
+    assert decode_event({"type": "something.new"}).kind is EventKind.UNKNOWN
+    event = decode_event({"type": "turn.completed", "usage": {"input_tokens": 3}})
+    assert event.item_id is None and not event.is_item
+    assert event.raw["usage"] == {"input_tokens": 3}
+
+
+def test_decode_stream_preserves_order():
+    async def source():
+        for kind in ("thread.started", "turn.started", "turn.completed"):
+            yield {"type": kind}
+
+    async def collect():
+        return [event.kind async for event in decode_stream(source())]
+
+    assert asyncio.run(collect()) == [EventKind.THREAD_STARTED, EventKind.TURN_STARTED, EventKind.TURN_COMPLETED]
+
+
+def test_factory_dispatch_by_table():
+    def widget(raw):
+        return CodexWidgetFactory.create_widget(decode_event(raw))
+
+    assert isinstance(widget({"type": "item.started", "item": {"id": "c", "type": "command_execution"}}), CommandWidget)
+    assert isinstance(widget({"type": "item.started", "item": {"id": "u", "type": "new_kind"}}), AssistantMessageWidget)
+    assert isinstance(widget({"type": "turn.failed"}), SystemInfoWidget)
+    assert widget({"type": "item.started", "item": {"id": "w", "type": "web_search"}}) is None
+    assert widget({"type": "item.started", "item": {"type": "agent_message"}}) is None
+    assert widget({"type": "thread.started"}) is None
+    # raw dicts are still accepted
+    assert isinstance(CodexWidgetFactory.create_widget({"type": "error"}), SystemInfoWidget)
+    assert isinstance(decode_event({"type": "error"}), CodexEvent)
+
+
+def test_command_widget_releases_spilled_output_when_removed():
+    widget = CommandWidget("c")
+    widget.output.max_lines = 10
+    output = "".join(f"line {i}\n" for i in range(50))
+    widget.update_data({"command": "make", "aggregated_output": output}, is_completed=True)
+    assert widget.output.spilled
+    widget.will_unmount()
+    assert not widget.output.spilled
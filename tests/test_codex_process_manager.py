@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+
+import pytest
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager.base import BaseProcessManager, resolve_executable, spawn_env
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.metrics import STREAM_METRICS, StreamMetrics
+
+# Minimal `codex exec --json [resume <id>] -` stand-in: echoes its argv and the prompt as events.
+FAKE_CODEX = """
+import json, sys
+prompt = sys.stdin.read()
+args = sys.argv[1:]
+thread_id = args[args.index("resume") + 1] if "resume" in args else "thread-new"
+print(json.dumps({"type": "thread.started", "thread_id": thread_id}))
+print(json.dumps({"type": "item.completed", "item": {"id": "item_0", "type": "agent_message", "text": prompt}, "argv": args}))
+print(json.dumps({"type": "turn.completed", "usage": {}}))
+"""
+
+
+@pytest.fixture
+def fake_codex(monkeypatch):
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", [sys.executable, "-c", FAKE_CODEX, "-"])
+    spawned: list[tuple[str, ...]] = []
+    original = asyncio.create_subprocess_exec
+
+    async def counting_exec(*args, **kwargs):
+        spawned.append(args)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", counting_exec)
+    return spawned
+
+
+async def _collect(manager: CodexProcessManager, prompt: str) -> list[dict]:
+    return [event async for event in manager.chat(prompt)]
+
+
+def test_create_does_not_spawn(fake_codex):
+    async def scenario():
+        manager = await CodexProcessManager.create(session_id="abc")
+        assert manager.proc is None
+        await manager.resume("abc")
+        assert manager.proc is None
+
+    asyncio.run(scenario())
+    assert fake_codex == []
+
+
+def test_resumed_turn_spawns_exactly_one_process(fake_codex):
+    async def scenario():
+        manager = await CodexProcessManager.create(session_id="abc")
+        events = await _collect(manager, "hello")
+        await manager.close()
+        return manager, events
+
+    manager, events = asyncio.run(scenario())
+    assert len(fake_codex) == 1
+    assert manager.spawn_count == 1
+    assert list(fake_codex[0][-3:]) == ["resume", "abc", "-"]
+    assert events[0]["thread_id"] == "abc"
+
+
+def test_follow_up_turns_resume_captured_session(fake_codex):
+    async def scenario():
+        manager = await CodexProcessManager.create()
+        first = await _collect(manager, "one")
+        second = await _collect(manager, "two")
+        await manager.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert len(fake_codex) == 2
+    assert "resume" not in fake_codex[0]
+    assert list(fake_codex[1][-3:]) == ["resume", "thread-new", "-"]
+    assert second[1]["item"]["text"] == "two"
+    assert first[1]["item"]["text"] == "one"
+
+
+# Burns CPU and writes to disk in a grandchild before completing the turn.
+BUSY_CODEX = """
+import json, subprocess, sys
+sys.stdin.read()
+print(json.dumps({"type": "thread.started", "thread_id": "busy"}), flush=True)
+subprocess.run([sys.executable, "-c", "import os\\nx = 0\\nfor i in range(3_000_000): x += i\\nos.write(1, b'.' * 4096)"], stdout=subprocess.DEVNULL)
+print(json.dumps({"type": "turn.completed", "usage": {}}), flush=True)
+"""
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_turn_completed_carries_process_tree_usage(monkeypatch):
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", [sys.executable, "-c", BUSY_CODEX, "-"])
+
+    async def scenario():
+        manager = await CodexProcessManager.create()
+        manager.sample_interval = 0.01
+        events = await _collect(manager, "go")
+        await manager.close()
+        return events
+
+    usage = asyncio.run(scenario())[-1]["resource_usage"]
+    assert usage["processes"] >= 2
+    assert usage["cpu_total_s"] > 0
+    assert usage["rss_peak_bytes"] > 0
+    assert usage["wchar"] >= 4096
+
+
+def test_turn_latency_is_recorded(fake_codex):
+    STREAM_METRICS.clear()
+
+    async def scenario():
+        manager = await CodexProcessManager.create()
+        await _collect(manager, "hello")
+        await manager.close()
+
+    asyncio.run(scenario())
+    (turn,) = STREAM_METRICS.turns()
+    assert turn["events"] == 3
+    assert turn["spawn_s"] > 0
+    assert 0 < turn["first_byte_s"] <= turn["first_event_s"]["thread.started"]
+    assert set(turn["first_event_s"]) == {"thread.started", "agent_message", "turn.completed"}
+    assert [kind for _, kind, _ in STREAM_METRICS.events()] == ["thread.started", "item.completed", "turn.completed"]
+    assert STREAM_METRICS.summary()["first_turn.completed_s"]["p50"] == turn["first_event_s"]["turn.completed"]
+
+
+# Alternates multi-megabyte and tiny events, with a blank line in between.
+MIXED_SIZES = """
+import json
+for index in range(6):
+    text = "x" * (3_000_000 if index % 2 else 10)
+    print(json.dumps({"type": "item.completed", "item": {"id": f"item_{index}", "text": text}}))
+    print()
+"""
+
+
+def test_large_events_decoded_off_loop_keep_order(monkeypatch):
+    offloaded: list[int] = []
+    original = asyncio.to_thread
+
+    async def counting_to_thread(func, line):
+        offloaded.append(len(line))
+        return await original(func, line)
+
+    monkeypatch.setattr(asyncio, "to_thread", counting_to_thread)
+
+    async def scenario():
+        manager = BaseProcessManager([sys.executable, "-c", MIXED_SIZES], sample_interval=0)
+        await manager.ensure_started()
+        try:
+            return [event async for event in manager.read_stream()]
+        finally:
+            await manager.close()
+
+    events = asyncio.run(scenario())
+    assert [event["item"]["id"] for event in events] == [f"item_{index}" for index in range(6)]
+    assert len(events[1]["item"]["text"]) == 3_000_000
+    assert len(offloaded) == 3
+
+
+def test_stream_metrics_ring_keeps_most_recent_events():
+    metrics = StreamMetrics(capacity=4)
+    for index in range(6):
+        metrics.record_event(f"e{index}", index, float(index))
+    assert [kind for _, kind, _ in metrics.events()] == ["e2", "e3", "e4", "e5"]
+    assert [size for _, _, size in metrics.events(last=2)] == [4, 5]
+
+
+# Ignores SIGINT like a busy CLI would, and leaves a grandchild in its process group.
+STUBBORN_TREE = """
+import signal, subprocess, sys, time
+signal.signal(signal.SIGINT, signal.SIG_IGN)
+child = subprocess.Popen(["sleep", "60"])
+print(child.pid, flush=True)
+time.sleep(60)
+"""
+
+
+def _running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc and process groups")
+def test_cancel_escalates_to_the_whole_process_group(monkeypatch):
+    monkeypatch.setattr(
+        BaseProcessManager, "CANCEL_ESCALATION", tuple((sig, 0.2) for sig, _ in BaseProcessManager.CANCEL_ESCALATION)
+    )
+
+    async def scenario():
+        manager = BaseProcessManager([sys.executable, "-c", STUBBORN_TREE], sample_interval=0)
+        await manager.ensure_started()
+        grandchild = int(await manager.proc.stdout.readline())
+        elapsed = await manager.cancel()
+        return manager, grandchild, elapsed, await manager.cancel()
+
+    manager, grandchild, elapsed, second = asyncio.run(scenario())
+    # SIGINT is ignored, so freeing the group takes one escalation step.
+    assert 0.2 <= elapsed < 2
+    assert manager.proc.returncode == -signal.SIGTERM
+    assert not _running(grandchild)
+    assert second is None
+
+
+def test_spawn_env_is_inherited_or_cached():
+    assert spawn_env(None) is None and spawn_env({}) is None
+    env = spawn_env({"ANYCODE_TEST": "1"})
+    assert env["ANYCODE_TEST"] == "1" and env["PATH"] == os.environ["PATH"]
+    assert spawn_env({"ANYCODE_TEST": "1"}) is env
+    # Shared between managers, so it cannot be changed through one of them.
+    with pytest.raises(TypeError):
+        env["ANYCODE_TEST"] = "2"
+    assert BaseProcessManager(["true"]).env is None
+
+
+def test_executable_resolved_against_child_path(tmp_path):
+    tool = tmp_path / "anycode-tool"
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o755)
+    assert resolve_executable(["anycode-tool", "-x"], {"PATH": str(tmp_path)}) == [str(tool), "-x"]
+    assert resolve_executable(["no-such-tool-anycode"]) == ["no-such-tool-anycode"]
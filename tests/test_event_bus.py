@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from anycode_py.process_manager.bus import EventBus, OverflowPolicy
+from anycode_py.process_manager.events import EventKind
+
+
+def _update(item_id: str, text: str) -> dict:
+    return {"type": "item.updated", "item": {"id": item_id, "type": "agent_message", "text": text}}
+
+
+def _stream():
+    yield {"type": "turn.started"}
+    yield {"type": "item.started", "item": {"id": "a", "type": "agent_message", "text": ""}}
+    for index in range(10):
+        yield _update("a", str(index))
+    yield {"type": "item.completed", "item": {"id": "a", "type": "agent_message", "text": "done"}}
+    yield {"type": "turn.completed"}
+
+
+async def _source():
+    for raw in _stream():
+        yield raw
+
+
+async def _drain(subscription) -> list:
+    return [event async for event in subscription]
+
+
+def test_fan_out_delivers_every_event_once_per_subscriber():
+    async def run():
+        bus = EventBus()
+        ui = bus.subscribe("ui", maxsize=2)
+        recorder = bus.subscribe("recorder", maxsize=2)
+        results = await asyncio.gather(bus.pump(_source()), _drain(ui), _drain(recorder))
+        return bus, results
+
+    bus, (count, ui_events, recorder_events) = asyncio.run(run())
+    assert count == bus.published == 14
+    assert [e.raw for e in ui_events] == list(_stream())
+    assert [e.kind for e in recorder_events] == [e.kind for e in ui_events]
+    assert ui_events[0] is recorder_events[0]  # decoded once
+
+
+def test_drop_oldest_never_blocks_publisher():
+    async def run():
+        bus = EventBus()
+        slow = bus.subscribe("slow", maxsize=3, policy=OverflowPolicy.DROP_OLDEST)
+        await bus.pump(_source())
+        return slow, await _drain(slow)
+
+    slow, events = asyncio.run(run())
+    assert [e.kind for e in events] == [EventKind.ITEM_UPDATED, EventKind.ITEM_COMPLETED, EventKind.TURN_COMPLETED]
+    assert slow.dropped == 11 and slow.high_water == 3
+
+
+def test_coalesce_keeps_latest_update_and_lifecycle_events():
+    async def run():
+        bus = EventBus()
+        ui = bus.subscribe("ui", maxsize=8, policy=OverflowPolicy.COALESCE)
+        await bus.pump(_source())
+        return ui, await _drain(ui)
+
+    ui, events = asyncio.run(run())
+    assert [(e.kind, e.item and e.item["text"]) for e in events] == [
+        (EventKind.TURN_STARTED, None),
+        (EventKind.ITEM_STARTED, ""),
+        (EventKind.ITEM_UPDATED, "9"),
+        (EventKind.ITEM_COMPLETED, "done"),
+        (EventKind.TURN_COMPLETED, None),
+    ]
+    assert ui.coalesced == 9
+
+
+def test_coalesce_evicts_oldest_update_when_full():
+    async def run():
+        bus = EventBus()
+        ui = bus.subscribe("ui", maxsize=2, policy=OverflowPolicy.COALESCE)
+        for item_id in "abc":
+            await bus.publish(_update(item_id, item_id))
+        bus.close()
+        return await _drain(ui)
+
+    assert [e.item_id for e in asyncio.run(run())] == ["b", "c"]
+
+
+def test_coalesce_never_blocks_when_there_is_no_update_to_evict():
+    async def run():
+        bus = EventBus()
+        ui = bus.subscribe("ui", maxsize=3, policy=OverflowPolicy.COALESCE)
+        await bus.publish({"type": "turn.started"})
+        for item_id in "abcd":
+            await asyncio.wait_for(
+                bus.publish({"type": "item.completed", "item": {"id": item_id, "type": "agent_message"}}), 1
+            )
+        await asyncio.wait_for(bus.publish({"type": "turn.completed"}), 1)
+        bus.close()
+        return ui, await _drain(ui)
+
+    ui, events = asyncio.run(run())
+    # The oldest events are dropped, the turn ending is kept.
+    assert [e.item_id or e.kind.value for e in events] == ["c", "d", "turn.completed"]
+    assert ui.dropped == 3
+
+
+def test_block_applies_backpressure_until_consumed():
+    async def run():
+        bus = EventBus()
+        ui = bus.subscribe("ui", maxsize=1)
+        await bus.publish({"type": "turn.started"})
+        publish = asyncio.create_task(bus.publish({"type": "turn.completed"}))
+        await asyncio.sleep(0)
+        blocked = not publish.done()
+        first = await ui.get()
+        await publish
+        return blocked, first, ui.get_nowait()
+
+    blocked, first, second = asyncio.run(run())
+    assert blocked
+    assert (first.kind, second.kind) == (EventKind.TURN_STARTED, EventKind.TURN_COMPLETED)
+
+
+class CodexExited(Exception):
+    pass
+
+
+def test_pump_failure_closes_subscribers():
+    async def failing():
+        yield {"type": "turn.started"}
+        raise CodexExited()
+
+    async def run():
+        bus = EventBus()
+        ui = bus.subscribe("ui")
+        pump = asyncio.create_task(bus.pump(failing()))
+        events = await _drain(ui)
+        with pytest.raises(CodexExited):
+            await pump
+        return events
+
+    assert [e.kind for e in asyncio.run(run())] == [EventKind.TURN_STARTED]
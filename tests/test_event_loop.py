@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+
+import pytest
+
+from anycode_py.utils.event_loop import loop_factory, run
+
+
+async def _loop_module() -> str:
+    return type(asyncio.get_running_loop()).__module__
+
+
+def test_default_loop_when_disabled():
+    assert loop_factory(use_uvloop=False) is None
+    assert run(_loop_module(), use_uvloop=False).startswith("asyncio")
+
+
+def test_falls_back_when_uvloop_missing(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    assert run(_loop_module(), use_uvloop=True).startswith("asyncio")
+
+
+def test_uvloop_when_enabled():
+    pytest.importorskip("uvloop")
+    assert run(_loop_module(), use_uvloop=True) == "uvloop"
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.session_manager.codex import manager as session_module
+from anycode_py.session_manager.codex.manager import CodexSessionManager
+
+FAKE_CODEX = Path(__file__).parent.parent / "anycode_py" / "testing" / "fake_codex.py"
+
+ROLLOUT = [
+    {"timestamp": "2025-12-10T05:10:17.795Z", "type": "session_meta", "payload": {"id": "x"}},
+    {"timestamp": "2025-12-10T05:10:17.804Z", "type": "event_msg", "payload": {"type": "user_message", "message": "a"}},
+    {"timestamp": "2025-12-10T05:10:18.804Z", "type": "event_msg", "payload": {"type": "agent_reasoning", "text": "r"}},
+    {
+        "timestamp": "2025-12-10T05:10:19.000Z",
+        "type": "response_item",
+        "payload": {"type": "function_call", "arguments": '{"command": "uptime"}', "call_id": "c1"},
+    },
+    {
+        "timestamp": "2025-12-10T05:10:19.100Z",
+        "type": "response_item",
+        "payload": {"type": "function_call_output", "call_id": "c1", "output": "up 3 days"},
+    },
+    {
+        "timestamp": "2025-12-10T05:10:20.000Z",
+        "type": "event_msg",
+        "payload": {"type": "agent_message", "message": "1"},
+    },
+    {"timestamp": "2025-12-10T05:11:00.000Z", "type": "event_msg", "payload": {"type": "user_message", "message": "b"}},
+    {
+        "timestamp": "2025-12-10T05:11:01.000Z",
+        "type": "event_msg",
+        "payload": {"type": "agent_message", "message": "2"},
+    },
+]
+
+
+def _use_fake(monkeypatch, session_dir: Path, *options: str):
+    command = [sys.executable, str(FAKE_CODEX), "--session-dir", str(session_dir), *options, "exec", "--json", "-"]
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", command)
+
+
+async def _turns(manager: CodexProcessManager, *prompts: str) -> list[list[dict]]:
+    results = []
+    for prompt in prompts:
+        events = []
+        async for event in manager.chat(prompt):
+            events.append(event)
+        results.append(events)
+    await manager.close()
+    return results
+
+
+def test_builtin_turn_writes_resumable_session(monkeypatch, tmp_path):
+    _use_fake(monkeypatch, tmp_path)
+    first, second = asyncio.run(_turns(CodexProcessManager(), "hello", "again"))
+
+    session_id = first[0]["thread_id"]
+    assert second[0]["thread_id"] == session_id
+    assert first[-1]["type"] == "turn.completed"
+    assert [e["item"]["text"] for e in second if e.get("item", {}).get("type") == "agent_message"] == ["again"]
+
+    (session_file,) = tmp_path.rglob("*.jsonl")
+    assert session_file.stem.endswith(session_id)
+
+    monkeypatch.setattr(session_module, "CODEX_SESSION_DIR", tmp_path)
+    session_module._find_all_session_jsonl_path.cache_clear()
+    try:
+        history = CodexSessionManager().load_chat_history(session_id)
+    finally:
+        session_module._find_all_session_jsonl_path.cache_clear()
+    assert [(m["role"], m["content"]) for m in history] == [
+        ("user", "hello"),
+        ("assistant", "hello"),
+        ("user", "again"),
+        ("assistant", "again"),
+    ]
+
+
+def test_rollout_replay_follows_turns_and_scales_timing(monkeypatch, tmp_path):
+    script = tmp_path / "rollout.jsonl"
+    script.write_text("\n".join(json.dumps(record) for record in ROLLOUT) + "\n")
+    _use_fake(monkeypatch, tmp_path / "sessions", "--script", str(script), "--timing", "scale:0.05")
+
+    first, second = asyncio.run(_turns(CodexProcessManager(), "a", "b"))
+
+    items = [(e["type"], e["item"]["type"]) for e in first if "item" in e]
+    assert items == [
+        ("item.completed", "reasoning"),
+        ("item.started", "command_execution"),
+        ("item.completed", "command_execution"),
+        ("item.completed", "agent_message"),
+    ]
+    assert first[4]["item"]["aggregated_output"] == "up 3 days"
+    assert [e["item"]["text"] for e in second if "item" in e] == ["2"]
+
+
+@pytest.mark.parametrize("pad_bytes", [0, 32_000, 1_000_000])
+def test_output_padding(monkeypatch, tmp_path, pad_bytes):
+    _use_fake(monkeypatch, tmp_path, "--no-session", "--pad-bytes", str(pad_bytes), "--repeat", "3")
+    (events,) = asyncio.run(_turns(CodexProcessManager(), "hi"))
+
+    messages = [e["item"] for e in events if e.get("item", {}).get("type") == "agent_message"]
+    assert [m["id"] for m in messages] == ["item_2_0", "item_2_1", "item_2_2"]
+    assert all(len(m["text"]) == max(pad_bytes, 2) for m in messages)
+    assert not list(tmp_path.rglob("*.jsonl"))
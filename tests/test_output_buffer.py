@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from anycode_py.ui.models.output_buffer import OutputBuffer
+
+
+def _log(lines: int, start: int = 0) -> str:
+    return "".join(f"step {i} ✓\n" for i in range(start, start + lines))
+
+
+def test_sync_only_processes_the_new_suffix_and_spills_past_the_ring(tmp_path):
+    buffer = OutputBuffer(max_lines=100, spill_dir=str(tmp_path))
+    output = ""
+    for chunk in range(10):
+        output += _log(50, chunk * 50)
+        assert buffer.sync(output)
+        assert not buffer.sync(output)
+    assert len(buffer) == buffer.total_lines == 500
+    assert buffer.spilled
+    assert len(buffer._ring) == 100
+
+    assert buffer.tail(3) == ["step 497 ✓", "step 498 ✓", "step 499 ✓"]
+    # Ranges straddling the spill file and the ring read back in order.
+    assert buffer.read_lines(395, 405) == [f"step {i} ✓" for i in range(395, 405)]
+    assert buffer.read_lines(0, 2) == ["step 0 ✓", "step 1 ✓"]
+    buffer.close()
+
+
+def test_unterminated_line_and_replaced_output():
+    buffer = OutputBuffer(max_lines=10)
+    buffer.sync("a\nb\npartial")
+    assert len(buffer) == 3
+    assert buffer.tail(2) == ["b", "partial"]
+    buffer.sync("a\nb\npartial line\n")
+    assert buffer.read_lines(0, 10) == ["a", "b", "partial line"]
+
+    buffer.sync("new\n")
+    assert buffer.read_lines(0, 10) == ["new"]
+    assert not buffer.spilled
+
+
+def test_feed_after_close_starts_a_consistent_buffer(tmp_path):
+    buffer = OutputBuffer(max_lines=10, spill_dir=str(tmp_path))
+    buffer.sync(_log(30))
+    assert buffer.spilled
+    buffer.close()
+    assert len(buffer) == 0 and not buffer.spilled
+    # A late update carries the whole output again; it is indexed against a fresh spill file.
+    buffer.sync(_log(40))
+    assert buffer.spilled
+    assert buffer.read_lines(0, 3) == ["step 0 ✓", "step 1 ✓", "step 2 ✓"]
+    assert buffer.read_lines(25, 27) == ["step 25 ✓", "step 26 ✓"]
+    buffer.close()
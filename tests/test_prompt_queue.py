@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.prompt_queue import PromptQueue, PromptState, QueuedPrompt, turn_events
+from anycode_py.session_manager.codex import manager as session_module
+from anycode_py.ui.controllers.chat_controller import ChatController
+from anycode_py.ui.models.chat import ChatModel
+from tests.utils import FakePage
+
+FAKE_CODEX = """
+import json, sys
+prompt = sys.stdin.read()
+args = sys.argv[1:]
+thread_id = args[args.index("resume") + 1] if "resume" in args else "thread-new"
+print(json.dumps({"type": "thread.started", "thread_id": thread_id}), flush=True)
+print(json.dumps({"type": "item.completed", "item": {"id": "item_0", "type": "agent_message", "text": prompt}}), flush=True)
+print(json.dumps({"type": "turn.completed", "usage": {}}), flush=True)
+"""
+
+
+def test_prompts_run_in_order_and_wait_while_busy():
+    log: list[tuple[str, str]] = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def run_turn(prompt: QueuedPrompt):
+            log.append(("run", prompt.text))
+            if prompt.text == "first":
+                await release.wait()
+
+        queue = PromptQueue(run_turn, on_state=lambda prompt: log.append((prompt.state.value, prompt.text)))
+        first = queue.submit("first")
+        await asyncio.sleep(0)
+        assert queue.busy and queue.current is first
+        second = queue.submit("second")
+        third = queue.submit("third")
+        assert [prompt.state for prompt in (second, third)] == [PromptState.PENDING] * 2
+        assert queue.pending == [second, third]
+
+        release.set()
+        await queue.join()
+        return first, second, third, queue
+
+    first, second, third, queue = asyncio.run(scenario())
+    assert [text for kind, text in log if kind == "run"] == ["first", "second", "third"]
+    assert log[:3] == [("running", "first"), ("run", "first"), ("done", "first")]
+    assert all(prompt.state is PromptState.DONE for prompt in (first, second, third))
+    assert queue.stats()["completed"] == 3
+    assert not queue.busy
+
+
+def test_failed_turn_does_not_stall_the_queue_and_discard_drops_pending():
+    ran: list[str] = []
+
+    async def scenario():
+        async def run_turn(prompt: QueuedPrompt):
+            ran.append(prompt.text)
+            if prompt.text == "boom":
+                raise RuntimeError("boom")
+
+        queue = PromptQueue(run_turn)
+        failing = queue.submit("boom")
+        dropped = queue.submit("dropped")
+        queue.submit("after")
+        assert queue.discard(dropped)
+        assert not queue.discard(dropped)
+        await queue.join()
+        return queue, failing, dropped
+
+    queue, failing, dropped = asyncio.run(scenario())
+    assert ran == ["boom", "after"]
+    assert failing.state is PromptState.FAILED and isinstance(failing.error, RuntimeError)
+    assert dropped.state is PromptState.CANCELLED
+    assert queue.stats()["failed"] == 1
+
+
+def test_queued_follow_ups_run_back_to_back_on_one_session(monkeypatch):
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", [sys.executable, "-c", FAKE_CODEX, "-"])
+    replies: list[str] = []
+
+    async def scenario():
+        manager = await CodexProcessManager.create()
+
+        async def run_turn(prompt: QueuedPrompt):
+            async for event in turn_events(manager, prompt.text):
+                if event["type"] == "item.completed":
+                    replies.append(event["item"]["text"])
+
+        queue = PromptQueue(run_turn)
+        for text in ("one", "two", "three"):
+            queue.submit(text)
+        await queue.join()
+        await manager.close()
+        return manager, queue
+
+    manager, queue = asyncio.run(scenario())
+    assert replies == ["one", "two", "three"]
+    assert manager.spawn_count == 3
+    # Later turns resume the session the first one started.
+    assert manager.current_session_id == "thread-new"
+    assert len(queue.dispatch_gaps) == 2
+    assert max(queue.dispatch_gaps) < 0.1
+
+
+def test_turn_events_stops_at_turn_completed():
+    closed: list[bool] = []
+
+    class LingeringManager:
+        async def chat(self, prompt: str):
+            try:
+                yield {"type": "turn.started"}
+                yield {"type": "turn.completed", "usage": {}}
+                # codex exec keeps running briefly after the terminal event.
+                await asyncio.sleep(10)
+                yield {"type": "never"}
+            finally:
+                closed.append(True)
+
+    async def scenario():
+        return [event["type"] async for event in turn_events(LingeringManager(), "hi")]
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=2)) == ["turn.started", "turn.completed"]
+    assert closed == [True]
+
+
+def test_drained_conversation_closes_its_process_and_forgets_its_queue(monkeypatch, tmp_path):
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", [sys.executable, "-c", FAKE_CODEX, "-"])
+    monkeypatch.setattr(session_module, "CODEX_SESSION_DIR", tmp_path)
+    session_module._find_all_session_jsonl_path.cache_clear()
+    created: list[CodexProcessManager] = []
+    create = CodexProcessManager.create.__func__
+
+    async def tracked_create(cls, **kwargs):
+        manager = await create(cls, **kwargs)
+        created.append(manager)
+        return manager
+
+    monkeypatch.setattr(CodexProcessManager, "create", classmethod(tracked_create))
+
+    async def scenario():
+        controller = ChatController(FakePage(asyncio.get_running_loop()), ChatModel())
+        for text in ("one", "two"):
+            await controller.send_message(text)
+        conversation = controller.model.active_conversation
+        queue = controller.prompt_queues[id(conversation)]
+        await queue.join()
+        return controller, conversation
+
+    try:
+        controller, conversation = asyncio.run(scenario())
+    finally:
+        session_module._find_all_session_jsonl_path.cache_clear()
+    assert [m.content for m in conversation.messages if m.role == "assistant"] == ["one", "two"]
+    # Both queued turns shared one manager, closed once the queue drained.
+    assert len(created) == 1 and created[0].spawn_count == 2
+    assert not created[0].is_running and created[0].sampler._task is None
+    assert controller.processes == {} and controller.prompt_queues == {}
+    assert conversation.id == "thread-new"
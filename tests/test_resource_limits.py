@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import resource
+import signal
+import sys
+
+import pytest
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager import limits as limits_module
+from anycode_py.process_manager.base import BaseProcessManager
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.limits import ResourceLimits, parse_ionice
+from anycode_py.process_manager.prompt_queue import turn_events
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX only")
+
+REPORT_LIMITS = """
+import json, os, resource
+print(json.dumps({
+    "cpu": resource.getrlimit(resource.RLIMIT_CPU),
+    "nofile": resource.getrlimit(resource.RLIMIT_NOFILE),
+    "nice": os.nice(0),
+}))
+"""
+
+BURN_CPU = "while True: pass"
+
+BURN_CPU_IGNORING_SIGXCPU = """
+import signal
+signal.signal(signal.SIGXCPU, signal.SIG_IGN)
+while True:
+    pass
+"""
+
+# Completes the turn just before its CPU limit, then runs into it while winding down.
+OUT_OF_CPU_AFTER_THE_TURN = """
+import json, sys, time
+sys.stdin.read()
+while time.process_time() < 0.9:
+    pass
+print(json.dumps({"type": "turn.completed", "usage": {}}), flush=True)
+while True:
+    pass
+"""
+
+COMMAND_OUT_OF_CPU = """
+import json, sys
+sys.stdin.read()
+item = {"id": "item_0", "type": "command_execution", "command": "make", "exit_code": 152, "aggregated_output": ""}
+print(json.dumps({"type": "item.completed", "item": item}))
+print(json.dumps({"type": "turn.completed", "usage": {}}))
+"""
+
+
+async def _run(cmd: list[str], limits: ResourceLimits) -> tuple[list[dict], dict | None]:
+    manager = BaseProcessManager(cmd, limits=limits, sample_interval=0)
+    await manager.ensure_started()
+    try:
+        events = [event async for event in manager.read_stream()]
+        return events, await manager.process_limit_hit(timeout=10)
+    finally:
+        await manager.close()
+
+
+def test_no_limits_keeps_plain_spawn():
+    assert not ResourceLimits()
+    assert ResourceLimits().preexec_fn() is None
+    assert ResourceLimits().wrap_command(["codex"]) == ["codex"]
+
+
+def test_limits_are_applied_in_the_child():
+    limits = ResourceLimits(cpu_seconds=30, open_files=64, nice=5)
+    (report,), limit_hit = asyncio.run(_run([sys.executable, "-c", REPORT_LIMITS], limits))
+    assert limit_hit is None
+    assert report["cpu"] == [30, 35]
+    assert report["nofile"] == [64, 64]
+    assert report["nice"] >= 5
+
+
+def test_cpu_limit_hit_is_reported_as_error_event():
+    _, event = asyncio.run(_run([sys.executable, "-c", BURN_CPU], ResourceLimits(cpu_seconds=1)))
+    assert event["type"] == "error"
+    assert event["error"]["kind"] == "resource_limit"
+    assert (event["error"]["limit"], event["error"]["source"]) == ("cpu_seconds", "process")
+    assert event["error"]["returncode"] == -signal.SIGXCPU
+
+
+def test_hard_cpu_limit_kill_is_reported(monkeypatch):
+    monkeypatch.setattr(limits_module, "_CPU_HARD_GRACE_SECONDS", 1)
+    limits = ResourceLimits(cpu_seconds=1)
+    _, event = asyncio.run(_run([sys.executable, "-c", BURN_CPU_IGNORING_SIGXCPU], limits))
+    assert event["error"]["limit"] == "cpu_seconds" and event["error"]["hard"]
+    assert event["error"]["returncode"] == -signal.SIGKILL
+    # A SIGKILL we sent ourselves (cancel, close timeout) is not a limit hit.
+    assert limits.process_limit_hit(-signal.SIGKILL, signalled=True) is None
+
+
+def test_unprivileged_negative_nice_is_reported_instead_of_failing_the_spawn(monkeypatch):
+    monkeypatch.setattr(limits_module.os, "geteuid", lambda: 1000)
+    getrlimit = resource.getrlimit
+    monkeypatch.setattr(
+        limits_module.resource, "getrlimit", lambda which: (0, 0) if which == resource.RLIMIT_NICE else getrlimit(which)
+    )
+    limits = ResourceLimits(nice=-5)
+    assert limits.preexec_fn() is None
+    (report,), limit_hit = asyncio.run(_run([sys.executable, "-c", REPORT_LIMITS], limits))
+    assert limit_hit is None and report["nice"] == os.nice(0)
+    event = limits.spawn_error()
+    assert event["type"] == "error"
+    assert (event["error"]["limit"], event["error"]["source"]) == ("nice", "spawn")
+    assert ResourceLimits(nice=5).spawn_error() is None
+
+
+def test_persistent_processes_get_no_cpu_limit():
+    limits = ResourceLimits(cpu_seconds=30, open_files=64)
+    assert limits.for_persistent_process() == ResourceLimits(open_files=64)
+    assert ResourceLimits(open_files=64).for_persistent_process() == ResourceLimits(open_files=64)
+
+
+def test_command_limit_hits_from_completed_items():
+    limits = ResourceLimits(cpu_seconds=10, open_files=32)
+    too_many_files = {"id": "a", "exit_code": 1, "aggregated_output": "OSError: [Errno 24] Too many open files"}
+    assert limits.command_limit_hit(too_many_files)["error"]["limit"] == "open_files"
+    assert limits.command_limit_hit({"id": "b", "exit_code": 1, "aggregated_output": "Cannot allocate memory"}) is None
+    assert limits.command_limit_hit({"id": "c", "exit_code": 0, "aggregated_output": ""}) is None
+
+
+def test_codex_turn_yields_limit_hit_after_the_command(monkeypatch):
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", [sys.executable, "-c", COMMAND_OUT_OF_CPU, "-"])
+
+    async def scenario():
+        manager = CodexProcessManager()
+        manager.limits = ResourceLimits(cpu_seconds=60)
+        events = [event async for event in manager.chat("build")]
+        await manager.close()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [event["type"] for event in events] == ["item.completed", "error", "turn.completed"]
+    assert events[1]["error"]["item_id"] == "item_0"
+    assert json.dumps(events[1])  # plain JSON like codex's own events
+
+
+def test_turn_events_reports_a_limit_hit_at_the_end_of_the_turn(monkeypatch):
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", [sys.executable, "-c", OUT_OF_CPU_AFTER_THE_TURN, "-"])
+
+    async def scenario():
+        manager = CodexProcessManager()
+        manager.limits = ResourceLimits(cpu_seconds=1)
+        events = [event async for event in turn_events(manager, "build")]
+        await manager.close()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [event["type"] for event in events] == ["error", "turn.completed"]
+    assert (events[0]["error"]["limit"], events[0]["error"]["source"]) == ("cpu_seconds", "process")
+
+
+def test_parse_ionice():
+    assert parse_ionice("idle") == (3, None)
+    assert parse_ionice("best-effort:7") == (2, 7)
+    assert parse_ionice(None) is None
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from anycode_py.configs import HISTORY_PAGE_SIZE
+from anycode_py.session_manager.codex import manager as session_module
+from anycode_py.session_manager.codex.manager import CodexSessionManager, HistoryLoadCancelled
+from anycode_py.session_manager.codex.prefetch import HistoryPrefetcher
+from anycode_py.ui.controllers.chat_controller import ChatController
+from anycode_py.ui.models.chat import ChatModel
+from anycode_py.utils.jsonl_utis import iter_lines_reversed
+from tests.utils import FakePage
+
+SESSION_ID = "019b06aa-d59e-79a1-8d46-96c7c5dd63ca"
+
+
+def _message(role: str, text: str) -> dict:
+    kind = "input_text" if role == "user" else "output_text"
+    return {
+        "type": "response_item",
+        "payload": {"type": "message", "role": role, "content": [{"type": kind, "text": text}]},
+    }
+
+
+def _write_session(directory: Path, session_id: str, turns: int) -> Path:
+    records = [{"type": "session_meta", "payload": {"id": session_id}}]
+    for turn in range(turns):
+        records.append(_message("user", f"question {turn}"))
+        records.append({"type": "event_msg", "payload": {"type": "token_count", "info": None, "pad": "p" * 5000}})
+        records.append(_message("assistant", f"answer {turn}"))
+    path = directory / "2025" / f"rollout-2025-12-10T13-10-17-{session_id}.jsonl"
+    path.parent.mkdir(exist_ok=True)
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return path
+
+
+def _manager(monkeypatch, directory: Path) -> CodexSessionManager:
+    monkeypatch.setattr(session_module, "CODEX_SESSION_DIR", directory)
+    session_module._find_all_session_jsonl_path.cache_clear()
+    try:
+        return CodexSessionManager()
+    finally:
+        session_module._find_all_session_jsonl_path.cache_clear()
+
+
+def test_reversed_lines_match_a_forward_read_for_any_chunk_size(tmp_path):
+    path = tmp_path / "lines.jsonl"
+    lines = [f"line {i} " + "x" * (i * 37 % 300) for i in range(200)] + ["", "last without newline"]
+    path.write_text("\n".join(lines))
+    data = path.read_bytes()
+
+    expected = []
+    offset = 0
+    for line in data.split(b"\n"):
+        if line.strip():
+            expected.append((offset, line))
+        offset += len(line) + 1
+    expected.reverse()
+
+    for chunk_size in (1, 7, 64, 4096):
+        assert list(iter_lines_reversed(path, chunk_size=chunk_size)) == expected
+    # Resuming before a line's offset continues with the lines before it.
+    assert list(iter_lines_reversed(path, expected[10][0], chunk_size=64)) == expected[11:]
+
+
+def test_history_pages_read_newest_first_and_add_up_to_the_full_history(monkeypatch, tmp_path):
+    _write_session(tmp_path, SESSION_ID, 100)
+    manager = _manager(monkeypatch, tmp_path)
+
+    page, before = manager.load_chat_history_page(SESSION_ID, limit=30)
+    assert [message["content"] for message in page[-2:]] == ["question 99", "answer 99"]
+    assert len(page) == 30 and before is not None
+
+    pages = [page]
+    while before is not None:
+        page, before = manager.load_chat_history_page(SESSION_ID, before, limit=30)
+        pages.insert(0, page)
+    history = [message for page in pages for message in page]
+    assert [(m["role"], m["content"]) for m in history] == [
+        (m["role"], m["content"]) for m in manager.load_chat_history(SESSION_ID)
+    ]
+    offsets = [message["offset"] for message in history]
+    assert offsets == sorted(set(offsets))
+    assert manager.load_chat_history_page("missing") == ([], None)
+
+
+def _session_ids(count: int) -> list[str]:
+    return [f"019b06aa-d59e-79a1-8d46-{index:012d}" for index in range(count)]
+
+
+def test_prefetched_sessions_open_from_the_cache(monkeypatch, tmp_path):
+    session_ids = _session_ids(6)
+    paths = {session_id: _write_session(tmp_path, session_id, 40) for session_id in session_ids}
+    manager = _manager(monkeypatch, tmp_path)
+
+    async def browse() -> HistoryPrefetcher:
+        prefetcher = HistoryPrefetcher(manager, asyncio.get_running_loop(), delay=0)
+        # Without hints every first open is cold.
+        for session_id in session_ids[:3]:
+            manager.load_chat_history_page(session_id)
+        # Hovering a row before clicking it warms it.
+        for session_id in session_ids[3:]:
+            prefetcher.hint([session_id])
+            await prefetcher.join()
+            manager.load_chat_history_page(session_id)
+        return prefetcher
+
+    prefetcher = asyncio.run(browse())
+    stats = prefetcher.stats()
+    assert (stats["prefetched"], stats["hits"], stats["misses"]) == (3, 3, 3)
+    assert stats["hit_rate"] == 0.5
+
+    # A session written to since it was cached is read again.
+    with paths[session_ids[0]].open("a") as f:
+        f.write(json.dumps(_message("user", "new question")) + "\n")
+    page, _ = manager.load_chat_history_page(session_ids[0])
+    assert page[-1]["content"] == "new question"
+    assert manager.history_cache_stats()["misses"] == 4
+
+
+def test_newer_hints_cancel_older_ones_and_the_budget_bounds_the_cache(monkeypatch, tmp_path):
+    session_ids = _session_ids(4)
+    for session_id in session_ids:
+        _write_session(tmp_path, session_id, 40)
+    manager = _manager(monkeypatch, tmp_path)
+    manager.prefetch_history_page(session_ids[0])
+    page_bytes = manager.history_cache_stats()["bytes"]
+    manager._page_cache_budget = 2 * page_bytes
+
+    async def hover() -> HistoryPrefetcher:
+        prefetcher = HistoryPrefetcher(manager, asyncio.get_running_loop(), delay=0.05)
+        prefetcher.hint([session_ids[1]])
+        prefetcher.hint([session_ids[2], session_ids[3]])
+        await prefetcher.join()
+        return prefetcher
+
+    prefetcher = asyncio.run(hover())
+    assert (prefetcher.prefetched, prefetcher.cancelled) == (2, 1)
+    stats = manager.history_cache_stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 2 * page_bytes
+    assert list(manager._page_cache) == session_ids[2:]
+
+
+class FakeView:
+    def __init__(self) -> None:
+        self.rendered: list[str] = []
+
+    def refresh_sidebar(self) -> None:
+        pass
+
+    def refresh_messages(self, conversation) -> None:
+        self.rendered.append(conversation.id)
+
+    def fills_viewport(self, messages) -> bool:
+        return len(messages) > HISTORY_PAGE_SIZE
+
+
+def test_rapid_selection_only_renders_the_last_conversation(monkeypatch, tmp_path):
+    session_ids = _session_ids(5)
+    for session_id in session_ids:
+        _write_session(tmp_path, session_id, 400)
+    monkeypatch.setattr(session_module, "CODEX_SESSION_DIR", tmp_path)
+    session_module._find_all_session_jsonl_path.cache_clear()
+    try:
+        model = ChatModel()
+    finally:
+        session_module._find_all_session_jsonl_path.cache_clear()
+
+    async def click_through() -> tuple[ChatController, FakeView]:
+        controller = ChatController(FakePage(asyncio.get_running_loop()), model)
+        view = controller.view = FakeView()
+        for session_id in session_ids:
+            controller.select_conversation(session_id)
+        await asyncio.wrap_future(controller.select_future)
+        controller.prefetcher.cancel()
+        return controller, view
+
+    controller, view = asyncio.run(click_through())
+    assert view.rendered == [session_ids[-1]]
+    assert controller.superseded_loads == len(session_ids) - 1
+    active = model.active_conversation
+    assert active.id == session_ids[-1] and active.messages[-1].content == "answer 399"
+    # The first page did not fill the viewport, so the worker read one more.
+    assert len(active.messages) == 2 * HISTORY_PAGE_SIZE
+    # Abandoned loads never reached the model.
+    assert all(not c.messages for c in model.conversations if c is not active)
+
+
+def test_a_cancelled_read_stops_and_is_not_cached(monkeypatch, tmp_path):
+    _write_session(tmp_path, SESSION_ID, 10)
+    manager = _manager(monkeypatch, tmp_path)
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(HistoryLoadCancelled):
+        manager.load_chat_history_page(SESSION_ID, cancelled=cancelled)
+    assert manager.history_cache_stats()["entries"] == 0
+
+
+def test_filling_the_viewport_stops_once_the_selection_is_superseded(monkeypatch, tmp_path):
+    _write_session(tmp_path, SESSION_ID, 100)
+    monkeypatch.setattr(session_module, "CODEX_SESSION_DIR", tmp_path)
+    session_module._find_all_session_jsonl_path.cache_clear()
+    try:
+        model = ChatModel()
+        cancelled = threading.Event()
+
+        def enough(messages) -> bool:
+            # A newer selection arrives while the first page is being rendered.
+            cancelled.set()
+            return False
+
+        with pytest.raises(HistoryLoadCancelled):
+            model.read_history(SESSION_ID, cancelled, enough)
+    finally:
+        session_module._find_all_session_jsonl_path.cache_clear()
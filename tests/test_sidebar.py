@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from anycode_py.ui.components.sidebar import Sidebar
+from anycode_py.ui.models.chat import Conversation
+
+
+class FakeController:
+    def __init__(self, model):
+        self.model = model
+        self.selected: list[str] = []
+
+    def select_conversation(self, session_id: str) -> None:
+        self.selected.append(session_id)
+
+    def load_more_conversations(self) -> None:
+        start = len(self.model.conversations)
+        self.model.conversations.extend(Conversation(title=f"c{i}", id=f"s{i}") for i in range(start, start + 20))
+
+
+def _sidebar(count: int) -> tuple[Sidebar, SimpleNamespace]:
+    model = SimpleNamespace(conversations=[Conversation(title=f"c{i}", id=f"s{i}") for i in range(count)])
+    model.conversations[0].selected = model.conversations[0].indicator = True
+    sidebar = Sidebar(FakeController(model), model)
+    sidebar._refresh_conversation_list()
+    return sidebar, model
+
+
+def test_only_rows_near_the_viewport_are_built():
+    sidebar, _ = _sidebar(5000)
+    rows = sidebar.conversation_rows
+    assert rows.materialized < 40
+    assert rows.built == rows.materialized
+    assert len(sidebar.conversation_list.controls) == rows.materialized + 2
+
+
+def test_loading_a_page_only_considers_new_rows():
+    sidebar, _ = _sidebar(40)
+    rows = sidebar.conversation_rows
+    before = list(sidebar.conversation_list.controls[1:-1])
+    built = rows.built
+
+    sidebar.controller.load_more_conversations()
+    sidebar._refresh_conversation_list()
+
+    assert len(rows) == 60
+    assert sidebar.conversation_list.controls[1 : len(before) + 1] == before
+    assert rows.built - built == rows.materialized - len(before)
+
+
+def test_selection_restyles_only_the_two_affected_rows():
+    sidebar, model = _sidebar(20)
+    built = sidebar.conversation_rows.built
+    target = sidebar.conversation_list.controls[4]
+
+    sidebar._on_conversation_click(SimpleNamespace(control=target))
+    assert sidebar.controller.selected == [target.data.id]
+
+    restyled = sidebar._restyle_rows()
+    assert [row.data for row in restyled] == [model.conversations[0], target.data]
+    assert target.bgcolor is not None and restyled[0].bgcolor is None
+    assert sidebar.conversation_rows.built == built
+    assert not sidebar._refresh_conversation_list()
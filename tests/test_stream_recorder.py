@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from anycode_py.process_manager import codex as codex_module
+from anycode_py.process_manager.codex import CodexProcessManager
+from anycode_py.process_manager.recorder import StreamRecorder
+
+FAKE_CODEX = Path(__file__).parent.parent / "anycode_py" / "testing" / "fake_codex.py"
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_rotates_one_file_per_turn(tmp_path, compress):
+    recorder = StreamRecorder(tmp_path, prefix="run", compress=compress)
+    for turn in range(2):
+        recorder.begin_turn()
+        for index in range(3):
+            recorder.write(f'{{"turn": {turn}, "n": {index}}}\n'.encode())
+    recorder.close()
+
+    assert [path.name for path in recorder.files] == (
+        ["run-0001.jsonl.gz", "run-0002.jsonl.gz"] if compress else ["run-0001.jsonl", "run-0002.jsonl"]
+    )
+    opener = gzip.open if compress else open
+    for turn, path in enumerate(recorder.files):
+        with opener(path, "rb") as f:
+            assert [json.loads(line)["turn"] for line in f] == [turn] * 3
+    assert recorder.stats()["recorded_bytes"] == 6 * len(b'{"turn": 0, "n": 0}\n')
+
+
+def test_drops_oldest_chunks_beyond_capacity(tmp_path):
+    # A huge flush interval keeps the writer asleep until close(), as if the disk fell behind.
+    recorder = StreamRecorder(tmp_path, prefix="run", capacity_bytes=10, flush_interval=60)
+    recorder.begin_turn()
+    for index in range(5):
+        recorder.write(b"%d123\n" % index)
+    recorder.close()
+
+    assert recorder.files[0].read_bytes() == b"3123\n4123\n"
+    assert recorder.dropped_bytes == 15
+
+
+def test_tees_exact_stdout_of_each_codex_turn(monkeypatch, tmp_path):
+    command = [sys.executable, str(FAKE_CODEX), "--no-session", "--repeat", "2", "exec", "--json", "-"]
+    monkeypatch.setattr(codex_module, "CODEX_COMMAND", command)
+
+    async def run():
+        manager = CodexProcessManager()
+        manager.recorder = StreamRecorder(tmp_path, prefix="codex")
+        turns = []
+        for prompt in ("one", "two"):
+            events = []
+            async for event in manager.chat(prompt):
+                events.append(event)
+            turns.append(events)
+        await manager.close()
+        manager.recorder.close()
+        return manager.recorder, turns
+
+    recorder, turns = asyncio.run(run())
+    for path, events in zip(recorder.files, turns):
+        recorded = [json.loads(line) for line in path.read_bytes().splitlines()]
+        # `chat()` adds resource usage to the final event, the recording has the original bytes.
+        events[-1].pop("resource_usage", None)
+        assert recorded == events
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from anycode_py.ui.components.streaming_markdown import StreamingMarkdown, split_blocks
+
+MESSAGE = """Here is the plan:
+
+1. Read the file
+2. Patch it
+
+```python
+def f():
+
+    return 1
+```
+Then run the tests.
+
+Done"""
+
+
+def _block_texts(view: StreamingMarkdown) -> list[str]:
+    return [control.value for control in view.controls[:-1]]
+
+
+def test_split_blocks_keeps_fences_whole_and_leaves_the_open_tail():
+    blocks, tail = split_blocks(MESSAGE)
+    texts = [MESSAGE[begin:end].strip("\n") for begin, end in blocks]
+    assert texts == [
+        "Here is the plan:",
+        "1. Read the file\n2. Patch it",
+        "```python\ndef f():\n\n    return 1\n```",
+        "Then run the tests.",
+    ]
+    assert MESSAGE[tail:] == "Done"
+
+    # An unclosed fence stays in the tail, blank lines included.
+    blocks, tail = split_blocks("intro\n\n```\ncode\n\nmore\n")
+    assert len(blocks) == 1 and tail == len("intro\n\n")
+
+
+def test_streaming_builds_each_block_once_and_only_moves_the_tail():
+    view = StreamingMarkdown()
+    seen: dict[int, str] = {}
+    longest_tail = 0
+    for end in range(1, len(MESSAGE) + 1):
+        view.set_text(MESSAGE[:end])
+        for control in view.controls[:-1]:
+            # A finalized block is never rebuilt or edited.
+            assert seen.setdefault(id(control), control.value) == control.value
+        longest_tail = max(longest_tail, len(view.tail.value))
+
+    assert _block_texts(view) == _block_texts(StreamingMarkdown(MESSAGE))
+    assert len(seen) == view.finalized_blocks == 4
+    assert view.tail.value == "Done"
+    assert longest_tail < len(MESSAGE) // 2
+
+
+def test_text_that_does_not_extend_the_previous_value_is_rerendered():
+    view = StreamingMarkdown("first paragraph\n\nsecond")
+    assert not view.set_text("first paragraph\n\nsecond")
+    assert view.set_text("other\n\ntext")
+    assert _block_texts(view) == ["other"]
+    assert view.tail.value == "text"
+
+
+def test_loose_and_nested_lists_stay_one_block_until_something_else_starts():
+    text = "1. Install\n\n    - nested\n\n   more about it\n\n2. Run\n\nAfter the list.\n\n- a\n"
+    blocks, tail = split_blocks(text)
+    assert [text[begin:end].strip("\n") for begin, end in blocks] == [
+        "1. Install\n\n    - nested\n\n   more about it\n\n2. Run",
+        "After the list.",
+    ]
+    assert text[tail:] == "- a\n"
+
+    # A fence inside a list item does not split the list either.
+    blocks, tail = split_blocks("- step\n\n  ```\n  make\n\n  ```\n\n- next\n\nend\n")
+    assert len(blocks) == 1 and tail == len("- step\n\n  ```\n  make\n\n  ```\n\n- next\n\n")
+
+
+def test_link_reference_definitions_render_the_message_whole():
+    text = "Intro.\n\n1. Install\n\n    - nested\n\n2. Run, see [docs][1]\n\n[1]: https://x"
+    view = StreamingMarkdown()
+    for end in range(1, len(text) + 1):
+        view.set_text(text[:end])
+    assert view.finalized_blocks == 0
+    assert view.tail.value == text
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from anycode_py.process_manager.events import decode_event
+from anycode_py.testing.fake_codex import builtin_turn
+from anycode_py.ui.models.chat import Conversation, Message
+from anycode_py.ui.models.turn import COMMAND_OUTPUT_LINES, TurnMessages
+
+
+class FakeModel:
+    def add_message(self, role, content, kind="text", language=None, code=None, conversation=None) -> Message:
+        message = Message(role=role, content=content, kind=kind, language=language, code=code)
+        conversation.messages.append(message)
+        return message
+
+
+def _item(kind: str, item: dict) -> dict:
+    return {"type": kind, "item": item}
+
+
+def test_one_message_per_item_however_many_events_stream_in():
+    conversation = Conversation(title="t")
+    turn = TurnMessages(FakeModel(), conversation)
+    events = builtin_turn("hello")
+    text = "Streaming reply, word by word."
+    words = text.split(" ")
+    events += [
+        _item("item.updated", {"id": "item_3", "type": "agent_message", "text": " ".join(words[:end])})
+        for end in range(1, len(words) + 1)
+    ]
+    command = {"id": "item_4", "type": "command_execution", "command": "make"}
+    output = ""
+    for step in range(100):
+        output += f"step {step}\n"
+        events.append(_item("item.updated", {**command, "aggregated_output": output}))
+    events.append(_item("item.completed", {**command, "aggregated_output": output, "exit_code": 0}))
+
+    added = 0
+    for raw in events:
+        touched = turn.apply(decode_event(raw))
+        added += bool(touched and touched[1])
+
+    assert added == len(conversation.messages) == 5
+    kinds = [message.kind for message in conversation.messages]
+    assert kinds == ["reasoning", "command", "text", "text", "command"]
+    assert conversation.messages[3].content == text
+    make = conversation.messages[4]
+    assert make.content == "`make` exited with 0"
+    assert make.code.split("\n") == [f"step {i}" for i in range(100 - COMMAND_OUTPUT_LINES, 100)]
+    turn.close()
+
+
+def test_errors_add_a_message_and_lifecycle_events_add_none():
+    conversation = Conversation(title="t")
+    turn = TurnMessages(FakeModel(), conversation)
+    assert turn.apply(decode_event({"type": "thread.started", "thread_id": "x"})) is None
+    assert turn.apply(decode_event({"type": "turn.completed", "usage": {}})) is None
+    message, added = turn.apply(decode_event({"type": "turn.failed", "error": {"message": "boom"}}))
+    assert added and message.kind == "error" and message.content == "Error: boom"
+    # An update that changes nothing is not reported.
+    item = {"id": "a", "type": "agent_message", "text": "hi"}
+    assert turn.apply(decode_event(_item("item.started", item)))[1]
+    assert turn.apply(decode_event(_item("item.completed", item))) is None
+    assert len(conversation.messages) == 2
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from anycode_py.ui.update_scheduler import UpdateScheduler
+from tests.utils import FakeConnection, FakePage
+
+
+def test_burst_of_requests_is_flushed_once_per_frame():
+    async def scenario():
+        page = FakePage(asyncio.get_running_loop(), FakeConnection())
+        scheduler = UpdateScheduler(page, hz=20, count_payload=True)
+        for _ in range(10):
+            for _ in range(100):
+                scheduler.request()
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        return page, scheduler
+
+    page, scheduler = asyncio.run(scenario())
+    stats = scheduler.stats()
+    assert stats["requests"] == 1000
+    # ~100 ms of requests at 20 Hz: the first one right away, then one per 50 ms frame.
+    assert 2 <= stats["flushes"] == len(page.updates) <= 6
+    assert stats["payload_bytes"] == stats["flushes"] * stats["max_payload_bytes"] > 0
+
+
+def test_immediate_flush_skips_the_frame_delay():
+    async def scenario():
+        page = FakePage(asyncio.get_running_loop(), FakeConnection())
+        scheduler = UpdateScheduler(page, hz=1)
+        send_commands = page.connection.send_commands
+        scheduler.request()
+        await asyncio.sleep(0.01)
+        scheduler.request()
+        assert len(page.updates) == 1
+        scheduler.request(immediate=True)
+        assert len(page.updates) == 2
+        # The pending frame was folded into the immediate flush.
+        await asyncio.sleep(0.05)
+        # Payload counting is off by default and leaves the connection alone.
+        assert page.connection.send_commands == send_commands
+        assert scheduler.stats()["payload_bytes"] == 0
+        return page
+
+    assert len(asyncio.run(scenario()).updates) == 2
+
+
+def test_requests_from_handler_threads_flush_on_the_loop():
+    # Immediate ones included: they are handed to the loop rather than flushed in the thread.
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        page = FakePage(loop, FakeConnection())
+        flushed_on: list[int] = []
+        update = page.update
+
+        def recording_update(*controls):
+            flushed_on.append(threading.get_ident())
+            update(*controls)
+
+        page.update = recording_update
+        scheduler = UpdateScheduler(page, hz=60)
+        workers = [
+            threading.Thread(
+                target=lambda immediate=immediate: [scheduler.request(immediate=immediate) for _ in range(50)]
+            )
+            for immediate in (False, False, False, True)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            await asyncio.to_thread(worker.join)
+        await asyncio.sleep(0.05)
+        return flushed_on, scheduler
+
+    flushed_on, scheduler = asyncio.run(scenario())
+    assert scheduler.requests == 200
+    assert 1 <= len(flushed_on) <= 70
+    assert set(flushed_on) == {threading.get_ident()}
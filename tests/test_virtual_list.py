@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import flet as ft
+
+from anycode_py.ui.components.virtual_list import VirtualList
+
+
+@dataclass
+class Item:
+    id: int
+    height: float = 100.0
+
+
+def _list(count: int, **kwargs) -> VirtualList[Item]:
+    virtual = VirtualList(lambda item: ft.Text(str(item.id)), lambda item: item.height, **kwargs)
+    virtual.set_items([Item(i) for i in range(count)])
+    return virtual
+
+
+def _rendered_ids(virtual: VirtualList[Item]) -> list[int]:
+    return [int(control.value) for control in virtual.column.controls[1:-1]]
+
+
+def test_large_list_only_materializes_the_tail_window():
+    virtual = _list(2000, viewport_height=900, overscan=300)
+
+    ids = _rendered_ids(virtual)
+    assert ids[-1] == 1999
+    assert len(ids) == virtual.materialized < 20
+    assert virtual.built == len(ids)
+    top, bottom = virtual.column.controls[0], virtual.column.controls[-1]
+    # Spacers keep the scroll extent of the whole list.
+    assert top.height + 100 * len(ids) + bottom.height == virtual.total_height == 200_000
+
+
+def test_scrolling_moves_the_window_and_evicts_old_controls():
+    virtual = _list(2000, viewport_height=900, overscan=300, cache_size=30)
+
+    for pixels in range(0, 50_000, 450):
+        virtual._on_scroll(
+            SimpleNamespace(pixels=pixels, viewport_dimension=900, max_scroll_extent=virtual.total_height - 900)
+        )
+        assert virtual.column.controls[0].height <= pixels
+        assert len(virtual._controls) <= 30
+    assert _rendered_ids(virtual)[0] == (49_950 - 300) // 100
+    assert not virtual.follow_tail
+
+
+def test_append_follows_the_tail_only_when_at_the_bottom():
+    virtual = _list(100, viewport_height=900, overscan=0)
+    virtual.append(Item(100))
+    assert _rendered_ids(virtual)[-1] == 100
+
+    virtual._on_scroll(SimpleNamespace(pixels=0, viewport_dimension=900, max_scroll_extent=virtual.total_height - 900))
+    virtual.append(Item(101))
+    assert _rendered_ids(virtual)[0] == 0
+    assert 101 not in _rendered_ids(virtual)
+    assert virtual.column.controls[-1].height == virtual.total_height - 100 * virtual.materialized
+
+
+def test_set_items_reconciles_by_key_and_version():
+    virtual = VirtualList(
+        lambda item: ft.Text(str(item.id)), lambda item: item.height, version=lambda item: item.height, overscan=0
+    )
+    items = [Item(i) for i in range(5)]
+    virtual.set_items(items)
+    before = list(virtual.column.controls)
+    assert virtual.built == 5
+
+    # Re-selecting the same conversation (fresh objects, same keys) changes nothing.
+    assert not virtual.set_items([Item(i) for i in range(5)])
+    assert virtual.column.controls == before and virtual.built == 5
+
+    # One appended and one changed message: only those two are built.
+    assert virtual.set_items([Item(0), Item(1), Item(2, height=150), Item(3), Item(4), Item(5)])
+    assert virtual.built == 7
+    rendered = virtual.column.controls[1:-1]
+    assert [rendered[i] is before[i + 1] for i in range(5)] == [True, True, False, True, True]
+
+
+def test_touch_keeps_the_control_of_an_item_updated_in_place():
+    virtual = _list(500, version=lambda item: item.height)
+    last = virtual.items[-1]
+    control = virtual.control_for_key(last.id)
+    built = virtual.built
+
+    last.height = 400.0
+    virtual.touch(last)
+    assert virtual.control_for_key(last.id) is control
+    assert virtual.built == built
+    assert virtual.total_height == 499 * 100 + 400
+    assert virtual.scroll_offset == virtual.total_height - virtual.viewport_height
+
+
+def test_prepend_keeps_the_window_on_the_same_items():
+    virtual = _list(100, viewport_height=900, overscan=300)
+    virtual.scroll_offset = 2000.0
+    virtual._render()
+    ids = _rendered_ids(virtual)
+
+    virtual.prepend([Item(-i) for i in range(50, 0, -1)])
+    assert virtual.scroll_offset == 7000.0
+    assert _rendered_ids(virtual) == ids
+    assert len(virtual) == 150 and not virtual.follow_tail
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from contextlib import contextmanager
 from pathlib import Path
 
 import yaml
+from flet.core.protocol import Command
 
 
 def is_valid_yaml(path: str | Path):
@@ -40,3 +42,32 @@ def run_within_dir(path: str):
 def file_contains_text(file: str, text: str) -> bool:
     with open(file) as f:
         return f.read().find(text) != -1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.batches = []
+
+    def send_commands(self, session_id, commands):
+        self.batches.append(commands)
+
+
+class FakePage:
+    """The parts of `ft.Page` the controllers and the update scheduler use.
+
+    Every `update()` is recorded; with a connection it also sends one command, like a page
+    update with a single changed control.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, connection: FakeConnection | None = None) -> None:
+        self.loop = loop
+        self.connection = connection
+        self.updates: list[tuple] = []
+
+    def run_task(self, handler, *args):
+        return asyncio.run_coroutine_threadsafe(handler(*args), self.loop)
+
+    def update(self, *controls) -> None:
+        self.updates.append(controls)
+        if self.connection is not None:
+            self.connection.send_commands("session", [Command(0, "set", ["_1"], {"value": "x" * 10})])